@@ -0,0 +1,8 @@
+#!/usr/bin/env python3 -B
+"""Compare throughput and memory of simulations in each execution mode."""
+
+import blackjack.benchmark
+
+
+if __name__ == '__main__':
+    blackjack.benchmark.main()
@@ -0,0 +1,308 @@
+"""Composition-dependent expected values of hit and stand decisions."""
+
+import functools
+import threading
+
+import blackjack.card
+import blackjack.score
+import blackjack.simulation
+
+
+CACHE_SIZE = 65536
+
+
+def remove_card(counts, value):
+    """Return given composition with one card of given value removed."""
+    counts = list(counts)
+    counts[value - 1] -= 1
+    return tuple(counts)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def dealer_outcomes(total, has_ace, card_count, counts, rules, no_blackjack):
+    """Return probabilities of every final dealer hand.
+
+    Dealer's hand is given by its hard total, whether it holds an Ace and
+    its number of cards. Remaining cards are given by `counts`, the number of
+    cards of each value from Ace to 10. Dealer `rules` are the pair of
+    `MINIMUM_DEALER_SCORE` and `DEALER_HITS_SOFT_17` attributes of the
+    ruleset. If `no_blackjack` is set, dealer's second card is known not to
+    make a Blackjack, for example because it would have been revealed.
+
+    Result is a tuple of probabilities, indexed by final score minus
+    `MINIMUM_DEALER_SCORE`, followed by probabilities of going bust and of
+    a Blackjack.
+    """
+    minimum_score, hits_soft_17 = rules
+    size = blackjack.score.TARGET_SCORE - minimum_score + 3
+    score, soft = blackjack.simulation.score_from_total(total, has_ace)
+    outcomes = [0.] * size
+
+    # Dealer is done
+    if score > blackjack.score.TARGET_SCORE:
+        outcomes[-2] = 1.
+        return tuple(outcomes)
+    if score == blackjack.score.TARGET_SCORE and card_count == 2:
+        outcomes[-1] = 1.
+        return tuple(outcomes)
+    if card_count >= 2 and (score > minimum_score
+            or score == minimum_score and not (soft and hits_soft_17)):
+        outcomes[score - minimum_score] = 1.
+        return tuple(outcomes)
+
+    # Dealer draws one more card
+    forbidden_value = None
+    if no_blackjack and card_count == 1:
+        forbidden_value = 11 - total if total in (1, 10) else None
+    remaining_count = sum(counts) - (counts[forbidden_value - 1] if forbidden_value else 0)
+    for value, count in enumerate(counts, 1):
+        if not count or value == forbidden_value:
+            continue
+        probability = count / remaining_count
+        next_outcomes = dealer_outcomes(total + value, has_ace or value == 1,
+            card_count + 1, remove_card(counts, value), rules, no_blackjack)
+        for i, p in enumerate(next_outcomes):
+            outcomes[i] += probability * p
+    return tuple(outcomes)
+
+
+def stand_value(score, card_count, dealer, payout_ratio):
+    """Return expected value of standing against given dealer outcomes.
+
+    Dealer is given by the result of `dealer_outcomes`.
+    """
+    target = blackjack.score.TARGET_SCORE
+    if score > target:
+        return -1.
+    blackjack_probability = dealer[-1]
+    if score == target and card_count == 2:
+        value = payout_ratio * (1. - blackjack_probability)
+        return value
+    minimum_score = target - len(dealer) + 3
+    value = dealer[-2] - blackjack_probability
+    for dealer_score, probability in enumerate(dealer[:-2], minimum_score):
+        if score > dealer_score:
+            value += probability
+        elif score < dealer_score:
+            value -= probability
+    return value
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def decision_values(total, has_ace, card_count, counts, dealer, payout_ratio):
+    """Return expected values of standing and of hitting, then playing on.
+
+    Player's hand is given by its hard total, whether it holds an Ace and
+    its number of cards, and remaining cards by `counts` as for
+    `dealer_outcomes`. Every card drawn by the player is removed from the
+    remaining ones before his next decision. Dealer outcomes, however, are
+    computed once from the composition at the time of the first decision and
+    given as `dealer`, which keeps the cost of a query within milliseconds.
+    """
+    score, _ = blackjack.simulation.score_from_total(total, has_ace)
+    stand = stand_value(score, card_count, dealer, payout_ratio)
+    remaining_count = sum(counts)
+    if not remaining_count:
+        return stand, None
+    hit = 0.
+    for value, count in enumerate(counts, 1):
+        if not count:
+            continue
+        next_total = total + value
+        next_has_ace = has_ace or value == 1
+        next_score, _ = blackjack.simulation.score_from_total(next_total, next_has_ace)
+        if next_score > blackjack.score.TARGET_SCORE:
+            best = -1.
+        else:
+            next_stand, next_hit = decision_values(next_total, next_has_ace,
+                card_count + 1, remove_card(counts, value), dealer, payout_ratio)
+            best = next_stand if next_hit is None else max(next_stand, next_hit)
+        hit += count / remaining_count * best
+    return stand, hit
+
+
+def round_value(counts, rules, payout_ratio, dealer_cache=None):
+    """Return expected gain of a one-chip wager, playing from given composition.
+
+    Remaining cards are given by `counts` and dealer rules by `rules`, as
+    for `dealer_outcomes`. Every initial deal is weighted by its probability,
+    then played the best way, hitting or standing, with dealer outcomes
+    computed once the player's first two cards and dealer's upcard are
+    removed. As in `decision_values`, these outcomes are not updated as the
+    player draws more cards, so the value is a close approximation rather
+    than an exact one. Whether the dealer reveals a Blackjack before the player
+    decides does not matter: the wager is lost whatever the player does.
+
+    Dealer outcomes of each deal may be looked up in and stored to given
+    `dealer_cache` dictionary. Compositions that differ by a single card
+    share many of them, since removing one card then dealing another leaves
+    the same remaining cards as the other way round.
+    """
+    card_count = sum(counts)
+    draw_count = card_count * (card_count - 1) * (card_count - 2)
+    value = 0.
+    for first, first_count in enumerate(counts, 1):
+        if not first_count:
+            continue
+        first_counts = remove_card(counts, first)
+        for upcard, upcard_count in enumerate(first_counts, 1):
+            if not upcard_count:
+                continue
+            upcard_counts = remove_card(first_counts, upcard)
+
+            # Player's two cards are drawn in either order
+            for second in range(first, len(counts) + 1):
+                second_count = upcard_counts[second - 1]
+                if not second_count:
+                    continue
+                probability = (first_count * upcard_count * second_count / draw_count
+                    * (1 if second == first else 2))
+                remaining_counts = remove_card(upcard_counts, second)
+                key = (upcard, remaining_counts)
+                dealer = dealer_cache.get(key) if dealer_cache is not None else None
+                if dealer is None:
+                    dealer = dealer_outcomes(upcard, upcard == 1, 1, remaining_counts,
+                        rules, False)
+                    if dealer_cache is not None:
+                        dealer_cache[key] = dealer
+                stand, hit = decision_values(first + second, first == 1 or second == 1,
+                    2, remaining_counts, dealer, payout_ratio)
+                value += probability * (stand if hit is None else max(stand, hit))
+    return value
+
+
+class DecisionCache(object):
+    """A bounded cache of decision values, by composition of remaining cards.
+
+    Each entry is a table of expected values of standing and hitting, filled
+    as situations get queried, keyed by the Zobrist hash of the remaining
+    cards and by the rules values depend on. Once `capacity` tables are
+    held, one of them is evicted following the CLOCK policy: tables are
+    scanned in circle and the first one not queried since the previous scan
+    is dropped. Queries are counted in `hits` and `misses`, and dropped
+    tables in `evictions`, so that capacity can be tuned.
+
+    The cache may be queried from several threads at once: a lock guards
+    its tables and counters, but is released while values are computed.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._keys = []  # by slot
+        self._tables = []  # by slot
+        self._referenced = bytearray()  # by slot
+        self._slots = {}  # by key
+        self._hand = 0
+        self._lock = threading.Lock()
+
+    def table(self, key):
+        """Return table of decision values of given key, by situation."""
+        with self._lock:
+            table = self._table(key)
+        return table
+
+    def _table(self, key):
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._referenced[slot] = 1
+            return self._tables[slot]
+        table = {}
+        if len(self._keys) < self.capacity:
+            slot = len(self._keys)
+            self._keys.append(key)
+            self._tables.append(table)
+            self._referenced.append(0)
+        else:
+            referenced = self._referenced
+            while referenced[self._hand]:
+                referenced[self._hand] = 0
+                self._hand = (self._hand + 1) % self.capacity
+            slot = self._hand
+            del self._slots[self._keys[slot]]
+            self._keys[slot] = key
+            self._tables[slot] = table
+            self._hand = (slot + 1) % self.capacity
+            self.evictions += 1
+        self._slots[key] = slot
+        return table
+
+    def lookup(self, key, situation, compute):
+        """Return values of given situation, computing them on a miss."""
+        with self._lock:
+            table = self._table(key)
+            values = table.get(situation)
+            if values is not None:
+                self.hits += 1
+                return values
+            self.misses += 1
+        values = compute()
+        with self._lock:
+            table[situation] = values
+        return values
+
+    @property
+    def hit_rate(self):
+        query_count = self.hits + self.misses
+        if not query_count:
+            return None
+        rate = self.hits / query_count
+        return rate
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        txt = '<Decision Cache of {}/{} tables>'.format(len(self), self.capacity)
+        return txt
+
+
+def advise(table, player, ruleset, cache=None):
+    """Return expected value of each legal action of given player.
+
+    Result maps each answer to the `[h]it or [s]tand?` question to its
+    expected value, in wagers, assuming the player then keeps playing the
+    best way. Player's hand must not have gone bust. Remaining cards are
+    those of the shoe plus the dealer's face-down cards, which the player
+    cannot see. If a `DecisionCache` is given, values are looked up in it
+    by the shoe's composition hash before being computed.
+    """
+    hand = player.hand
+    if hand.score > blackjack.score.TARGET_SCORE:
+        return {}
+    dealer_hand = table.dealer.hand
+    upcard = min(dealer_hand[0].values)
+    hidden_cards = [card for card in dealer_hand[1:] if not card.visible]
+    payout_ratio = ruleset.BLACKJACK_PAYOUT_RATIO
+
+    # Dealer's Blackjack has already been revealed
+    if len(dealer_hand) == 2 and not hidden_cards:
+        player_blackjack = hand.score == blackjack.score.TARGET_SCORE and len(hand) == 2
+        return {'h': -1., 's': 0. if player_blackjack else -1.}
+
+    counts = table.shoe.composition()
+    composition_hash = table.shoe.composition_hash
+    for card in hidden_cards:
+        value = min(card.values)
+        composition_hash = blackjack.card.add_to_composition_hash(
+            composition_hash, value, counts[value - 1])
+        counts[value - 1] += 1
+    hard_values = [min(card.values) for card in hand]
+    total, has_ace, card_count = sum(hard_values), 1 in hard_values, len(hand)
+    rules = (ruleset.MINIMUM_DEALER_SCORE, ruleset.DEALER_HITS_SOFT_17)
+    no_blackjack = bool(hidden_cards) and bool(ruleset.DEALER_REVEALS_BLACKJACK_HAND)
+    counts = tuple(counts)
+
+    def compute():
+        dealer = dealer_outcomes(upcard, upcard == 1, 1, counts, rules, no_blackjack)
+        return decision_values(total, has_ace, card_count, counts, dealer, payout_ratio)
+
+    if cache is None:
+        stand, hit = compute()
+    else:
+        key = (composition_hash, rules, no_blackjack, payout_ratio)
+        stand, hit = cache.lookup(key, (upcard, total, has_ace, card_count), compute)
+    values = {'s': stand, 'h': -1. if hit is None else hit}
+    return values
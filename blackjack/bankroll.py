@@ -0,0 +1,154 @@
+"""Bankroll and risk-of-ruin simulations."""
+
+import array
+import collections
+import random
+import warnings
+
+import blackjack.betting
+import blackjack.simulation
+
+
+PLAYING, RUINED, STOPPED_LOSS, STOPPED_WIN = 0, 1, 2, 3
+
+
+class BankrollResults(object):
+    """Outcome of many independent bankroll trajectories.
+
+    State is kept in flat arrays, one item per trajectory, so that millions
+    of trajectories fit in memory without as many Python objects:
+      * `chip_counts`: final bankroll
+      * `round_counts`: number of rounds played before leaving the table
+      * `ruin_rounds`: round at which the player got ruined, or -1
+      * `drawdowns`: largest drop from a previous bankroll peak
+      * `exits`: reason for leaving the table, `PLAYING` if never left
+    """
+
+    def __init__(self, trajectory_count, chip_count):
+        self.trajectory_count = trajectory_count
+        self.starting_chip_count = chip_count
+        self.chip_counts = array.array('l', [chip_count]) * trajectory_count
+        self.peaks = array.array('l', [chip_count]) * trajectory_count
+        self.drawdowns = array.array('l', [0]) * trajectory_count
+        self.round_counts = array.array('l', [0]) * trajectory_count
+        self.ruin_rounds = array.array('l', [-1]) * trajectory_count
+        self.exits = array.array('b', [PLAYING]) * trajectory_count
+
+    @property
+    def risk_of_ruin(self):
+        ruined_count = self.exits.count(RUINED)
+        risk = ruined_count / self.trajectory_count
+        return risk
+
+    @property
+    def maximum_drawdown(self):
+        drawdown = max(self.drawdowns)
+        return drawdown
+
+    def session_lengths(self):
+        """Return number of trajectories per session length, in rounds."""
+        lengths = collections.Counter(self.round_counts)
+        return lengths
+
+    def ruin_times(self):
+        """Return number of ruined trajectories per round of ruin."""
+        times = collections.Counter(r for r in self.ruin_rounds if r >= 0)
+        return times
+
+    def __repr__(self):
+        txt = '<Bankroll Results of {} trajectories with {:.2%} risk of ruin>'.format(
+            self.trajectory_count, self.risk_of_ruin)
+        return txt
+
+
+def simulate_bankrolls(ruleset, trajectory_count, chip_count, round_count,
+        betting_policy=None, stop_loss=None, stop_win=None, strategy=None,
+        seed=None, penetration=None):
+    """Play many independent bankrolls through headless rounds.
+
+    Each trajectory starts with `chip_count` chips and bets on every round as
+    told by `betting_policy`, which defaults to flat betting the ruleset's
+    minimum wager. A trajectory leaves the table when its bankroll can no
+    longer honor the minimum wager, when it has lost `stop_loss` chips or won
+    `stop_win` chips, or after `round_count` rounds. Trajectories that left
+    the table are dropped from the set of active ones, so that late rounds
+    only cost for survivors.
+
+    Note that all trajectories share the same shoe, so consecutive rounds of
+    a trajectory are not dealt from consecutive shoe positions. Unless a
+    `penetration` is given, that shoe is shuffled back before every round,
+    so the true count stays at 0 and a bet ramp never changes the wager: a
+    `RuntimeWarning` is issued when given one.
+    """
+    if (penetration is None and isinstance(betting_policy, blackjack.betting.BetRamp)
+            and not betting_policy.is_flat):
+        warnings.warn('bet ramp has no effect without a penetration, the shoe '
+            'is shuffled back before every round', RuntimeWarning, stacklevel=2)
+    rng = random.Random(seed)
+    game = blackjack.simulation.HeadlessGame(ruleset, strategy, rng, penetration)
+    deal_round = game.deal_round
+    gains = game.gains
+    wagers = [0]
+    shoe = game.shoe
+    minimum_wager = ruleset.MINIMUM_WAGER
+    betting_policy = betting_policy or blackjack.betting.FlatBetting()
+    ramp = betting_policy.compile(minimum_wager)
+    wager_from_ramp = blackjack.betting.wager_from_ramp
+    floor = chip_count - stop_loss if stop_loss else None
+    ceiling = chip_count + stop_win if stop_win else None
+
+    results = BankrollResults(trajectory_count, chip_count)
+    chip_counts = results.chip_counts
+    peaks = results.peaks
+    drawdowns = results.drawdowns
+    round_counts = results.round_counts
+    ruin_rounds = results.ruin_rounds
+    exits = results.exits
+
+    # Trajectories unable to play a single round are ruined right away
+    active = array.array('l', range(trajectory_count))
+    if chip_count < minimum_wager:
+        for i in active:
+            ruin_rounds[i] = 0
+            exits[i] = RUINED
+        return results
+
+    for round_number in range(1, round_count + 1):
+        survivors = array.array('l')
+        for i in active:
+            chips = chip_counts[i]
+            shoe.start_round()
+            if ramp is not None:
+                wager = wager_from_ramp(ramp, shoe.true_count, chips, minimum_wager)
+            else:
+                wager = betting_policy.wager(shoe.true_count, chips, minimum_wager)
+            if not wager:  # sitting this round out
+                survivors.append(i)
+                continue
+            wagers[0] = wager
+            deal_round(wagers)
+            chips += gains[0]
+            chip_counts[i] = chips
+            round_counts[i] = round_number
+
+            # Track drawdown from previous peak
+            if chips > peaks[i]:
+                peaks[i] = chips
+            elif peaks[i] - chips > drawdowns[i]:
+                drawdowns[i] = peaks[i] - chips
+
+            # Decide whether trajectory keeps playing
+            if chips < minimum_wager:
+                ruin_rounds[i] = round_number
+                exits[i] = RUINED
+            elif floor is not None and chips <= floor:
+                exits[i] = STOPPED_LOSS
+            elif ceiling is not None and chips >= ceiling:
+                exits[i] = STOPPED_WIN
+            else:
+                survivors.append(i)
+        active = survivors
+        if not active:
+            break
+
+    return results
@@ -0,0 +1,167 @@
+"""Benchmark of simulation throughput and memory in each execution mode, and of settlement."""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+
+import blackjack.card
+import blackjack.game
+import blackjack.score
+import blackjack.simulation
+
+
+def measure(mode, ruleset_name, round_count, worker_count, seed=None):
+    """Run a simulation in given execution mode and return its measures.
+
+    Result maps measure names to values. Memory is the peak resident set
+    size of the current process, in kilobytes, plus that of the largest
+    worker process times the number of workers, if any. It is only
+    meaningful when measured in a fresh process, as done by `main`.
+    """
+    ruleset = blackjack.game.ruleset_map[ruleset_name]()
+    start = time.perf_counter()
+    progress = None
+    for progress in blackjack.simulation.simulate(ruleset, round_count,
+            seed=seed, worker_count=worker_count, mode=mode):
+        pass
+    seconds = time.perf_counter() - start
+    memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if mode == 'process':
+        memory += worker_count * resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    measures = {
+        'mode': mode,
+        'worker_count': worker_count,
+        'round_count': progress.played_count,
+        'seconds': seconds,
+        'rounds_per_second': progress.played_count / seconds,
+        'memory': memory,
+        'house_edge': progress.house_edge,
+    }
+    return measures
+
+
+def report(measures_by_mode):
+    """Return lines comparing measures of each mode."""
+    lines = ['{:<12} {:>7} {:>12} {:>11} {:>11}'.format(
+        'mode', 'workers', 'rounds/s', 'memory (MB)', 'house edge')]
+    for measures in measures_by_mode:
+        lines.append('{:<12} {:>7} {:>12.0f} {:>11.1f} {:>11.3%}'.format(
+            measures['mode'], measures['worker_count'], measures['rounds_per_second'],
+            measures['memory'] / 1024, measures['house_edge']))
+    return lines
+
+
+def _deal_settlement_round(rng, template, seat_count):
+    """Return hands of given seat count and dealer hand, played out.
+
+    Cards are drawn with replacement, which does not matter for timing.
+    """
+    hands = []
+    for _ in range(seat_count + 1):
+        hand = blackjack.card.Hand([rng.choice(template), rng.choice(template)])
+        minimum_score = 12 if len(hands) < seat_count else blackjack.score.MINIMUM_DEALER_SCORE
+        while hand.score < minimum_score:
+            hand.add_card(rng.choice(template))
+        hands.append(hand)
+    dealer_hand = hands.pop()
+    return hands, dealer_hand
+
+
+def measure_settlement(seat_count, round_count, seed=None, block_size=1000):
+    """Return per-seat settlement costs, in nanoseconds, on tables of given seat count.
+
+    Rounds are played out before settlement is timed, so that scores of
+    hands are as cached as they are once a `Game` pays gains. Settling with
+    `blackjack.score.settle_hands` is compared to settling each seat with
+    `blackjack.score.compare_hands`, which scores the dealer hand every time.
+    Rounds are played out and timed by blocks of `block_size`, so that
+    memory use does not depend on the number of rounds.
+    """
+    rng = random.Random(seed)
+    template = blackjack.card.shoe_template(blackjack.game.EuropeanRuleset.DECK_COUNT_IN_SHOE)
+    compare_hands = blackjack.score.compare_hands
+    settle_hands = blackjack.score.settle_hands
+    compare_time = settle_time = 0
+    for block_start in range(0, round_count, block_size):
+        rounds = [_deal_settlement_round(rng, template, seat_count)
+            for _ in range(min(block_size, round_count - block_start))]
+        start = time.perf_counter_ns()
+        for hands, dealer_hand in rounds:
+            for hand in hands:
+                compare_hands(hand, dealer_hand)
+        compare_time += time.perf_counter_ns() - start
+        start = time.perf_counter_ns()
+        for hands, dealer_hand in rounds:
+            settle_hands(hands, dealer_hand)
+        settle_time += time.perf_counter_ns() - start
+    seat_total = seat_count * round_count
+    measures = {
+        'seat_count': seat_count,
+        'round_count': round_count,
+        'compare_hands': compare_time / seat_total,
+        'settle_hands': settle_time / seat_total,
+    }
+    return measures
+
+
+def main():
+
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description='''Compare throughput and
+        memory of simulations run by worker processes, threads and
+        subinterpreters.''')
+    parser.add_argument('--ruleset', choices=blackjack.game.ruleset_map.keys(),
+        default='european', help='Ruleset to simulate. Defaults to "european".')
+    parser.add_argument('--rounds', type=int,
+        help='''Number of rounds to play in each mode, or to settle. Defaults to
+        1000000, or to 10000 with --settlement.''')
+    parser.add_argument('--workers', type=int, default=4,
+        help='Number of workers. Defaults to 4.')
+    parser.add_argument('--seed', type=int, default=0,
+        help='Seed of card shuffling. Defaults to 0.')
+    parser.add_argument('--mode', action='append',
+        choices=blackjack.simulation.EXECUTION_MODES,
+        help='''Execution mode to measure, which may be given several times.
+        Defaults to every mode available.''')
+    parser.add_argument('--measure', choices=blackjack.simulation.EXECUTION_MODES,
+        help='Measure given mode in this process and print measures as JSON.')
+    parser.add_argument('--settlement', type=int, metavar='SEAT_COUNT',
+        help='''Measure per-seat settlement cost on tables of given seat count,
+        over as many rounds, instead of simulation throughput.''')
+    args = parser.parse_args()
+
+    # Measure settlement only
+    if args.settlement:
+        measures = measure_settlement(args.settlement, args.rounds or 10000, args.seed)
+        print('Settling {} seats over {} rounds: {:.0f} ns per seat with compare_hands, '
+            '{:.0f} ns per seat with settle_hands.'.format(measures['seat_count'],
+            measures['round_count'], measures['compare_hands'], measures['settle_hands']))
+        return
+
+    # Measure a single mode, in this process
+    args.rounds = args.rounds or 1000000
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.ruleset, args.rounds,
+            args.workers, args.seed)))
+        return
+
+    # Measure each mode in a fresh process, so that peak memory is its own
+    modes = args.mode or [mode for mode in blackjack.simulation.EXECUTION_MODES
+        if mode != 'interpreter' or sys.version_info >= (3, 14)]
+    print('GIL is {}.'.format(
+        'enabled' if blackjack.simulation.gil_enabled() else 'disabled'))
+    measures_by_mode = []
+    for mode in modes:
+        output = subprocess.check_output([sys.executable, '-m', 'blackjack.benchmark',
+            '--measure', mode, '--ruleset', args.ruleset, '--rounds', str(args.rounds),
+            '--workers', str(args.workers), '--seed', str(args.seed)])
+        measures_by_mode.append(json.loads(output.decode('utf-8')))
+    print('\n'.join(report(measures_by_mode)))
+
+
+if __name__ == '__main__':
+    main()
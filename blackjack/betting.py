@@ -0,0 +1,89 @@
+"""Betting policies for automated players."""
+
+import array
+
+
+class BettingPolicy(object):
+    """Parent type for all betting policies."""
+
+    def wager(self, true_count, chip_count, minimum_wager):
+        """Return how many chips to bet, or 0 to sit the round out."""
+        raise NotImplementedError()
+
+    def compile(self, minimum_wager):
+        """Return a precomputed bet ramp, or None if there is none.
+
+        A bet ramp is a `(wagers, lowest_count)` pair where `wagers` is an
+        array of chip counts indexed by the true count, truncated and clamped
+        to the ramp range, minus `lowest_count`. Headless engines use it to
+        select wagers without calling `wager()` on every round.
+        """
+        return None
+
+
+class BetRamp(BettingPolicy):
+    """Bet a number of minimum wagers depending on the true count.
+
+    The ramp is given as a mapping from true counts to units. Counts missing
+    between two given counts are given the units of the highest given count
+    below, and counts outside of the range are clamped to it.
+
+    The true count only moves away from 0 when rounds are dealt from a shoe
+    that is not shuffled back before each of them. `Game` reloads its shoe
+    on every round, and so does `blackjack.simulation.HeadlessGame` unless
+    given a penetration: without one, a ramp always bets the units of count
+    0, just like flat betting.
+    """
+
+    def __init__(self, units_by_count):
+        self.lowest_count = min(units_by_count)
+        self.highest_count = max(units_by_count)
+        units = []
+        for count in range(self.lowest_count, self.highest_count + 1):
+            units.append(units_by_count.get(count, units[-1] if units else 0))
+        self.units = array.array('l', units)
+
+    @property
+    def is_flat(self):
+        """Whether the same units are bet whatever the true count."""
+        is_flat = min(self.units) == max(self.units)
+        return is_flat
+
+    def compile(self, minimum_wager):
+        wagers = array.array('l', (u * minimum_wager for u in self.units))
+        return wagers, self.lowest_count
+
+    def wager(self, true_count, chip_count, minimum_wager):
+        count = min(max(int(true_count), self.lowest_count), self.highest_count)
+        chip_count = min(self.units[count - self.lowest_count] * minimum_wager, chip_count)
+        if chip_count < minimum_wager:
+            return 0
+        return chip_count
+
+    def __repr__(self):
+        txt = '<Bet Ramp from {} to {} units>'.format(min(self.units), max(self.units))
+        return txt
+
+
+class FlatBetting(BetRamp):
+    """Always bet the same number of minimum wagers."""
+
+    def __init__(self, units=1):
+        super(FlatBetting, self).__init__({0: units})
+
+
+def wager_from_ramp(ramp, true_count, chip_count, minimum_wager):
+    """Return wager selected from a compiled bet ramp.
+
+    This is what `BetRamp.wager` does, only without any attribute lookup.
+    """
+    wagers, lowest_count = ramp
+    index = int(true_count) - lowest_count
+    if index < 0:
+        index = 0
+    elif index >= len(wagers):
+        index = len(wagers) - 1
+    chip_count = min(wagers[index], chip_count)
+    if chip_count < minimum_wager:
+        return 0
+    return chip_count
@@ -1,8 +1,12 @@
 """Card, Desk, Shoe and Hand object definitions."""
 
 import collections
+import collections.abc
+import copy
+import functools
 import itertools
 import random
+import threading
 
 import blackjack.score
 
@@ -24,23 +28,45 @@ class Card(object):
         values = blackjack.score.values_from_card(self)
         return values
 
+    def __copy__(self):
+        card = type(self).__new__(type(self))
+        card.__dict__.update(self.__dict__)
+        return card
+
     def __repr__(self):
         txt = '<Card "{}" face {}>'.format(
             self.name, 'up' if self.visible else 'down')
         return txt
 
 
+SUITS = ['Spade', 'Heart', 'Diamond', 'Club']
+RANKS = [
+    'Ace', '2', '3', '4', '5', '6', '7', '8', '9', '10',
+    'Jack', 'Queen', 'King',
+]
+_SUIT_CODES = {suit: i for i, suit in enumerate(SUITS)}
+_RANK_CODES = {rank: i for i, rank in enumerate(RANKS)}
+
+
+def card_code(card):
+    """Return position of given card in a standard deck, from 0 to 51."""
+    code = _SUIT_CODES[card.suit] * len(RANKS) + _RANK_CODES[card.rank]
+    return code
+
+
+def card_from_code(code):
+    """Return a new card given its position in a standard deck."""
+    suit_code, rank_code = divmod(code, len(RANKS))
+    card = Card(SUITS[suit_code], RANKS[rank_code])
+    return card
+
+
 class Deck(list):
     """A standard deck of 52 playing cards."""
 
     def __init__(self):
         """Build all 52 cards in deck."""
-        suits = ['Spade', 'Heart', 'Diamond', 'Club']
-        ranks = [
-            'Ace', '2', '3', '4', '5', '6', '7', '8', '9', '10',
-            'Jack', 'Queen', 'King',
-        ]
-        combinations = itertools.product(suits, ranks)
+        combinations = itertools.product(SUITS, RANKS)
         cards = (Card(suit, rank) for suit, rank in combinations)
         self.extend(cards)
 
@@ -49,39 +75,247 @@ class Deck(list):
         return txt
 
 
-class Shoe(collections.Iterator):
-    """A shoe to iterate over a set of playing cards."""
+# Zobrist keys, by hard value minus 1, then number of remaining cards
+_ZOBRIST_KEYS = tuple([] for _ in range(10))
+
+
+def _zobrist_keys(count):
+    """Return Zobrist keys, making sure they exist up to given count of cards.
+
+    Key of a value and count is drawn from its own seed, so that hashes are
+    the same in every process.
+    """
+    for value, keys in enumerate(_ZOBRIST_KEYS, 1):
+        while len(keys) <= count:
+            keys.append(random.Random(value << 32 | len(keys)).getrandbits(64))
+    return _ZOBRIST_KEYS
+
+
+def composition_hash(counts):
+    """Return Zobrist hash of given numbers of cards of each value, from Ace to 10."""
+    keys = _zobrist_keys(max(counts))
+    h = 0
+    for value_keys, count in zip(keys, counts):
+        h ^= value_keys[count]
+    return h
+
+
+def add_to_composition_hash(h, value, count):
+    """Return hash of a composition holding `count` cards of given value, once
+    one more card of that value is added to it."""
+    keys = _zobrist_keys(count + 1)[value - 1]
+    h ^= keys[count] ^ keys[count + 1]
+    return h
+
+
+def cards_composition(cards):
+    """Return number of given cards of each value, from Ace to 10."""
+    counts = [0] * 10
+    hard_values = blackjack.score.HARD_VALUES
+    for card in cards:
+        counts[hard_values[card.rank] - 1] += 1
+    return counts
+
 
-    def __init__(self, cards):
+@functools.lru_cache()
+def shoe_template(deck_count):
+    """Return the canonical face-down cards of a shoe with given deck count.
+
+    Templates are built once per deck count, from the one of a single deck,
+    and are shared by every shoe built with `Shoe.from_template`. Cards of a
+    template must therefore never be mutated.
+    """
+    if deck_count == 1:
+        cards = Deck()
         for card in cards:
             card.visible = False
+        return tuple(cards)
+    cards = deck_count * shoe_template(1)
+    return cards
+
+
+@functools.lru_cache()
+def template_composition(deck_count):
+    """Return composition of the shoe template of given deck count, with its hash.
+
+    Shoes built with `Shoe.from_template` share it, instead of counting
+    their cards once more.
+    """
+    counts = tuple(cards_composition(shoe_template(deck_count)))
+    composition = (counts, composition_hash(counts))
+    return composition
+
+
+class Shoe(collections.abc.Iterator):
+    """A shoe to iterate over a set of playing cards.
+
+    Unless `copy_on_draw` is set, the shoe owns given cards: it turns them
+    face down, then face up or down as they are drawn. Otherwise, cards are
+    left untouched and each drawn card is a copy with its own visibility.
+
+    Shuffling is lazy: once shuffled, each draw picks one of the remaining
+    cards at random, which is one step of a Fisher-Yates shuffle. Cards come
+    out exactly as if all remaining cards had been shuffled at once, but the
+    cost of a round only depends on the number of cards dealt.
+
+    The number of remaining cards of each value is kept up to date as cards
+    are drawn, along with its Zobrist hash, `composition_hash`, so that
+    composition-dependent decisions can be looked up in constant time.
+
+    Cards are shuffled with given random number generator, which defaults
+    to the shared one of the `random` module. A table whose shoe has its own
+    seeded generator deals the same cards every time it is replayed.
+    """
+
+    def __init__(self, cards, copy_on_draw=False, rng=None, composition=None):
+        """If known, `composition` of cards is given with its hash."""
+        if not copy_on_draw:
+            for card in cards:
+                card.visible = False
         self._cards = cards
+        self._copy_on_draw = copy_on_draw
+        self.rng = rng
+        if composition is None:
+            counts = cards_composition(cards)
+            composition = (counts, composition_hash(counts))
+        self._full_counts, self._full_hash = composition
+        self.reload()
+
+    @classmethod
+    def from_template(cls, deck_count, rng=None):
+        """Return a new shoe sharing the template cards of given deck count."""
+        shoe = cls(list(shoe_template(deck_count)), copy_on_draw=True, rng=rng,
+            composition=template_composition(deck_count))
+        return shoe
+
+    def start_round(self, dealt=False):
+        """Get ready for a table to deal a new round.
+
+        If `dealt` is set, the round has already been dealt, as when it is
+        resumed from a snapshot.
+        """
+
+    def end_round(self):
+        """Take back cards of a table which finished its round."""
         self.reload()
 
     def reload(self):
-        self._card_iterator = iter(self._cards)
-        self._remaining_card_count = len(self._cards)
+        self._deck = list(self._cards)
+        self._position = 0
+        self._shuffled = False
+        self.running_count = 0
+        self._counts = list(self._full_counts)
+        self.composition_hash = self._full_hash
+
+    def _remove_from_composition(self, card):
+        """Update composition and its hash once given card is drawn."""
+        index = blackjack.score.HARD_VALUES[card.rank] - 1
+        count = self._counts[index]
+        keys = _ZOBRIST_KEYS[index]
+        self.composition_hash ^= keys[count] ^ keys[count - 1]
+        self._counts[index] = count - 1
 
     def shuffle(self):
-        """Shuffle remaining cards."""
-        remaining_cards = list(self._card_iterator)
-        random.shuffle(remaining_cards)
-        self._card_iterator = iter(remaining_cards)
+        """Shuffle remaining cards, lazily."""
+        self._shuffled = True
 
     def __next__(self):
         """Return next card in shoe."""
-        card = next(self._card_iterator)
-        self._remaining_card_count -= 1
+        deck = self._deck
+        position = self._position
+        if position >= len(deck):
+            raise StopIteration()
+        if self._shuffled:
+            other = (self.rng or random).randrange(position, len(deck))
+            card = deck[other]
+            deck[other] = deck[position]
+            deck[position] = card
+        else:
+            card = deck[position]
+        self._position = position + 1
+        self.running_count += blackjack.score.HI_LO_TAGS.get(card.rank, 0)
+        self._remove_from_composition(card)
         return card
 
+    def remaining_cards(self):
+        """Return remaining cards in drawing order, without drawing them.
+
+        A lazy shuffle is completed first, so that drawing order is known.
+        """
+        remaining_cards = self._deck[self._position:]
+        if self._shuffled:
+            (self.rng or random).shuffle(remaining_cards)
+            self._deck[self._position:] = remaining_cards
+            self._shuffled = False
+        return remaining_cards
+
+    def unshuffled_cards(self):
+        """Return remaining cards, and whether they are yet to be shuffled.
+
+        Unlike `remaining_cards`, a lazy shuffle is left as is, so that the
+        random number generator is not used.
+        """
+        remaining_cards = self._deck[self._position:]
+        return remaining_cards, self._shuffled
+
+    def restore(self, remaining_cards, running_count, shuffled=False):
+        """Set remaining cards in drawing order, and running count.
+
+        If `shuffled` is set, remaining cards are yet to be shuffled, lazily.
+        """
+        self._deck = list(remaining_cards)
+        self._position = 0
+        self._shuffled = shuffled
+        self.running_count = running_count
+        self._counts = cards_composition(self._deck)
+        self.composition_hash = composition_hash(self._counts)
+
+    def composition(self):
+        """Return number of remaining cards of each value, from Ace to 10."""
+        counts = list(self._counts)
+        return counts
+
     def draw_card(self, visible=False):
         card = next(self)
+        if self._copy_on_draw:
+            card = copy.copy(card)
         card.visible = visible
         return card
 
+    def draw_cards(self, count, visible=False):
+        """Return given number of next cards, drawn all at once."""
+        deck = self._deck
+        position = self._position
+        end = position + count
+        size = len(deck)
+        if end > size:
+            raise StopIteration()
+        if self._shuffled:
+            randrange = (self.rng or random).randrange
+            for i in range(position, end):
+                other = randrange(i, size)
+                deck[i], deck[other] = deck[other], deck[i]
+        cards = deck[position:end]
+        self._position = end
+        tags = blackjack.score.HI_LO_TAGS
+        self.running_count += sum(tags.get(card.rank, 0) for card in cards)
+        for card in cards:
+            self._remove_from_composition(card)
+        if self._copy_on_draw:
+            cards = [copy.copy(card) for card in cards]
+        for card in cards:
+            card.visible = visible
+        return cards
+
+    @property
+    def true_count(self):
+        count = blackjack.score.true_count(
+            self.running_count, len(self))
+        return count
+
     def __len__(self):
         """Return number of remaining cards."""
-        return self._remaining_card_count
+        return len(self._deck) - self._position
 
     def __repr__(self):
         txt = '<Shoe with {} remaining cards>'.format(len(self))
@@ -97,22 +331,188 @@ class ShufflingShoe(Shoe):
         card = super(ShufflingShoe, self).__next__()
         return card
 
+    def draw_cards(self, count, visible=False):
+        """Return given number of next cards, after shuffling."""
+        self.shuffle()
+        cards = super(ShufflingShoe, self).draw_cards(count, visible)
+        return cards
+
     def __repr__(self):
         txt = '<Shuffling Shoe with {} remaining cards>'.format(len(self))
         return txt
 
 
+class SharedShoe(Shoe):
+    """A shoe safe to draw from concurrently, from several tables.
+
+    Every operation on the remaining cards holds a lock, so that no card is
+    ever dealt twice. Drawn cards are copies of the shoe's cards, so that
+    turning a card face up or down on one table never affects another table.
+
+    Reloading the shoe brings back cards dealt on every table, so tables
+    never reload it at the end of their rounds. Once `penetration` of its
+    cards have been dealt, a table starting a new round waits instead until
+    no other table is in the middle of one, then reloads the shoe.
+    """
+
+    def __init__(self, cards, copy_on_draw=False, rng=None, penetration=0.75,
+            composition=None):
+        """Drawn cards are always copies, whatever `copy_on_draw` is."""
+        if not copy_on_draw:
+            for card in cards:
+                card.visible = False
+        self._lock = threading.RLock()
+        self._rounds_over = threading.Condition(self._lock)
+        self._round_count = 0  # of rounds in progress
+        self.penetration = penetration
+        self._cut = int(len(cards) * penetration)
+        super(SharedShoe, self).__init__(cards, copy_on_draw=True, rng=rng,
+            composition=composition)
+
+    @classmethod
+    def from_template(cls, deck_count, rng=None, penetration=0.75):
+        """Return a new shoe sharing the template cards of given deck count."""
+        shoe = cls(list(shoe_template(deck_count)), copy_on_draw=True, rng=rng,
+            penetration=penetration, composition=template_composition(deck_count))
+        return shoe
+
+    def start_round(self, dealt=False):
+        """Get ready for a table to deal a new round, reloading if time has come.
+
+        If `dealt` is set, the round has already been dealt, as when it is
+        resumed from a snapshot, so the shoe is not reloaded.
+        """
+        with self._lock:
+            if not dealt and len(self._cards) - len(self) >= self._cut:
+                while self._round_count:
+                    self._rounds_over.wait()
+                if len(self._cards) - len(self) >= self._cut:  # not reloaded meanwhile
+                    self.reload()
+            self._round_count += 1
+
+    def end_round(self):
+        """Let tables waiting for this round to end reload the shoe."""
+        with self._lock:
+            self._round_count -= 1
+            self._rounds_over.notify_all()
+
+    def reload(self):
+        with self._lock:
+            super(SharedShoe, self).reload()
+
+    def shuffle(self):
+        """Shuffle remaining cards."""
+        with self._lock:
+            super(SharedShoe, self).shuffle()
+
+    def __next__(self):
+        """Return next card in shoe."""
+        with self._lock:
+            card = super(SharedShoe, self).__next__()
+        return card
+
+    def draw_cards(self, count, visible=False):
+        """Return given number of next cards, drawn all at once."""
+        with self._lock:
+            cards = super(SharedShoe, self).draw_cards(count, visible)
+        return cards
+
+    def remaining_cards(self):
+        """Return remaining cards in drawing order, without drawing them."""
+        with self._lock:
+            remaining_cards = super(SharedShoe, self).remaining_cards()
+        return remaining_cards
+
+    def unshuffled_cards(self):
+        """Return remaining cards, and whether they are yet to be shuffled."""
+        with self._lock:
+            unshuffled_cards = super(SharedShoe, self).unshuffled_cards()
+        return unshuffled_cards
+
+    def restore(self, remaining_cards, running_count, shuffled=False):
+        """Set remaining cards in drawing order, and running count."""
+        with self._lock:
+            super(SharedShoe, self).restore(remaining_cards, running_count, shuffled)
+
+    def composition(self):
+        """Return number of remaining cards of each value, from Ace to 10."""
+        with self._lock:
+            counts = super(SharedShoe, self).composition()
+        return counts
+
+    def __repr__(self):
+        txt = '<Shared Shoe with {} remaining cards>'.format(len(self))
+        return txt
+
+
+class SharedShufflingShoe(SharedShoe, ShufflingShoe):
+    """An auto-shuffling shoe safe to draw from concurrently."""
+
+    def __repr__(self):
+        txt = '<Shared Shuffling Shoe with {} remaining cards>'.format(len(self))
+        return txt
+
+
 class Hand(list):
     """A hand of playing cards."""
 
     def __init__(self, cards=None):
         super(Hand, self).__init__(cards or [])
         self.wager = None
+        self.side_wagers = {}  # by side bet name
+        self._forget_count()
 
     def add_card(self, card):
         """Add given card to hand."""
         self.append(card)
 
+    def _forget_count(self):
+        """Forget hard total, so that all cards are counted again."""
+        self._counted_count = 0
+        self._hard_total = 0
+        self._has_ace = False
+
+    def _count(self):
+        """Return hard total and Ace presence, counting only cards added since last call.
+
+        Cards are mostly added at the end of a hand, so its score is kept up
+        to date in constant time per card. Any other change of the hand
+        forgets the hard total.
+        """
+        if self._counted_count < len(self):
+            hard_values = blackjack.score.HARD_VALUES
+            for card in self[self._counted_count:]:
+                value = hard_values[card.rank]
+                self._hard_total += value
+                self._has_ace = self._has_ace or value == 1
+            self._counted_count = len(self)
+        return self._hard_total, self._has_ace
+
+    def __setitem__(self, index, cards):
+        super(Hand, self).__setitem__(index, cards)
+        self._forget_count()
+
+    def __delitem__(self, index):
+        super(Hand, self).__delitem__(index)
+        self._forget_count()
+
+    def insert(self, index, card):
+        super(Hand, self).insert(index, card)
+        self._forget_count()
+
+    def pop(self, index=-1):
+        card = super(Hand, self).pop(index)
+        self._forget_count()
+        return card
+
+    def remove(self, card):
+        super(Hand, self).remove(card)
+        self._forget_count()
+
+    def clear(self):
+        super(Hand, self).clear()
+        self._forget_count()
+
     def reveal_all_cards(self):
         """Make all cards visible."""
         for card in self:
@@ -120,8 +520,16 @@ class Hand(list):
 
     @property
     def score(self):
-        score = blackjack.score.score_from_hand(self)
-        return score
+        total, has_ace = self._count()
+        if has_ace and total + 10 <= blackjack.score.TARGET_SCORE:
+            total += 10
+        return total
+
+    @property
+    def soft(self):
+        total, has_ace = self._count()
+        soft = has_ace and total + 10 <= blackjack.score.TARGET_SCORE
+        return soft
 
     def __repr__(self):
         txt = '<Hand with {} cards>'.format(len(self))
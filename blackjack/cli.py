@@ -1,25 +1,34 @@
 """Command-line interface for setting-up and starting a game."""
 
 import argparse
-import copy
+import json
+import random
 import sys
+import time
 
 import blackjack.card
 import blackjack.game
 import blackjack.player
+import blackjack.removal
 import blackjack.score
+import blackjack.simulation
+import blackjack.strategy
+import blackjack.sweep
 
 
-def play(ruleset, player_infos):
-    """Setup and play the game."""
+def play(ruleset, player_infos, seed=None):
+    """Setup and play the game.
+
+    Given a seed, the table shuffles its shoe with its own random number
+    generator, so that the same decisions replay the same game.
+    """
 
     # Prepare card shoe
     shoe_type = blackjack.card.Shoe
     if ruleset.AUTO_SHUFFLING_SHOE:
         shoe_type = blackjack.card.ShufflingShoe
-    cards = ruleset.DECK_COUNT_IN_SHOE * blackjack.card.Deck()
-    cards = [copy.copy(card) for card in cards]  # instantiate new cards
-    shoe = shoe_type(cards)
+    rng = random.Random(seed) if seed is not None else None
+    shoe = shoe_type.from_template(ruleset.DECK_COUNT_IN_SHOE, rng=rng)
 
     # Prepare table
     dealer = blackjack.player.Dealer()
@@ -34,14 +43,121 @@ def play(ruleset, player_infos):
     return table, game
 
 
+def format_progress(progress, elapsed):
+    """Return a one-line report of simulation progress after given seconds."""
+    rate = progress.played_count / elapsed if elapsed else 0
+    remaining_count = progress.round_count - progress.played_count
+    eta = remaining_count / rate if rate else 0
+    txt = '{}/{} rounds, {:.0f} rounds/s, ETA {:.0f}s'.format(
+        progress.played_count, progress.round_count, rate, eta)
+    if progress.house_edge is not None:
+        txt += ', house edge {:.3%}'.format(progress.house_edge)
+    if progress.standard_error is not None:
+        txt += ' ± {:.3%}'.format(progress.standard_error)
+    return txt
+
+
+def simulate(argv):
+    """Run a batch simulation with given command-line arguments."""
+
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(prog='blackjack.py simulate',
+        description='''Estimate the house edge of a ruleset by playing many
+        single-seat rounds with the headless engine.''')
+    parser.add_argument('--ruleset', choices=blackjack.game.ruleset_map.keys(), default='insight',
+        help='Ruleset to simulate. Defaults to "insight".')
+    parser.add_argument('--rounds', type=int, default=1000000,
+        help='Number of rounds to play. Defaults to 1000000.')
+    parser.add_argument('--workers', type=int, default=1,
+        help='Number of worker processes. Defaults to 1.')
+    parser.add_argument('--mode', choices=blackjack.simulation.EXECUTION_MODES,
+        default='process', help='''Whether workers are processes, threads or
+        subinterpreters. Threads only run in parallel without the GIL.
+        Defaults to "process".''')
+    parser.add_argument('--seed', type=int,
+        help='Seed of card shuffling. Results do not depend on the number of workers.')
+    parser.add_argument('--strategy', choices=blackjack.strategy.strategy_map.keys(),
+        default='basic', help='Strategy table of the player. Defaults to "basic".')
+    parser.add_argument('--output', metavar='PATH',
+        help='Write results to given path, as JSON.')
+    parser.add_argument('--hands', metavar='PATH',
+        help='Record every settled hand to given path, as a columnar file.')
+    args = parser.parse_args(argv)
+
+    # Play rounds, reporting progress on a single line
+    ruleset = blackjack.game.ruleset_map[args.ruleset]()
+    start = time.monotonic()
+    progress = None
+    for progress in blackjack.simulation.simulate(ruleset, args.rounds,
+            args.strategy, args.seed, args.workers, mode=args.mode,
+            hands_path=args.hands):
+        elapsed = time.monotonic() - start
+        print('\r' + format_progress(progress, elapsed), end='', file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    if progress is None:
+        return None
+
+    # Report results
+    results = {
+        'ruleset': args.ruleset,
+        'fingerprint': blackjack.sweep.ruleset_fingerprint(ruleset),
+        'strategy': args.strategy,
+        'seed': args.seed,
+        'round_count': progress.played_count,
+        'house_edge': progress.house_edge,
+        'standard_error': progress.standard_error,
+        'seconds': time.monotonic() - start,
+    }
+    print('House edge of "{}" ruleset: {:.3%} ± {:.3%}'.format(
+        args.ruleset, progress.house_edge, progress.standard_error or 0))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+def removal(argv):
+    """Report effects of removal of each card value with given command-line arguments."""
+
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(prog='blackjack.py removal',
+        description='''Compute the effect of removing one card of each value on
+        the house edge of rulesets.''')
+    parser.add_argument('--ruleset', action='append', choices=blackjack.game.ruleset_map.keys(),
+        help='''Ruleset to evaluate, which may be given several times. Defaults
+        to every ruleset.''')
+    parser.add_argument('--workers', type=int,
+        help='Number of worker processes. Defaults to the number of processors.')
+    args = parser.parse_args(argv)
+
+    # Evaluate rulesets
+    names = args.ruleset or sorted(blackjack.game.ruleset_map)
+    rulesets = [blackjack.game.ruleset_map[name]() for name in names]
+    results = blackjack.removal.effects_of_removal(rulesets, args.workers)
+    print('House edge and effects of removal, in %:')
+    print('\n'.join(blackjack.removal.report(zip(names, results))))
+    return results
+
+
 def main():
 
+    # Dispatch batch simulations and effects of removal
+    if sys.argv[1:2] == ['simulate']:
+        simulate(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ['removal']:
+        removal(sys.argv[2:])
+        return
+
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description='Text-based blackjack card game.')
     parser.add_argument('--ruleset', choices=blackjack.game.ruleset_map.keys(), default='insight',
         help='''Use this option to select the ruleset to be used while
         playing.  Possible choices are "basic", "european", "american" or
         "insight". If this option is not set, it defaults to "insight."''')
+    parser.add_argument('--seed', type=int,
+        help='''Seed of card shuffling, to replay a previous game. If this
+        option is not set, a new seed is drawn and printed.''')
     parser.add_argument('player_names', nargs='+', metavar='NAME',
         help='''Give each players\'s name as arguments. There must be at least
         1 player. Maximum number of players depends on choosen ruleset.''')
@@ -57,6 +173,12 @@ def main():
         print('This ruleset allows up to {} concurrent players.'.format(ruleset.MAXIMUM_PLAYER_COUNT))
         sys.exit(1)
 
+    # Draw a seed, so that this game can be replayed
+    seed = args.seed
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+        print('Replay this game with --seed {}.'.format(seed))
+
     # Have fun
-    play(ruleset, player_infos)
+    play(ruleset, player_infos, seed)
 
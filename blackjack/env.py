@@ -0,0 +1,232 @@
+"""Reinforcement-learning environments, one table or many at once."""
+
+import array
+import random
+
+import blackjack.betting
+import blackjack.card
+import blackjack.game
+import blackjack.player
+import blackjack.scenario
+import blackjack.score
+import blackjack.simulation
+import blackjack.strategy
+
+
+STAND, HIT = 0, 1
+CHIP_COUNT = 10 ** 9  # enough for the player never to go broke
+
+
+def _observation(score, soft, upcard, running_count, remaining_card_count, use_count):
+    """Return what the player sees, as a tuple of numbers."""
+    if not use_count:
+        return score, int(soft), upcard
+    true_count = blackjack.score.true_count(running_count, remaining_card_count)
+    return score, int(soft), upcard, true_count
+
+
+class BlackjackEnv(object):
+    """A Gym-style environment playing rounds of `Game` with a single seat.
+
+    Each episode is one round: `reset()` collects the minimum wager and deals
+    initial cards, then `step()` hits or stands until the hand stands or goes
+    bust, after which the dealer plays and `Game` pays gains. The
+    observation is the player's score, whether his hand is soft, the value
+    of the dealer's upcard, counting Aces as 1, and, if `use_count` is set,
+    the true count of cards seen by the player. The reward is the net gain
+    of the round, in wagers.
+    """
+
+    def __init__(self, ruleset, use_count=False):
+        self.ruleset = ruleset
+        self.use_count = use_count
+        shoe_type = blackjack.card.Shoe
+        if ruleset.AUTO_SHUFFLING_SHOE:
+            shoe_type = blackjack.card.ShufflingShoe
+        self.player = blackjack.player.Player('Agent', CHIP_COUNT,
+            blackjack.betting.FlatBetting())
+        self.table = blackjack.player.Table(
+            shoe_type.from_template(ruleset.DECK_COUNT_IN_SHOE),
+            blackjack.player.Dealer(), [self.player])
+        self.game = blackjack.game.Game(ruleset, ui=blackjack.scenario.ScriptedUI(()))
+        self.done = True
+        self._chip_count = None
+        self._wager = None
+
+    def observe(self):
+        """Return what the player currently sees."""
+        hand = self.player.hand
+        hidden_cards = [c for c in self.table.dealer.hand if not c.visible]
+        tags = blackjack.score.HI_LO_TAGS
+        running_count = self.table.shoe.running_count - sum(
+            tags.get(c.rank, 0) for c in hidden_cards)
+        observation = _observation(hand.score, hand.soft,
+            min(self.table.dealer.hand[0].values), running_count,
+            len(self.table.shoe) + len(hidden_cards), self.use_count)
+        return observation
+
+    def reset(self):
+        """Start a new round and return the first observation."""
+        game, table = self.game, self.table
+        if table.turn is not None:  # previous round was abandoned
+            game._cleanup(table)
+        self._chip_count = self.player.chip_count
+        table.active_players = game._collect_wagers(table)
+        self._wager = self.player.hand.wager
+        game._deal_initial_cards(table)
+        table.turn = 0
+        self.done = False
+        observation = self.observe()
+        return observation
+
+    def step(self, action):
+        """Hit or stand, and return observation, reward, end of round and info."""
+        if self.done:
+            raise RuntimeError('round is over, reset() must be called')
+        hand = self.player.hand
+        if action == HIT:
+            hand.add_card(self.table.shoe.draw_card(visible=True))
+            if hand.score <= blackjack.score.TARGET_SCORE:
+                observation = self.observe()
+                return observation, 0., False, {}
+        observation = self.observe()
+        game, table = self.game, self.table
+        table.turn = 1
+        game._interact_with_dealer(table, table.dealer)
+        game._pay_gains(table)
+        game._cleanup(table)
+        table.turn = None
+        self.done = True
+        reward = (self.player.chip_count - self._chip_count) / self._wager
+        return observation, reward, True, {}
+
+    def __repr__(self):
+        txt = '<Blackjack Env with {}>'.format(type(self.ruleset).__name__)
+        return txt
+
+
+class VectorEnv(object):
+    """Many independent single-seat tables stepped together.
+
+    Hands are kept as hard totals in flat arrays, one item per table, and
+    each table deals from its own `HeadlessShoe`, with the same rules as
+    `BlackjackEnv` and `HeadlessGame`. Observations are returned as a flat
+    `array('d')` of one row per table, so that they can be loaded with
+    `numpy.frombuffer(...).reshape(env_count, -1)`. A table whose round is
+    over is reset right away, and the observation returned for it is the
+    first of its next round.
+    """
+
+    def __init__(self, ruleset, env_count, use_count=False, seed=None):
+        self.ruleset = ruleset
+        self.env_count = env_count
+        self.use_count = use_count
+        rng = random.Random(seed)
+        self.shoes = [blackjack.simulation.HeadlessShoe(ruleset.DECK_COUNT_IN_SHOE, rng)
+            for _ in range(env_count)]
+        self.totals = array.array('b', [0]) * env_count
+        self.aces = array.array('b', [0]) * env_count
+        self.card_counts = array.array('b', [0]) * env_count
+        self.upcards = array.array('b', [0]) * env_count
+        self.holes = array.array('b', [0]) * env_count  # 0 if no hole card
+        self.revealed = array.array('b', [0]) * env_count  # 1 if hole card seen
+        self.dealer_table = blackjack.strategy.dealer_table(ruleset)
+        # Blackjack payouts are rounded down to whole chips, as by `Game`
+        wager = ruleset.MINIMUM_WAGER
+        self.blackjack_reward = int(wager * ruleset.BLACKJACK_PAYOUT_RATIO) / wager
+        self.observation_size = 4 if use_count else 3
+
+    def _deal(self, i):
+        """Start a new round on table of given index."""
+        shoe = self.shoes[i]
+        shoe.start_round()
+        draw = shoe.draw
+        first, upcard, second = draw(), draw(), draw()
+        self.totals[i] = first + second
+        self.aces[i] = first == 1 or second == 1
+        self.card_counts[i] = 2
+        self.upcards[i] = upcard
+        hole = draw() if self.ruleset.DEALER_RECEIVES_HOLE_CARD else 0
+        self.holes[i] = hole
+        self.revealed[i] = bool(self.ruleset.DEALER_REVEALS_BLACKJACK_HAND
+            and hole and upcard + hole == 11 and 1 in (upcard, hole))
+
+    def _observe(self, i, observations):
+        shoe = self.shoes[i]
+        hole = self.holes[i]
+        score, soft = blackjack.simulation.score_from_total(self.totals[i], self.aces[i])
+        running_count = shoe.running_count
+        remaining_card_count = len(shoe)
+        if hole and not self.revealed[i]:
+            running_count -= blackjack.score.HI_LO_TAGS_BY_VALUE[hole]
+            remaining_card_count += 1
+        observations.extend(_observation(score, soft, self.upcards[i],
+            running_count, remaining_card_count, self.use_count))
+
+    def _settle(self, i, score):
+        """Play dealer of given table and return player's gain, in wagers."""
+        draw = self.shoes[i].draw
+        upcard = self.upcards[i]
+        second = self.holes[i] or draw()
+        dealer_total = upcard + second
+        dealer_has_ace = upcard == 1 or second == 1
+        dealer_card_count = 2
+        dealer_score, dealer_soft = blackjack.simulation.score_from_total(
+            dealer_total, dealer_has_ace)
+        dealer_table = self.dealer_table
+        while dealer_table[2 * dealer_score + dealer_soft]:
+            value = draw()
+            dealer_total += value
+            dealer_has_ace = dealer_has_ace or value == 1
+            dealer_card_count += 1
+            dealer_score, dealer_soft = blackjack.simulation.score_from_total(
+                dealer_total, dealer_has_ace)
+        outcome = blackjack.simulation.outcome_from_scores(
+            score, self.card_counts[i], dealer_score, dealer_card_count)
+        if outcome == blackjack.score.BLACKJACK:
+            return self.blackjack_reward
+        if outcome == blackjack.score.WIN:
+            return 1.
+        if outcome == blackjack.score.PUSH:
+            return 0.
+        return -1.
+
+    def reset(self):
+        """Start a new round on every table and return observations."""
+        observations = array.array('d')
+        for i in range(self.env_count):
+            self._deal(i)
+            self._observe(i, observations)
+        return observations
+
+    def step(self, actions):
+        """Hit or stand on every table, given one action per table.
+
+        Return observations, rewards, ends of round and an empty info dict.
+        """
+        observations = array.array('d')
+        rewards = array.array('d', [0.]) * self.env_count
+        dones = array.array('b', [0]) * self.env_count
+        target = blackjack.score.TARGET_SCORE
+        for i, action in enumerate(actions):
+            if action == HIT:
+                value = self.shoes[i].draw()
+                self.totals[i] += value
+                self.aces[i] = self.aces[i] or value == 1
+                self.card_counts[i] += 1
+            score, _ = blackjack.simulation.score_from_total(self.totals[i], self.aces[i])
+            if score > target:
+                rewards[i] = -1.
+                dones[i] = 1
+            elif action != HIT:
+                rewards[i] = self._settle(i, score)
+                dones[i] = 1
+            if dones[i]:
+                self._deal(i)
+            self._observe(i, observations)
+        return observations, rewards, dones, {}
+
+    def __repr__(self):
+        txt = '<Vector Env of {} tables with {}>'.format(
+            self.env_count, type(self.ruleset).__name__)
+        return txt
@@ -0,0 +1,285 @@
+"""Columnar export of settled hands."""
+
+import array
+import json
+import struct
+import sys
+
+import blackjack.sweep
+
+
+MAGIC = b'BJCOLS1\n'
+_LENGTH = struct.Struct('<I')
+
+
+HAND_COLUMNS = (
+    ('round', 'q'),
+    ('seat', 'b'),
+    ('ruleset', 'h'),
+    ('true_count', 'd'),
+    ('upcard', 'b'),
+    ('initial_score', 'b'),
+    ('initial_soft', 'b'),
+    ('score', 'b'),
+    ('card_count', 'b'),
+    ('dealer_score', 'b'),
+    ('dealer_card_count', 'b'),
+    ('wager', 'q'),
+    ('outcome', 'b'),
+    ('gain', 'q'),
+)
+
+
+class ColumnWriter(object):
+    """Stream rows of fixed-size values to a columnar file.
+
+    Rows are buffered into one typed array per column. Buffered rows are
+    written out as one batch once there are `batch_size` of them, or when
+    `flush` or `close` is called, so that batches hold at most `batch_size`
+    rows and memory use never depends on the number of rows written. Written
+    bytes then go through the usual buffering of the file object, and only
+    reach the disk once it flushes them or is closed. The file layout is:
+      * `MAGIC`, then the JSON-encoded schema prefixed by its length
+      * for each batch, its row count, then the raw bytes of each column
+      * a zero row count, then JSON-encoded metadata prefixed by its length
+
+    Lengths and row counts are little-endian 32-bit integers. Column bytes
+    are in the native byte order of the writer, as recorded in the schema,
+    and readers swap them if theirs differs. Each column of a batch can
+    therefore be loaded with `numpy.frombuffer` without any parsing.
+    """
+
+    def __init__(self, path, columns, batch_size=65536):
+        self.path = path
+        self.columns = columns
+        self.batch_size = batch_size
+        self.metadata = {}
+        self.row_count = 0
+        self._buffers = [array.array(typecode) for _, typecode in columns]
+        self._row = struct.Struct(''.join(typecode for _, typecode in columns))
+        self._file = open(path, 'wb')
+        schema = {
+            'columns': [[name, typecode] for name, typecode in columns],
+            'byteorder': sys.byteorder,
+        }
+        self._file.write(MAGIC)
+        self._write_json(schema)
+
+    def _write_json(self, obj):
+        data = json.dumps(obj).encode('utf-8')
+        self._file.write(_LENGTH.pack(len(data)))
+        self._file.write(data)
+
+    def write_row(self, *values):
+        """Append one row, in schema order.
+
+        Values are all checked against their column types first, so that a
+        row is either appended as a whole, or not at all.
+        """
+        if len(values) != len(self._buffers):
+            raise ValueError('expected {} values, got {}'.format(
+                len(self._buffers), len(values)))
+        try:
+            self._row.pack(*values)
+        except struct.error as e:
+            raise ValueError('invalid row {!r}: {}'.format(values, e))
+        for buffer, value in zip(self._buffers, values):
+            buffer.append(value)
+        self.row_count += 1
+        if len(self._buffers[0]) >= self.batch_size:
+            self.flush()
+
+    def write_batch(self, columns):
+        """Append rows given as a typed array per column name.
+
+        Arrays are written as they are, without going through Python values,
+        once buffered rows have been flushed.
+        """
+        arrays = []
+        for name, typecode in self.columns:
+            column = columns[name]
+            if not isinstance(column, array.array) or column.typecode != typecode:
+                column = array.array(typecode, column)
+            arrays.append(column)
+        row_count = len(arrays[0])
+        if any(len(column) != row_count for column in arrays):
+            raise ValueError('columns of a batch must have the same length')
+        self.flush()
+        for start in range(0, row_count, self.batch_size):
+            end = min(start + self.batch_size, row_count)
+            self._write_batch([column[start:end] for column in arrays])
+        self.row_count += row_count
+
+    def _write_batch(self, arrays):
+        self._file.write(_LENGTH.pack(len(arrays[0])))
+        for column in arrays:
+            column.tofile(self._file)
+
+    def flush(self):
+        """Write buffered rows as one batch."""
+        if not self._buffers[0]:
+            return
+        self._write_batch(self._buffers)
+        for buffer in self._buffers:
+            del buffer[:]
+
+    def close(self):
+        """Write remaining rows and metadata, then close file."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.write(_LENGTH.pack(0))
+        self._write_json(self.metadata)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        txt = '<Column Writer "{}" with {} rows>'.format(self.path, self.row_count)
+        return txt
+
+
+def _read_json(f):
+    length, = _LENGTH.unpack(f.read(_LENGTH.size))
+    obj = json.loads(f.read(length).decode('utf-8'))
+    return obj
+
+
+def iter_batches(path):
+    """Yield each batch of a columnar file as a dict of typed arrays."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('not a columnar file: "{}"'.format(path))
+        schema = _read_json(f)
+        swap = schema['byteorder'] != sys.byteorder
+        while True:
+            row_count, = _LENGTH.unpack(f.read(_LENGTH.size))
+            if not row_count:
+                break
+            batch = {}
+            for name, typecode in schema['columns']:
+                column = array.array(typecode)
+                column.fromfile(f, row_count)
+                if swap:
+                    column.byteswap()
+                batch[name] = column
+            yield batch
+
+
+def read_columns(path):
+    """Return all rows of a columnar file as a dict of typed arrays."""
+    columns = {}
+    for batch in iter_batches(path):
+        for name, column in batch.items():
+            columns.setdefault(name, array.array(column.typecode)).extend(column)
+    return columns
+
+
+def read_metadata(path):
+    """Return metadata of a columnar file, skipping over all batches."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('not a columnar file: "{}"'.format(path))
+        schema = _read_json(f)
+        row_size = sum(array.array(t).itemsize for _, t in schema['columns'])
+        while True:
+            row_count, = _LENGTH.unpack(f.read(_LENGTH.size))
+            if not row_count:
+                break
+            f.seek(row_count * row_size, 1)
+        metadata = _read_json(f)
+    return metadata
+
+
+def concatenate_hands(paths, path):
+    """Write hands of given files, one after the other, to a single file.
+
+    Rounds are numbered on from one file to the next, and ruleset numbers
+    are shared between files by fingerprint, as a single `HandRecorder`
+    would have recorded them. Batches are copied as whole arrays, only the
+    `round` and `ruleset` columns being rewritten when they need to.
+    """
+    rulesets = []
+    ruleset_ids = {}  # by fingerprint
+    round_offset = 0
+    with ColumnWriter(path, HAND_COLUMNS) as writer:
+        for part_path in paths:
+            part_ids = []
+            for ruleset in read_metadata(part_path)['rulesets']:
+                ruleset_id = ruleset_ids.get(ruleset['fingerprint'])
+                if ruleset_id is None:
+                    ruleset_id = ruleset_ids[ruleset['fingerprint']] = len(rulesets)
+                    rulesets.append(ruleset)
+                part_ids.append(ruleset_id)
+            remap = part_ids != list(range(len(part_ids)))
+            last_round = 0
+            for batch in iter_batches(part_path):
+                if round_offset:
+                    batch['round'] = array.array('q',
+                        [round_offset + r for r in batch['round']])
+                if remap:
+                    batch['ruleset'] = array.array('h',
+                        [part_ids[r] for r in batch['ruleset']])
+                writer.write_batch(batch)
+                last_round = batch['round'][-1]
+            round_offset = max(round_offset, last_round)
+        writer.metadata['rulesets'] = rulesets
+    return writer.row_count
+
+
+class HandRecorder(object):
+    """Record every settled hand as one row of a columnar file.
+
+    Rulesets are stored as small integers in the `ruleset` column. Their
+    names and fingerprints are listed, in that order, in the `rulesets`
+    entry of the file metadata.
+    """
+
+    def __init__(self, path, batch_size=65536):
+        self.writer = ColumnWriter(path, HAND_COLUMNS, batch_size)
+        self.writer.metadata['rulesets'] = []
+        self._ruleset_ids = {}  # by fingerprint and by ruleset object
+        self._round = 0
+        self._ruleset = None
+        self._true_count = 0.
+
+    def start_round(self, ruleset, true_count):
+        """Register a new round and the true count before its first card."""
+        ruleset_id = self._ruleset_ids.get(ruleset)
+        if ruleset_id is None:
+            fingerprint = blackjack.sweep.ruleset_fingerprint(ruleset)
+            ruleset_id = self._ruleset_ids.get(fingerprint)
+            if ruleset_id is None:
+                ruleset_id = len(self.writer.metadata['rulesets'])
+                self._ruleset_ids[fingerprint] = ruleset_id
+                self.writer.metadata['rulesets'].append(
+                    {'name': type(ruleset).__name__, 'fingerprint': fingerprint})
+            self._ruleset_ids[ruleset] = ruleset_id
+        self._round += 1
+        self._ruleset = ruleset_id
+        self._true_count = true_count
+
+    def record_hand(self, seat, upcard, initial_score, initial_soft, score,
+            card_count, dealer_score, dealer_card_count, wager, outcome, gain):
+        """Record one settled hand of current round."""
+        self.writer.write_row(self._round, seat, self._ruleset,
+            self._true_count, upcard, initial_score, initial_soft, score,
+            card_count, dealer_score, dealer_card_count, wager, outcome, gain)
+
+    def close(self):
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        txt = '<Hand Recorder "{}" with {} hands>'.format(
+            self.writer.path, self.writer.row_count)
+        return txt
@@ -0,0 +1,313 @@
+"""Differential fuzzing of fast engines against the reference gameplay."""
+
+import concurrent.futures
+import functools
+import random
+
+import blackjack.card
+import blackjack.game
+import blackjack.player
+import blackjack.scenario
+import blackjack.score
+import blackjack.simulation
+import blackjack.strategy
+import blackjack.sweep
+
+
+# Fuzzed rule attributes and their possible values, simplest value first
+FUZZ_ATTRIBUTES = {
+    'DEALER_RECEIVES_HOLE_CARD': (False, True),
+    'DEALER_REVEALS_BLACKJACK_HAND': (None, True),
+    'MINIMUM_DEALER_SCORE': (17, 15, 16, 18),
+    'DEALER_HITS_SOFT_17': (False, True),
+    'BLACKJACK_PAYOUT_RATIO': (3/2, 1, 6/5, 2),
+}
+
+SITUATIONS = tuple((score, soft, upcard)
+    for score in range(2, blackjack.score.TARGET_SCORE)
+    for soft in (False, True)
+    for upcard in blackjack.strategy.UPCARDS)
+
+CHIP_COUNT = 1000
+MAXIMUM_SEAT_COUNT = 7
+MAXIMUM_WAGER = 100
+CARD_COUNT = 104  # more than any round may ever deal
+
+
+class Case(object):
+    """A fuzzed round: rules, wagers of each seat, decisions and card order.
+
+    Decisions are given by `hit_mask`, whose bit of rank `i` is set if every
+    seat hits in `SITUATIONS[i]`. Cards are given by rank, in dealing order.
+    """
+
+    def __init__(self, attributes, wagers, hit_mask, ranks):
+        self.attributes = attributes
+        self.wagers = wagers
+        self.hit_mask = hit_mask
+        self.ranks = ranks
+
+    def ruleset(self):
+        ruleset = _ruleset(tuple(sorted(self.attributes.items())))
+        return ruleset
+
+    def hit_situations(self):
+        situations = [s for i, s in enumerate(SITUATIONS) if self.hit_mask >> i & 1]
+        return situations
+
+    def strategy(self):
+        strategy = _strategy(self.hit_mask)
+        return strategy
+
+    def replace(self, **kwargs):
+        """Return a copy of this case with some fields replaced."""
+        fields = dict(self.__dict__, **kwargs)
+        case = Case(**fields)
+        return case
+
+    def __repr__(self):
+        txt = 'Case(attributes={!r}, wagers={!r}, hit_mask={:#x}, ranks={!r})'.format(
+            self.attributes, self.wagers, self.hit_mask, self.ranks)
+        return txt
+
+
+@functools.lru_cache(maxsize=1024)
+def _ruleset(attribute_items):
+    attributes = dict(attribute_items, MAXIMUM_PLAYER_COUNT=MAXIMUM_SEAT_COUNT,
+        AUTO_SHUFFLING_SHOE=False, MINIMUM_WAGER=1)
+    ruleset = blackjack.sweep.make_ruleset(blackjack.game.EuropeanRuleset, attributes)()
+    return ruleset
+
+
+@functools.lru_cache(maxsize=1024)
+def _strategy(hit_mask):
+    situations = [s for i, s in enumerate(SITUATIONS) if hit_mask >> i & 1]
+    strategy = blackjack.strategy.Strategy('fuzz', situations)
+    return strategy
+
+
+def random_case(rng):
+    """Return a random case, with enough cards for any round."""
+    attributes = {name: rng.choice(values) for name, values in FUZZ_ATTRIBUTES.items()}
+    wagers = [rng.randint(1, MAXIMUM_WAGER)
+        for _ in range(rng.randint(1, MAXIMUM_SEAT_COUNT))]
+    hit_mask = rng.getrandbits(len(SITUATIONS))
+    ranks = rng.choices(blackjack.card.RANKS, k=CARD_COUNT)
+    case = Case(attributes, wagers, hit_mask, ranks)
+    return case
+
+
+def _cards(ranks):
+    cards = [blackjack.card.Card('Spade', rank) for rank in ranks]
+    return cards
+
+
+def _fast_hand(ranks):
+    """Return score, softness and card count of a hand, the fast way."""
+    values = [blackjack.score.HARD_VALUES[rank] for rank in ranks]
+    score, soft = blackjack.simulation.score_from_total(sum(values), 1 in values)
+    return score, soft, len(values)
+
+
+def _hand(ranks):
+    """Return a hand of cards of given ranks, added one at a time."""
+    hand = blackjack.card.Hand()
+    for card in _cards(ranks):
+        hand.add_card(card)
+    return hand
+
+
+def check_hands(case):
+    """Compare scoring and outcome of hands dealt alternately.
+
+    Scores are compared between the reference scoring of cards, the scores
+    cached by `Hand` and the fast scoring of the headless engine. Outcomes
+    of two hands are compared between `compare_hands` and the headless
+    engine, then outcomes of every seat between `compare_hands` and
+    `settle_hands`. Return a description of the first divergence, or None.
+    """
+    card_count = 2 * min(len(case.wagers) + 1, len(case.ranks) // 2)
+    if not card_count:
+        return None
+    player_ranks = case.ranks[0:card_count:2]
+    dealer_ranks = case.ranks[1:card_count:2]
+    player_hand = _hand(player_ranks)
+    dealer_hand = _hand(dealer_ranks)
+    cards = _cards(player_ranks)
+    reference = (blackjack.score.score_from_hand(cards), blackjack.score.is_soft_hand(cards))
+    cached = (player_hand.score, player_hand.soft)
+    if reference != cached:
+        return 'score_from_hand gives {} but Hand caches {}'.format(reference, cached)
+    score, soft, _ = _fast_hand(player_ranks)
+    dealer_score, _, _ = _fast_hand(dealer_ranks)
+    if reference != (score, soft):
+        return 'score_from_hand gives {} but score_from_total gives {}'.format(
+            reference, (score, soft))
+    outcome, _ = blackjack.score.compare_hands(player_hand, dealer_hand)
+    fast_outcome = blackjack.simulation.outcome_from_scores(
+        score, len(player_ranks), dealer_score, len(dealer_ranks))
+    if outcome != fast_outcome:
+        return 'compare_hands gives {} but outcome_from_scores gives {}'.format(
+            outcome, fast_outcome)
+
+    # Every seat against the same dealer hand, with 2 to 4 cards each
+    hand_count = len(case.wagers) + 1
+    hands = [_hand(case.ranks[i::hand_count][:2 + wager % 3])
+        for i, wager in enumerate(case.wagers + [case.hit_mask])]
+    hands = [hand for hand in hands if hand]  # seats out of cards do not play
+    if len(hands) < 2:
+        return None
+    dealer_hand = hands.pop()
+    settled = blackjack.score.settle_hands(hands, dealer_hand)
+    for seat, (hand, (outcome, score)) in enumerate(zip(hands, settled)):
+        reference = (blackjack.score.compare_hands(hand, dealer_hand)[0],
+            blackjack.score.score_from_hand(hand))
+        if reference != (outcome, score):
+            return 'compare_hands gives {} but settle_hands gives {} for seat {}'.format(
+                reference, (outcome, score), seat)
+    return None
+
+
+class _StackedHeadlessShoe(object):
+    """A headless shoe dealing values of given ranks in order."""
+
+    def __init__(self, ranks):
+        self.values = [blackjack.score.HARD_VALUES[rank] for rank in ranks]
+        self.position = 0
+        self.running_count = 0
+        self.true_count = 0.
+
+    def start_round(self):
+        pass
+
+    def draw(self):
+        if self.position >= len(self.values):
+            raise StopIteration()
+        value = self.values[self.position]
+        self.position += 1
+        return value
+
+
+def reference_gains(case):
+    """Play case through `Game` and return gains."""
+    shoe = blackjack.scenario.StackedShoe.from_ranks(case.ranks)
+    players = [blackjack.player.Player(str(i), CHIP_COUNT) for i in range(len(case.wagers))]
+    table = blackjack.player.Table(shoe, blackjack.player.Dealer(), players)
+    game = blackjack.game.Game(case.ruleset(),
+        ui=blackjack.scenario.StrategyUI(table, case.strategy(), case.wagers))
+    game._play_new_round(table)
+    gains = [p.chip_count - CHIP_COUNT for p in players]
+    return gains
+
+
+def headless_gains(case, engine_type=blackjack.simulation.HeadlessGame):
+    """Play case through a headless engine and return gains."""
+    game = engine_type(case.ruleset(), case.strategy())
+    game.shoe = _StackedHeadlessShoe(case.ranks)
+    gains = game.play_round(case.wagers)
+    return gains
+
+
+def check_round(case, engine_type=blackjack.simulation.HeadlessGame):
+    """Compare gains of a round played by `Game` and by a headless engine.
+
+    Return a description of the divergence, or None. Cases running out of
+    cards on both sides are not divergences.
+    """
+    try:
+        gains = reference_gains(case)
+    except StopIteration:
+        gains = 'no more cards'
+    try:
+        fast_gains = headless_gains(case, engine_type)
+    except StopIteration:
+        fast_gains = 'no more cards'
+    if gains != fast_gains:
+        return 'Game gives {} but {} gives {}'.format(
+            gains, engine_type.__name__, fast_gains)
+    return None
+
+
+def _simpler_cases(case):
+    """Yield cases simpler than given one, simplest first."""
+    # Fewer seats, lower wagers
+    for i in range(len(case.wagers)):
+        if len(case.wagers) > 1:
+            yield case.replace(wagers=case.wagers[:i] + case.wagers[i + 1:])
+        for wager in (1, 2, 10):
+            if wager < case.wagers[i]:
+                yield case.replace(wagers=case.wagers[:i] + [wager] + case.wagers[i + 1:])
+    # Simplest rules
+    for name, values in FUZZ_ATTRIBUTES.items():
+        if case.attributes[name] != values[0]:
+            yield case.replace(attributes=dict(case.attributes, **{name: values[0]}))
+    # Fewer hit situations
+    if case.hit_mask:
+        yield case.replace(hit_mask=0)
+        bits = [i for i in range(len(SITUATIONS)) if case.hit_mask >> i & 1]
+        half_mask = sum(1 << i for i in bits[:len(bits) // 2])
+        if half_mask:
+            yield case.replace(hit_mask=half_mask)
+            yield case.replace(hit_mask=case.hit_mask & ~half_mask)
+        for i in bits:
+            yield case.replace(hit_mask=case.hit_mask & ~(1 << i))
+    # Fewer and lower cards
+    for i in range(len(case.ranks)):
+        yield case.replace(ranks=case.ranks[:i])
+    for i, rank in enumerate(case.ranks):
+        yield case.replace(ranks=case.ranks[:i] + case.ranks[i + 1:])
+    for i, rank in enumerate(case.ranks):
+        for simpler_rank in ('2', '10'):
+            if blackjack.card.RANKS.index(simpler_rank) < blackjack.card.RANKS.index(rank):
+                yield case.replace(ranks=case.ranks[:i] + [simpler_rank] + case.ranks[i + 1:])
+
+
+def shrink(case, check):
+    """Return the simplest case found to still diverge, with its description.
+
+    Simpler cases are tried greedily until none of them diverges.
+    """
+    divergence = check(case)
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for simpler_case in _simpler_cases(case):
+            simpler_divergence = check(simpler_case)
+            if simpler_divergence:
+                case, divergence = simpler_case, simpler_divergence
+                shrunk = True
+                break
+    return case, divergence
+
+
+def _fuzz_chunk(check, case_count, seed):
+    """Return first diverging case among random ones, not shrunk, or None."""
+    rng = random.Random(seed)
+    for _ in range(case_count):
+        case = random_case(rng)
+        if check(case):
+            return case
+    return None
+
+
+def fuzz(check, case_count, seed=None, worker_count=1):
+    """Run given check on random cases and return first divergence, shrunk.
+
+    Cases are split into one chunk per worker process, each with its own
+    seed derived from `seed`. Result is a `(case, description)` pair, or None
+    if no case diverged.
+    """
+    if worker_count == 1:
+        case = _fuzz_chunk(check, case_count, seed)
+        return shrink(case, check) if case else None
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(64) for _ in range(worker_count)]
+    chunk_size = -(-case_count // worker_count)
+    with concurrent.futures.ProcessPoolExecutor(worker_count) as executor:
+        futures = [executor.submit(_fuzz_chunk, check, chunk_size, chunk_seed)
+            for chunk_seed in seeds]
+        for future in futures:
+            case = future.result()
+            if case:
+                return shrink(case, check)
+    return None
@@ -1,15 +1,20 @@
 """Rulesets and gameplay implementation."""
 
+import time
+
 import blackjack.player
 import blackjack.score
+import blackjack.sidebet
+import blackjack.strategy
 import blackjack.ui
 
-from blackjack.ui import print
-
 
 class Ruleset(object):
     """Parent type for all rulesets."""
-    pass
+
+    MINIMUM_DEALER_SCORE = blackjack.score.MINIMUM_DEALER_SCORE
+    DEALER_HITS_SOFT_17 = False
+    SIDE_BETS = ()  # names of side bets offered, from `side_bet_map`
 
 
 class BasicRuleset(Ruleset):
@@ -66,167 +71,316 @@ ruleset_map = {
 class Game(object):
     """Complete Blackjack gameplay implementation."""
 
-    def __init__(self, ruleset):
+    def __init__(self, ruleset, recorder=None, snapshotter=None, ui=blackjack.ui,
+            latency=None):
         self.ruleset = ruleset
+        self.ui = ui
+        self.recorder = recorder
+        self.snapshotter = snapshotter
+        self.latency = latency
         self.running = None
+        self._answer_time = 0  # time spent waiting for answers, in nanoseconds
 
     def run(self, table):
         """Run the game on given table while enough players."""
         self.running = True
         while self.running:
-            print('Starting new round…')
+            self._checkpoint(table)
+            self.ui.print('Starting new round…')
             if not any(p.chip_count for p in table.players):
-                print('Everyone is broke here! Bye-bye.')
+                self.ui.print('Everyone is broke here! Bye-bye.')
                 break
             player_count = self._play_new_round(table)
             if not player_count:
-                print('No one wants to play anymore? Let\'s stop the game.')
+                self.ui.print('No one wants to play anymore? Let\'s stop the game.')
                 break
 
     def _play_new_round(self, table):
         """Play a single full game round."""
+        table.shoe.start_round()
+        start = self._start_timer()
         active_players = self._collect_wagers(table)
+        self._stop_timer(table, 'wagers', start)
         if not active_players:
+            table.shoe.end_round()
             return 0
         table.active_players = active_players
+        table.round_true_count = table.shoe.true_count
+        if self.recorder:
+            self.recorder.start_round(self.ruleset, table.round_true_count)
         self._deal_initial_cards(table)
-        for player in table.active_players:
-            self._interact_with_player(table, player)
+        self._finish_round(table)
+        player_count = len(active_players)
+        return player_count
+
+    def _finish_round(self, table, turn=0):
+        """Play current round from given turn until table is cleaned."""
+        for turn in range(turn, len(table.active_players)):
+            table.turn = turn
+            self._checkpoint(table)
+            self._interact_with_player(table, table.active_players[turn])
+        table.turn = len(table.active_players)
+        start = self._start_timer()
         self._interact_with_dealer(table, table.dealer)
+        self._stop_timer(table, 'dealer', start)
+        start = self._start_timer()
         self._pay_gains(table)
+        self._stop_timer(table, 'payout', start)
         self._cleanup(table)
-        player_count = len(active_players)
-        return player_count
+        table.turn = None
+
+    def resume(self, table):
+        """Finish round in progress on given table, if any, then run game."""
+        if table.turn is not None:
+            self.ui.print('Resuming round…')
+            table.shoe.start_round(dealt=True)
+            if self.recorder:
+                self.recorder.start_round(self.ruleset, table.round_true_count)
+            self._finish_round(table, table.turn)
+        self.run(table)
+
+    def _ask(self, *args, **kwargs):
+        """Ask user through UI, keeping track of time spent waiting."""
+        if not self.latency:
+            return self.ui.ask(*args, **kwargs)
+        start = time.perf_counter_ns()
+        answer = self.ui.ask(*args, **kwargs)
+        self._answer_time += time.perf_counter_ns() - start
+        return answer
+
+    def _start_timer(self):
+        """Return start time of an action, if latency is measured."""
+        if not self.latency:
+            return None
+        start = (time.perf_counter_ns(), self._answer_time)
+        return start
+
+    def _stop_timer(self, table, action, start):
+        """Measure latency of given action, not counting answer times."""
+        if start is None:
+            return
+        start_time, answer_time = start
+        duration = time.perf_counter_ns() - start_time - (self._answer_time - answer_time)
+        self.latency.record(table, self.ruleset, action, duration)
+
+    def _checkpoint(self, table):
+        """Let snapshotter capture state of given table, if time has come."""
+        if self.snapshotter:
+            self.snapshotter.checkpoint(table, self.ruleset)
 
     def _collect_wagers(self, table):
         """Collect wagers around table and return active players."""
-        print('Collecting wagers…')
+        self.ui.print('Collecting wagers…')
         active_players = []
         for player in table.players:
-            blackjack.ui.display_player(player)
+            self.ui.display_player(player)
+            if player.betting_policy:
+                chip_count = player.betting_policy.wager(table.shoe.true_count,
+                    player.chip_count, self.ruleset.MINIMUM_WAGER)
+                if not chip_count:
+                    self.ui.print('Player "{}" not playing this round.'.format(player))
+                    continue
+                self.ui.print('Player "{}" bets {} chips.'.format(player, chip_count))
+                player.hand = blackjack.card.Hand()
+                player.bet(chip_count)
+                active_players.append(player)
+                continue
             while True:
-                chip_count = blackjack.ui.ask('How much would you like to bet for that round?',
+                chip_count = self._ask('How much would you like to bet for that round?',
                     type=int, default=self.ruleset.MINIMUM_WAGER)
                 if not chip_count:
-                    print('Player "{}" not playing this round.'.format(player))
+                    self.ui.print('Player "{}" not playing this round.'.format(player))
                     break
                 if chip_count < self.ruleset.MINIMUM_WAGER:
-                    print('Minium bet is {}'.format(self.ruleset.MINIMUM_WAGER))
+                    self.ui.print('Minium bet is {}'.format(self.ruleset.MINIMUM_WAGER))
                     continue
                 if chip_count > player.chip_count:
-                    print('You do not have enough chips! Please lower your bet.')
+                    self.ui.print('You do not have enough chips! Please lower your bet.')
                     continue
                 player.hand = blackjack.card.Hand()
                 player.bet(chip_count)
+                self._collect_side_wagers(player)
                 active_players.append(player)
                 break
         if active_players:
             table.dealer.hand = blackjack.card.Hand()
         return active_players
 
+    def _collect_side_wagers(self, player):
+        """Ask given player for a wager on each side bet of the ruleset.
+
+        A side wager may not exceed the player's main wager.
+        """
+        for name in self.ruleset.SIDE_BETS:
+            while True:
+                chip_count = self._ask('How much would you like to bet on {}?'.format(name),
+                    type=int, default=0)
+                if chip_count < 0:
+                    self.ui.print('A bet cannot be negative.')
+                    continue
+                if chip_count > player.hand.wager:
+                    self.ui.print('Side bets cannot exceed your main bet of {}.'.format(
+                        player.hand.wager))
+                    continue
+                if chip_count > player.chip_count:
+                    self.ui.print('You do not have enough chips! Please lower your bet.')
+                    continue
+                if chip_count:
+                    player.bet_side(name, chip_count)
+                break
+
     def _deal_initial_cards(self, table):
         """Deal two cards to each active players and dealer."""
-        print('Dealing initial two cards…')
+        self.ui.print('Dealing initial two cards…')
         if not self.ruleset.AUTO_SHUFFLING_SHOE:
             table.shoe.shuffle()
+        # Both rounds are drawn at once, in dealing order
+        players = table.active_players
+        seat_count = len(players)
+        hole_card = self.ruleset.DEALER_RECEIVES_HOLE_CARD
+        cards = table.shoe.draw_cards(2 * seat_count + 1 + bool(hole_card), visible=True)
         # First round
-        for player in table.active_players:
-            card = table.shoe.draw_card(visible=True)
+        for player, card in zip(players, cards):
             player.hand.add_card(card)
-        card = table.shoe.draw_card(visible=True)
-        table.dealer.hand.add_card(card)
+        table.dealer.hand.add_card(cards[seat_count])
         # Second round
-        for player in table.active_players:
-            card = table.shoe.draw_card(visible=True)
+        for player, card in zip(players, cards[seat_count + 1:]):
             player.hand.add_card(card)
-            blackjack.ui.display_player(player)
+            self.ui.display_player(player)
         # Second round — Hole card
-        if self.ruleset.DEALER_RECEIVES_HOLE_CARD:
-            card = table.shoe.draw_card(visible=False)
+        if hole_card:
+            card = cards[-1]
+            card.visible = False
             table.dealer.hand.add_card(card)
             if self.ruleset.DEALER_REVEALS_BLACKJACK_HAND:
                 if table.dealer.hand.score == blackjack.score.TARGET_SCORE:
                     table.dealer.hand.reveal_all_cards()
-        blackjack.ui.display_dealer(table.dealer)
+        self.ui.display_dealer(table.dealer)
 
     def _interact_with_player(self, table, player):
         """Deal more cards to given player as requested."""
-        print('Interacting with player "{}"…'.format(player))
+        self.ui.print('Interacting with player "{}"…'.format(player))
         while True:
-            blackjack.ui.display_player(player)
+            self.ui.display_player(player)
             if player.hand.score > blackjack.score.TARGET_SCORE:
-                print('Player\'s hand has gone bust with {} points!'.format(
+                self.ui.print('Player\'s hand has gone bust with {} points!'.format(
                     player.hand.score), color='red')
                 break
-            key = blackjack.ui.ask('[h]it or [s]tand?', choices=['h', 's'], default='h')
+            key = self._ask('[h]it or [s]tand?', choices=['h', 's'], default='h')
+            start = self._start_timer()
             # Hit
             if key == 'h':
                 card = table.shoe.draw_card(visible=True)
                 player.hand.add_card(card)
-                print('Player hit and received a "{}".'.format(card))
+                self.ui.print('Player hit and received a "{}".'.format(card))
+                self._stop_timer(table, 'hit', start)
                 continue
             # Stand
             if key == 's':
-                print('Player stands.')
+                self.ui.print('Player stands.')
+                self._stop_timer(table, 'stand', start)
                 break
 
     def _interact_with_dealer(self, table, dealer):
         """Deal more cards to given dealer as requested."""
-        print('Interacting with dealer…')
+        self.ui.print('Interacting with dealer…')
         if not self.ruleset.DEALER_RECEIVES_HOLE_CARD:
             dealer.hand.add_card(table.shoe.draw_card(visible=True))
         dealer.hand.reveal_all_cards()
-        blackjack.ui.display_dealer(dealer)
+        self.ui.display_dealer(dealer)
+        decisions = blackjack.strategy.dealer_table(self.ruleset)
         while True:
-            if dealer.hand.score > blackjack.score.TARGET_SCORE:
-                print('Dealer has gone bust with {} points'.format(
-                    dealer.hand.score), color='red')
+            score = dealer.hand.score
+            if score > blackjack.score.TARGET_SCORE:
+                self.ui.print('Dealer has gone bust with {} points'.format(score), color='red')
                 break
-            if dealer.hand.score >= blackjack.score.MINIMUM_DEALER_SCORE:
-                print('Dealer stands.')
+            soft = dealer.hand.soft
+            if not decisions[blackjack.strategy.dealer_index(score, soft)]:
+                self.ui.print('Dealer stands.')
                 break
             card = table.shoe.draw_card(visible=True)
             dealer.hand.add_card(card)
-            print('Dealer hit and received a "{}".'.format(card))
-            blackjack.ui.display_dealer(dealer)
+            self.ui.print('Dealer hit and received a "{}".'.format(card))
+            self.ui.display_dealer(dealer)
 
     def _pay_gains(self, table):
         """Pay every winning players."""
-        print('Paying gains…')
-        print('Dealer has {} points with {} cards.'.format(
+        self.ui.print('Paying gains…')
+        self.ui.print('Dealer has {} points with {} cards.'.format(
             table.dealer.hand.score, len(table.dealer.hand)), color='white')
-        for player in table.active_players:
-            outcome, _ = blackjack.score.compare_hands(player.hand, table.dealer.hand)
+        players = table.active_players
+        self._pay_side_bets(table)
+        outcomes = blackjack.score.settle_hands([p.hand for p in players], table.dealer.hand)
+        for player, (outcome, score) in zip(players, outcomes):
             if outcome == blackjack.score.BUST:
                 chip_count = 0
-                print('Player "{}" busted with {} points.'.format(
-                    player, player.hand.score), color='red')
+                self.ui.print('Player "{}" busted with {} points.'.format(
+                    player, score), color='red')
             if outcome == blackjack.score.LOOSE:
                 chip_count = 0
-                print('Player "{}" loses with {} points on {} cards.'.format(
-                    player, player.hand.score, len(player.hand)), color='red')
+                self.ui.print('Player "{}" loses with {} points on {} cards.'.format(
+                    player, score, len(player.hand)), color='red')
             if outcome == blackjack.score.PUSH:
                 chip_count = 0
-                print('Player "{}" is on tie with {} points on {} cards and gets his wager back.'.format(
-                    player, player.hand.score, len(player.hand)), color='yellow')
+                self.ui.print('Player "{}" is on tie with {} points on {} cards and gets his wager back.'.format(
+                    player, score, len(player.hand)), color='yellow')
                 chip_count += player.hand.wager
             if outcome == blackjack.score.WIN:
                 chip_count = player.hand.wager
-                print('Player "{}" wins with {} points on {} cards and earns {} more chips.'.format(
-                    player, player.hand.score, len(player.hand), chip_count), color='green')
+                self.ui.print('Player "{}" wins with {} points on {} cards and earns {} more chips.'.format(
+                    player, score, len(player.hand), chip_count), color='green')
                 chip_count += player.hand.wager
             if outcome == blackjack.score.BLACKJACK:
                 chip_count = int(player.hand.wager * self.ruleset.BLACKJACK_PAYOUT_RATIO)
-                print('Player "{}" does Blackjack and earns {} more chips'.format(
+                self.ui.print('Player "{}" does Blackjack and earns {} more chips'.format(
                     player, chip_count), color='green')
                 chip_count += player.hand.wager
             player.earn(chip_count)
+            if self.recorder:
+                self._record_hand(table, player, outcome, chip_count)
+
+    def _pay_side_bets(self, table):
+        """Pay side bets of every player, from initial cards."""
+        for player in table.active_players:
+            side_wagers = player.hand.side_wagers
+            if not side_wagers:
+                continue
+            upcard_code = blackjack.card.card_code(table.dealer.hand[0])
+            first_code = blackjack.card.card_code(player.hand[0])
+            second_code = blackjack.card.card_code(player.hand[1])
+            for name, wager in side_wagers.items():
+                side_bet = blackjack.sidebet.side_bet_map[name]
+                index = side_bet.settle(first_code, second_code, upcard_code)
+                if index < 0:
+                    self.ui.print('Player "{}" loses {} side bet.'.format(
+                        player, name), color='red')
+                    continue
+                chip_count = side_bet.gain(index, wager)
+                self.ui.print('Player "{}" wins {} side bet with a {} and earns {} more chips.'.format(
+                    player, name, side_bet.PAYOUTS[index][0], chip_count), color='green')
+                player.earn(chip_count + wager)
+
+    def _record_hand(self, table, player, outcome, chip_count):
+        """Record settled hand of given player."""
+        initial_cards = player.hand[:2]
+        self.recorder.record_hand(
+            table.players.index(player),
+            min(table.dealer.hand[0].values),
+            blackjack.score.score_from_hand(initial_cards),
+            blackjack.score.is_soft_hand(initial_cards),
+            player.hand.score,
+            len(player.hand),
+            table.dealer.hand.score,
+            len(table.dealer.hand),
+            player.hand.wager,
+            outcome,
+            chip_count - player.hand.wager)
 
     def _cleanup(self, table):
         """Drop all cards on table."""
-        print('Cleaning table…')
+        self.ui.print('Cleaning table…')
         for player in table.active_players:
             player.drop_hand()
         table.dealer.drop_hand()
-        table.shoe.reload()
+        table.shoe.end_round()
 
@@ -0,0 +1,148 @@
+"""Latency histograms of table actions."""
+
+import array
+
+import blackjack.player
+
+
+ACTIONS = ('wagers', 'hit', 'stand', 'dealer', 'payout')
+
+
+class LatencyHistogram(object):
+    """A histogram of durations, in nanoseconds, with bounded relative error.
+
+    Like an HDR histogram, values are counted in buckets whose width grows
+    with the value: every power of two range is split into `2 ** precision`
+    buckets, so that any recorded value is known within a relative error of
+    `2 ** -precision`, whatever its magnitude. Bucket counts are kept in a
+    flat array that only grows as large values get recorded.
+    """
+
+    def __init__(self, precision=7):
+        self.precision = precision
+        self.counts = array.array('q')
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+
+    def _index(self, value):
+        """Return index of the bucket counting given value."""
+        shift = value.bit_length() - self.precision - 1
+        if shift <= 0:
+            return value
+        index = (shift << self.precision) + (value >> shift)
+        return index
+
+    def _highest_value(self, index):
+        """Return highest value counted in bucket of given index."""
+        sub_bucket_count = 1 << self.precision
+        if index < 2 * sub_bucket_count:
+            return index
+        shift = (index >> self.precision) - 1
+        value = ((index - (shift << self.precision) + 1) << shift) - 1
+        return value
+
+    def record(self, value):
+        """Count one duration, in nanoseconds."""
+        value = max(value, 0)
+        index = self._index(value)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other):
+        """Add counts of another histogram of the same precision."""
+        if other.precision != self.precision:
+            raise ValueError('cannot merge histograms of different precisions')
+        counts = self.counts
+        if len(other.counts) > len(counts):
+            counts.extend([0] * (len(other.counts) - len(counts)))
+        for index, count in enumerate(other.counts):
+            counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                self.minimum = value if self.minimum is None else min(self.minimum, value)
+                self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def percentile(self, percentile):
+        """Return the duration under which given percentage of counts fall."""
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * percentile // 100))
+        cumulated_count = 0
+        for index, count in enumerate(self.counts):
+            cumulated_count += count
+            if cumulated_count >= rank:
+                value = min(self._highest_value(index), self.maximum)
+                return value
+        return self.maximum
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        mean = self.total / self.count
+        return mean
+
+    def __repr__(self):
+        txt = '<Latency Histogram with {} durations>'.format(self.count)
+        return txt
+
+
+class LatencyTracker(object):
+    """Latency histograms of each action, per table and per ruleset.
+
+    Tables are identified by `blackjack.player.TableKeys`, by name or by
+    order of first measure if they have none, and rulesets by type name.
+    """
+
+    def __init__(self, precision=7):
+        self.precision = precision
+        self.by_table = {}  # by table key, then action
+        self.by_ruleset = {}  # by ruleset name, then action
+        self._keys = blackjack.player.TableKeys()
+
+    def key(self, table):
+        """Return the key identifying given table."""
+        key = self._keys.key(table)
+        return key
+
+    def _histogram(self, histograms, key, action):
+        action_histograms = histograms.get(key)
+        if action_histograms is None:
+            action_histograms = histograms[key] = {}
+        histogram = action_histograms.get(action)
+        if histogram is None:
+            histogram = action_histograms[action] = LatencyHistogram(self.precision)
+        return histogram
+
+    def record(self, table, ruleset, action, duration):
+        """Count duration of an action, in nanoseconds, on given table."""
+        self._histogram(self.by_table, self.key(table), action).record(duration)
+        self._histogram(self.by_ruleset, type(ruleset).__name__, action).record(duration)
+
+    def overall(self):
+        """Return histograms of each action merged over all rulesets."""
+        histograms = {}
+        for action_histograms in self.by_ruleset.values():
+            for action, histogram in action_histograms.items():
+                merged = histograms.get(action)
+                if merged is None:
+                    merged = histograms[action] = LatencyHistogram(self.precision)
+                merged.merge(histogram)
+        return histograms
+
+    def __repr__(self):
+        txt = '<Latency Tracker of {} tables>'.format(len(self.by_table))
+        return txt
+
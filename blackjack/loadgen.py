@@ -0,0 +1,91 @@
+"""Load generator measuring latency of table actions under scripted play."""
+
+import argparse
+import random
+
+import blackjack.betting
+import blackjack.card
+import blackjack.game
+import blackjack.latency
+import blackjack.player
+import blackjack.scenario
+import blackjack.strategy
+
+
+PERCENTILES = (50, 99, 99.9)
+CHIP_COUNT = 10 ** 9  # enough for players never to go broke
+
+
+def generate_load(table_count, round_count, ruleset_names=('european',),
+        seat_count=3, seed=None):
+    """Play rounds on many tables in turn and return their latency tracker.
+
+    Each table follows a ruleset picked in turn from given names and seats
+    automated players betting the minimum wager and playing basic strategy.
+    One round is played on every table before the next round starts on the
+    first one, the way a server interleaves its tables.
+    """
+    rng = random.Random(seed)
+    tracker = blackjack.latency.LatencyTracker()
+    games = []
+    for i in range(table_count):
+        ruleset = blackjack.game.ruleset_map[ruleset_names[i % len(ruleset_names)]]()
+        shoe_type = blackjack.card.Shoe
+        if ruleset.AUTO_SHUFFLING_SHOE:
+            shoe_type = blackjack.card.ShufflingShoe
+        players = [blackjack.player.Player('Player {}'.format(j), CHIP_COUNT,
+            blackjack.betting.FlatBetting())
+            for j in range(min(seat_count, ruleset.MAXIMUM_PLAYER_COUNT))]
+        table = blackjack.player.Table(
+            shoe_type.from_template(ruleset.DECK_COUNT_IN_SHOE,
+                rng=random.Random(rng.getrandbits(64))),
+            blackjack.player.Dealer(), players, 'table-{}'.format(i))
+        ui = blackjack.scenario.StrategyUI(table, blackjack.strategy.BASIC_STRATEGY)
+        games.append((blackjack.game.Game(ruleset, ui=ui, latency=tracker), table))
+    for _ in range(round_count):
+        for game, table in games:
+            game._play_new_round(table)
+    return tracker
+
+
+def report(histograms):
+    """Return lines reporting percentiles of each action, in microseconds."""
+    lines = ['{:<8} {:>9} {:>9}'.format('action', 'count', 'mean')
+        + ''.join(' {:>9}'.format('p{:g}'.format(p)) for p in PERCENTILES)]
+    for action in blackjack.latency.ACTIONS:
+        histogram = histograms.get(action)
+        if not histogram:
+            continue
+        lines.append('{:<8} {:>9} {:>9.1f}'.format(action, histogram.count,
+            histogram.mean / 1000) + ''.join(' {:>9.1f}'.format(
+            histogram.percentile(p) / 1000) for p in PERCENTILES))
+    return lines
+
+
+def main():
+
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description='''Measure latency of
+        table actions on many tables played by scripted players.''')
+    parser.add_argument('--tables', type=int, default=100,
+        help='Number of tables to play on. Defaults to 100.')
+    parser.add_argument('--rounds', type=int, default=100,
+        help='Number of rounds to play on each table. Defaults to 100.')
+    parser.add_argument('--seats', type=int, default=3,
+        help='Number of players on each table, within ruleset limits. Defaults to 3.')
+    parser.add_argument('--ruleset', action='append',
+        choices=blackjack.game.ruleset_map.keys(),
+        help='''Ruleset of tables, which may be given several times to mix
+        rulesets. Defaults to "european".''')
+    parser.add_argument('--seed', type=int, help='Seed of card shuffling.')
+    args = parser.parse_args()
+
+    # Generate load and report latencies, in microseconds
+    tracker = generate_load(args.tables, args.rounds,
+        tuple(args.ruleset or ['european']), args.seats, args.seed)
+    print('All tables (µs):')
+    print('\n'.join(report(tracker.overall())))
+    for name, histograms in sorted(tracker.by_ruleset.items()):
+        print()
+        print('{} (µs):'.format(name))
+        print('\n'.join(report(histograms)))
@@ -1,5 +1,8 @@
 """Player, Dealer and Table object definitions."""
 
+import itertools
+import weakref
+
 import blackjack.card
 
 
@@ -11,9 +14,10 @@ class NoEnoughChip(Exception):
 class Player(object):
     """A player with chips and one hand of playing cards."""
 
-    def __init__(self, name, chip_count):
+    def __init__(self, name, chip_count, betting_policy=None):
         self.name = name
         self.chip_count = chip_count
+        self.betting_policy = betting_policy
         self.hand = None
 
     def __str__(self):
@@ -26,6 +30,13 @@ class Player(object):
         self.chip_count -= chip_count
         self.hand.wager = chip_count
 
+    def bet_side(self, name, chip_count):
+        """Bet given amount of chips on side bet of given name if possible."""
+        if chip_count > self.chip_count:
+            raise NoEnoughChip()
+        self.chip_count -= chip_count
+        self.hand.side_wagers[name] = chip_count
+
     def earn(self, chip_count):
         """Receive given amount of chips."""
         self.chip_count += chip_count
@@ -60,15 +71,69 @@ class Dealer(object):
 
 
 class Table(object):
-    """A card table with a shoe, a dealer and some players."""
+    """A card table with a shoe, a dealer and some players.
+
+    While a round is being played, `turn` is the position of the active
+    player whose turn it is, or the number of active players once it is the
+    dealer's turn. Between rounds, it is None. `round_true_count` is the true
+    count of the shoe when the current round was dealt.
+    """
 
-    def __init__(self, shoe, dealer, players):
+    def __init__(self, shoe, dealer, players, name=None):
         self.shoe = shoe
         self.dealer = dealer
         self.players = players
+        self.name = name
         self.active_players = []
+        self.turn = None
+        self.round_true_count = 0
 
     def play(self, game):
         """Run given game on this table."""
         game.run(self)
 
+
+class TableKeys(object):
+    """Keys identifying tables, by name or by order of first request.
+
+    Tables without a name are numbered from a counter, so that a number is
+    never given twice, even once its table is garbage-collected. Their keys
+    start with `UNNAMED_PREFIX`, which names may therefore not start with,
+    and two live tables may not share a name. If given, `on_forget` is
+    called with the key of a table once it is garbage-collected.
+    """
+
+    UNNAMED_PREFIX = '#'
+
+    def __init__(self, on_forget=None):
+        self._keys = weakref.WeakKeyDictionary()  # by table
+        self._tables = weakref.WeakValueDictionary()  # by key
+        self._numbers = itertools.count()
+        self._on_forget = on_forget
+
+    def key(self, table):
+        """Return the key identifying given table."""
+        key = self._keys.get(table)
+        if key is None:
+            if not table.name:
+                key = '{}{}'.format(self.UNNAMED_PREFIX, next(self._numbers))
+            elif table.name.startswith(self.UNNAMED_PREFIX):
+                raise ValueError('table names cannot start with "{}": "{}"'.format(
+                    self.UNNAMED_PREFIX, table.name))
+            elif table.name in self._tables:
+                raise ValueError('another table is named "{}"'.format(table.name))
+            else:
+                key = table.name
+            self._keys[table] = key
+            self._tables[key] = table
+            if self._on_forget:
+                weakref.finalize(table, self._on_forget, key)
+        return key
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        txt = '<Table Keys of {} tables>'.format(len(self))
+        return txt
+
@@ -0,0 +1,111 @@
+"""Scripted players and card orders for deterministic, silent games."""
+
+import blackjack.card
+import blackjack.game
+import blackjack.player
+
+
+class ScriptExhausted(Exception):
+    """Game asked a question that the script does not answer."""
+    pass
+
+
+class ScriptedUI(object):
+    """A user-interface answering questions from a script, displaying nothing.
+
+    Answers are taken in order from given iterable, one per question asked
+    by the game, and checked the same way as `blackjack.ui.ask` does.
+    Messages are kept in `messages` when `keep_messages` is set.
+    """
+
+    def __init__(self, answers, keep_messages=False):
+        self._answers = iter(answers)
+        self.messages = [] if keep_messages else None
+
+    def print(self, msg, color='grey'):
+        if self.messages is not None:
+            self.messages.append(msg)
+
+    def display_player(self, player):
+        pass
+
+    def display_dealer(self, dealer):
+        pass
+
+    def ask(self, msg, type=None, choices=None, default=None):
+        """Return next scripted answer to given question."""
+        try:
+            value = next(self._answers)
+        except StopIteration:
+            raise ScriptExhausted(msg)
+        if type:
+            value = type(value)
+        if choices and value not in choices:
+            raise ValueError('not valid choice: {!r}'.format(value))
+        return value
+
+    def __repr__(self):
+        txt = '<Scripted UI>'
+        return txt
+
+
+class StrategyUI(ScriptedUI):
+    """A scripted user-interface hitting or standing as told by a strategy.
+
+    Questions other than `[h]it or [s]tand?`, such as wagers, are answered
+    from given script. The player whose turn it is on given table decides
+    from his hand and the dealer's upcard, like any automated player.
+    """
+
+    def __init__(self, table, strategy, answers=(), keep_messages=False):
+        super(StrategyUI, self).__init__(answers, keep_messages)
+        self.table = table
+        self.strategy = strategy
+
+    def ask(self, msg, type=None, choices=None, default=None):
+        if choices != ['h', 's']:
+            return super(StrategyUI, self).ask(msg, type, choices, default)
+        hand = self.table.active_players[self.table.turn].hand
+        upcard = min(self.table.dealer.hand[0].values)
+        key = 'h' if self.strategy.hits(hand.score, hand.soft, upcard) else 's'
+        return key
+
+    def __repr__(self):
+        txt = '<Strategy UI following {!r}>'.format(self.strategy)
+        return txt
+
+
+class StackedShoe(blackjack.card.Shoe):
+    """A shoe dealing its cards in given order, never shuffling them."""
+
+    @classmethod
+    def from_ranks(cls, ranks, suit='Spade'):
+        """Return a stacked shoe dealing copies of template cards of given ranks."""
+        template = {card.rank: card for card in blackjack.card.shoe_template(1)
+            if card.suit == suit}
+        shoe = cls([template[rank] for rank in ranks], copy_on_draw=True)
+        return shoe
+
+    def shuffle(self):
+        pass
+
+    def __repr__(self):
+        txt = '<Stacked Shoe with {} remaining cards>'.format(len(self))
+        return txt
+
+
+def run_scenario(ruleset, ranks, answers, chip_counts=(100,)):
+    """Play a single round and return the table once cleaned.
+
+    Cards of given ranks are dealt in that order, to players with given chip
+    counts, who bet and hit or stand following given answers, in the order
+    questions are asked. Players' chip counts then tell their gains.
+    """
+    shoe = StackedShoe.from_ranks(ranks)
+    dealer = blackjack.player.Dealer()
+    players = [blackjack.player.Player('Player {}'.format(i), chip_count)
+        for i, chip_count in enumerate(chip_counts, 1)]
+    table = blackjack.player.Table(shoe, dealer, players)
+    game = blackjack.game.Game(ruleset, ui=ScriptedUI(answers))
+    game._play_new_round(table)
+    return table
@@ -29,6 +29,33 @@ TARGET_SCORE = 21
 MINIMUM_DEALER_SCORE = 17
 
 
+# Values of cards by rank, counting Aces as 1
+HARD_VALUES = {
+    'Ace': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9,
+    '10': 10, 'Jack': 10, 'Queen': 10, 'King': 10,
+}
+
+
+# Hi-Lo card counting system, indexed by rank and by hard value
+HI_LO_TAGS = {
+    'Ace': -1, '2': 1, '3': 1, '4': 1, '5': 1, '6': 1, '7': 0, '8': 0, '9': 0,
+    '10': -1, 'Jack': -1, 'Queen': -1, 'King': -1,
+}
+HI_LO_TAGS_BY_VALUE = (0, -1, 1, 1, 1, 1, 1, 0, 0, 0, -1)
+CARD_COUNT_IN_DECK = 52
+
+
+def true_count(running_count, remaining_card_count):
+    """Return running count divided by number of remaining decks.
+
+    With no remaining cards, the true count is simply the running count.
+    """
+    if not remaining_card_count:
+        return running_count
+    count = running_count * CARD_COUNT_IN_DECK / remaining_card_count
+    return count
+
+
 def score_from_hand(hand):
     """Return best score from given hand or None if unknown.
 
@@ -52,6 +79,14 @@ def score_from_hand(hand):
     return best_score
 
 
+def is_soft_hand(hand):
+    """Tell if best score of given hand counts one of its Aces as 11."""
+    hard_score = sum(min(values_from_card(card)) for card in hand)
+    has_ace = any(card.rank == 'Ace' for card in hand)
+    soft = has_ace and hard_score + 10 <= TARGET_SCORE
+    return soft
+
+
 BUST, LOOSE, PUSH, WIN, BLACKJACK = 0, 1, 2, 3, 4
 
 
@@ -104,6 +139,38 @@ def compare_hands(hand1, hand2):
     return outcome1, outcome2
 
 
+def settle_hands(hands, dealer_hand):
+    """Return outcome and score of each given hand against the same dealer hand.
+
+    Outcomes are the ones `compare_hands` would give for each hand. The
+    dealer's final hand is evaluated once, into the outcome of every player
+    score that neither busts nor makes a blackjack. Each hand is then
+    settled in constant time from its score, which `Hand` keeps up to date
+    while cards are added.
+    """
+    dealer_score = dealer_hand.score
+    dealer_blackjack = dealer_score == TARGET_SCORE and len(dealer_hand) == 2
+    blackjack_outcome = PUSH if dealer_blackjack else BLACKJACK
+    if dealer_blackjack:
+        outcome_by_score = [LOOSE] * (TARGET_SCORE + 1)
+    elif dealer_score > TARGET_SCORE:
+        outcome_by_score = [WIN] * (TARGET_SCORE + 1)
+    else:
+        outcome_by_score = ([LOOSE] * dealer_score + [PUSH]
+            + [WIN] * (TARGET_SCORE - dealer_score))
+    outcomes = []
+    for hand in hands:
+        score = hand.score
+        if score > TARGET_SCORE:
+            outcome = BUST
+        elif score == TARGET_SCORE and len(hand) == 2:
+            outcome = blackjack_outcome
+        else:
+            outcome = outcome_by_score[score]
+        outcomes.append((outcome, score))
+    return outcomes
+
+
 def _safe_operation(func, values):
     """Apply given function on values or return None if no values.
 
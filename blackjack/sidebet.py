@@ -0,0 +1,161 @@
+"""Side bets settled on initial cards with precomputed lookup tables."""
+
+import array
+import functools
+import itertools
+import random
+
+import blackjack.card
+
+
+CARD_CODE_COUNT = len(blackjack.card.SUITS) * len(blackjack.card.RANKS)
+_RED_SUITS = {blackjack.card.SUITS.index('Heart'), blackjack.card.SUITS.index('Diamond')}
+
+
+def _rank_and_suit(code):
+    suit_code, rank_code = divmod(code, len(blackjack.card.RANKS))
+    return rank_code, suit_code
+
+
+class SideBet(object):
+    """Parent type for side bets.
+
+    A side bet is settled as soon as initial cards are dealt, from the first
+    two cards of the player and the dealer's upcard. Each type lists its
+    winning combinations, from best to worst, in `PAYOUTS`, as pairs of
+    combination name and payout ratio. Combinations of every three card
+    codes, as given by `blackjack.card.card_code`, are computed once into a
+    lookup table, so that settling a side bet costs a single lookup.
+    """
+
+    NAME = None
+    PAYOUTS = ()
+
+    def combination(self, first, second, upcard):
+        """Return index in `PAYOUTS` of the combination of given cards, or -1.
+
+        Cards are given as pairs of rank and suit codes.
+        """
+        raise NotImplementedError()
+
+    @property
+    def table(self):
+        table = _table(type(self))
+        return table
+
+    def settle(self, first_code, second_code, upcard_code):
+        """Return index in `PAYOUTS` of the combination of given card codes, or -1."""
+        index = self.table[(first_code * CARD_CODE_COUNT + second_code)
+            * CARD_CODE_COUNT + upcard_code]
+        return index
+
+    def gain(self, index, wager):
+        """Return net gain of given wager on combination of given index."""
+        if index < 0:
+            return -wager
+        gain = int(wager * self.PAYOUTS[index][1])
+        return gain
+
+    def __repr__(self):
+        txt = '<Side Bet "{}">'.format(self.NAME)
+        return txt
+
+
+@functools.lru_cache()
+def _table(side_bet_type):
+    """Return combination of every three card codes, for given side bet type."""
+    side_bet = side_bet_type()
+    cards = [_rank_and_suit(code) for code in range(CARD_CODE_COUNT)]
+    table = array.array('b', (side_bet.combination(first, second, upcard)
+        for first, second, upcard in itertools.product(cards, repeat=3)))
+    return table
+
+
+class PerfectPairs(SideBet):
+    """Pays when the first two cards of the player are of the same rank."""
+
+    NAME = 'perfect-pairs'
+    PAYOUTS = (
+        ('perfect pair', 25),
+        ('colored pair', 12),
+        ('mixed pair', 6),
+    )
+
+    def combination(self, first, second, upcard):
+        (rank, suit), (other_rank, other_suit) = first, second
+        if rank != other_rank:
+            return -1
+        if suit == other_suit:
+            return 0
+        if (suit in _RED_SUITS) == (other_suit in _RED_SUITS):
+            return 1
+        return 2
+
+
+class TwentyOnePlusThree(SideBet):
+    """Pays when the first two cards of the player and the dealer's upcard
+    make a poker hand."""
+
+    NAME = '21+3'
+    PAYOUTS = (
+        ('suited trips', 100),
+        ('straight flush', 40),
+        ('three of a kind', 30),
+        ('straight', 10),
+        ('flush', 5),
+    )
+
+    def combination(self, first, second, upcard):
+        ranks = sorted(rank for rank, _ in (first, second, upcard))
+        flush = first[1] == second[1] == upcard[1]
+        if ranks[0] == ranks[2]:
+            return 0 if flush else 2
+        straight = len(set(ranks)) == 3 and (ranks[2] - ranks[0] == 2
+            or ranks == [0, len(blackjack.card.RANKS) - 2, len(blackjack.card.RANKS) - 1])
+        if straight:
+            return 1 if flush else 3
+        if flush:
+            return 4
+        return -1
+
+
+side_bet_map = {side_bet.NAME: side_bet
+    for side_bet in (PerfectPairs(), TwentyOnePlusThree())}
+
+
+def expected_value(side_bet, deck_count):
+    """Return exact expected gain of a side bet of one chip, with given deck count.
+
+    Every combination of three card codes is weighted by its probability of
+    being dealt from a full shoe, accounting for cards of the same code.
+    """
+    card_count = deck_count * CARD_CODE_COUNT
+    total = 0
+    for (first, second, upcard), index in zip(
+            itertools.product(range(CARD_CODE_COUNT), repeat=3), side_bet.table):
+        way_count = (deck_count * (deck_count - (second == first))
+            * (deck_count - (upcard == first) - (upcard == second)))
+        if way_count > 0:
+            total += way_count * (-1 if index < 0 else side_bet.PAYOUTS[index][1])
+    value = total / (card_count * (card_count - 1) * (card_count - 2))
+    return value
+
+
+def estimate_house_edge(side_bet, deck_count, round_count, seed=None):
+    """Return house edge of a side bet estimated over single-seat rounds.
+
+    As in headless simulations, each round deals from a full shoe, so only
+    the positions of the three cards settling the side bet are drawn.
+    """
+    rng = random.Random(seed)
+    sample = rng.sample
+    positions = range(deck_count * CARD_CODE_COUNT)
+    table = side_bet.table
+    payouts = [ratio for _, ratio in side_bet.PAYOUTS] + [-1]  # -1 at index -1
+    total_gain = 0
+    for _ in range(round_count):
+        first, upcard, second = sample(positions, 3)
+        total_gain += payouts[table[((first % CARD_CODE_COUNT) * CARD_CODE_COUNT
+            + second % CARD_CODE_COUNT) * CARD_CODE_COUNT + upcard % CARD_CODE_COUNT]]
+    edge = -total_gain / round_count
+    return edge
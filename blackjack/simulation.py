@@ -0,0 +1,463 @@
+"""Headless gameplay implementation for fast simulations."""
+
+import array
+import concurrent.futures
+import math
+import os
+import random
+import sys
+
+import blackjack.card
+import blackjack.export
+import blackjack.score
+import blackjack.strategy
+import blackjack.tally
+
+
+def hard_values_from_deck():
+    """Return values of all cards in a standard deck, counting Aces as 1."""
+    values = [min(card.values) for card in blackjack.card.shoe_template(1)]
+    return values
+
+
+def score_from_total(total, has_ace):
+    """Return best score and softness from given hard total.
+
+    Hard total counts every Ace as 1. At most one Ace may ever count as 11,
+    in which case the hand is said to be soft. This is equivalent to
+    `blackjack.score.score_from_hand` but runs in constant time.
+    """
+    if has_ace and total + 10 <= blackjack.score.TARGET_SCORE:
+        return total + 10, True
+    return total, False
+
+
+def outcome_from_scores(score, card_count, dealer_score, dealer_card_count):
+    """Return player's outcome, the same way `compare_hands` would."""
+    target = blackjack.score.TARGET_SCORE
+    if score > target:
+        return blackjack.score.BUST
+    player_blackjack = score == target and card_count == 2
+    dealer_blackjack = dealer_score == target and dealer_card_count == 2
+    if player_blackjack:
+        if dealer_blackjack:
+            return blackjack.score.PUSH
+        return blackjack.score.BLACKJACK
+    if dealer_blackjack:
+        return blackjack.score.LOOSE
+    if dealer_score > target or score > dealer_score:
+        return blackjack.score.WIN
+    if score < dealer_score:
+        return blackjack.score.LOOSE
+    return blackjack.score.PUSH
+
+
+class HeadlessShoe(object):
+    """A shoe of card values dealt by lazy Fisher-Yates shuffling.
+
+    Each draw swaps a randomly chosen remaining card into the next position,
+    so shuffling the shoe back only means resetting that position. Unless a
+    penetration is given, the shoe is shuffled back before every round, just
+    like `Game` reloads and shuffles its shoe on every round.
+    """
+
+    def __init__(self, deck_count, rng=None, penetration=None):
+        self.values = array.array('b', deck_count * hard_values_from_deck())
+        self.rng = rng or random.Random()
+        self.cut = int(len(self.values) * (penetration or 0))
+        self.position = 0
+        self.running_count = 0
+
+    def shuffle(self):
+        """Bring back all dealt cards into the shoe."""
+        self.position = 0
+        self.running_count = 0
+
+    def start_round(self):
+        """Shuffle back dealt cards if the cut card has been reached."""
+        if self.position >= self.cut:
+            self.shuffle()
+
+    def draw(self):
+        """Return value of next card in shoe."""
+        values = self.values
+        position = self.position
+        size = len(values)
+        if position >= size:  # never run out of cards in the middle of a round
+            self.shuffle()
+            position = 0
+        other = position + int(self.rng.random() * (size - position))
+        value = values[other]
+        values[other] = values[position]
+        values[position] = value
+        self.position = position + 1
+        self.running_count += blackjack.score.HI_LO_TAGS_BY_VALUE[value]
+        return value
+
+    @property
+    def true_count(self):
+        count = blackjack.score.true_count(self.running_count, len(self))
+        return count
+
+    def __len__(self):
+        """Return number of remaining cards."""
+        return len(self.values) - self.position
+
+    def __repr__(self):
+        txt = '<Headless Shoe with {} remaining cards>'.format(len(self))
+        return txt
+
+
+class HeadlessGame(object):
+    """Blackjack gameplay implementation without any user-interface.
+
+    Cards are dealt in the same order as in `blackjack.game.Game` and outcomes
+    are resolved the same way, but players are automated by a strategy table
+    and hands are tracked as plain integers instead of `Hand` objects.
+
+    State and results of each seat are kept in typed arrays allocated once,
+    then overwritten by every round, so that `deal_round` allocates nothing
+    that outlives it.
+    """
+
+    def __init__(self, ruleset, strategy=None, rng=None, penetration=None,
+            recorder=None):
+        self.ruleset = ruleset
+        self.strategy = strategy or blackjack.strategy.BASIC_STRATEGY
+        self.recorder = recorder
+        self.shoe = HeadlessShoe(ruleset.DECK_COUNT_IN_SHOE, rng, penetration)
+        self.dealer_table = blackjack.strategy.dealer_table(ruleset)
+        self.upcard = None
+        self.dealer_score = None
+        self.dealer_card_count = None
+        self._allocate(1)
+
+    def _allocate(self, seat_count):
+        """Allocate per-seat buffers for given number of seats."""
+        self.totals = array.array('b', [0]) * seat_count
+        self.has_aces = array.array('b', [0]) * seat_count
+        self.initial_scores = array.array('b', [0]) * seat_count
+        self.initial_softs = array.array('b', [0]) * seat_count
+        self.scores = array.array('b', [0]) * seat_count
+        self.card_counts = array.array('b', [0]) * seat_count
+        self.outcomes = array.array('b', [0]) * seat_count
+        self.gains = array.array('q', [0]) * seat_count
+
+    def deal_round(self, wagers):
+        """Play a single full round, leaving results of each seat in buffers.
+
+        The first `len(wagers)` items of `scores`, `card_counts`, `outcomes`
+        and `gains`, among others, then hold the results of each seat, while
+        `upcard`, `dealer_score` and `dealer_card_count` describe the dealer.
+        Settled hands are given to the recorder, if any.
+        """
+        seat_count = len(wagers)
+        if seat_count > len(self.gains):
+            self._allocate(seat_count)
+        shoe = self.shoe
+        draw = shoe.draw
+        target = blackjack.score.TARGET_SCORE
+        table = self.strategy.table
+        index = self.strategy.index
+        dealer_table = self.dealer_table
+        totals = self.totals
+        has_aces = self.has_aces
+        scores = self.scores
+        card_counts = self.card_counts
+        shoe.start_round()
+        if self.recorder:
+            self.recorder.start_round(self.ruleset, shoe.true_count)
+
+        # Deal initial cards
+        for seat in range(seat_count):
+            totals[seat] = draw()
+        upcard = draw()
+        for seat in range(seat_count):
+            first = totals[seat]
+            value = draw()
+            totals[seat] = first + value
+            has_aces[seat] = first == 1 or value == 1
+        dealer_total = upcard
+        dealer_has_ace = upcard == 1
+        if self.ruleset.DEALER_RECEIVES_HOLE_CARD:
+            value = draw()
+            dealer_total += value
+            dealer_has_ace = dealer_has_ace or value == 1
+
+        # Play each seat
+        for seat in range(seat_count):
+            total = totals[seat]
+            has_ace = has_aces[seat]
+            card_count = 2
+            score, soft = score_from_total(total, has_ace)
+            self.initial_scores[seat] = score
+            self.initial_softs[seat] = soft
+            while score < target and table[index(score, soft, upcard)]:
+                value = draw()
+                total += value
+                has_ace = has_ace or value == 1
+                card_count += 1
+                score, soft = score_from_total(total, has_ace)
+            scores[seat] = score
+            card_counts[seat] = card_count
+
+        # Play dealer
+        dealer_card_count = 2
+        if not self.ruleset.DEALER_RECEIVES_HOLE_CARD:
+            value = draw()
+            dealer_total += value
+            dealer_has_ace = dealer_has_ace or value == 1
+        dealer_score, dealer_soft = score_from_total(dealer_total, dealer_has_ace)
+        while dealer_table[2 * dealer_score + dealer_soft]:
+            value = draw()
+            dealer_total += value
+            dealer_has_ace = dealer_has_ace or value == 1
+            dealer_card_count += 1
+            dealer_score, dealer_soft = score_from_total(dealer_total, dealer_has_ace)
+        self.upcard = upcard
+        self.dealer_score = dealer_score
+        self.dealer_card_count = dealer_card_count
+
+        # Settle each seat
+        outcomes = self.outcomes
+        gains = self.gains
+        gain_from_outcome = self.gain_from_outcome
+        for seat in range(seat_count):
+            outcome = outcome_from_scores(
+                scores[seat], card_counts[seat], dealer_score, dealer_card_count)
+            outcomes[seat] = outcome
+            gains[seat] = gain_from_outcome(outcome, wagers[seat])
+        if self.recorder:
+            self._record_hands(wagers)
+
+    def _record_hands(self, wagers):
+        """Give settled hands of the round to the recorder."""
+        for seat in range(len(wagers)):
+            self.recorder.record_hand(seat, self.upcard,
+                self.initial_scores[seat], bool(self.initial_softs[seat]),
+                self.scores[seat], self.card_counts[seat], self.dealer_score,
+                self.dealer_card_count, wagers[seat], self.outcomes[seat],
+                self.gains[seat])
+
+    def play_round(self, wagers):
+        """Play a single full round and return net gain of each seat."""
+        self.deal_round(wagers)
+        gains = self.gains[:len(wagers)].tolist()
+        return gains
+
+    def gain_from_outcome(self, outcome, wager):
+        """Return net gain of given wager, the same way `Game` pays it."""
+        if outcome == blackjack.score.BLACKJACK:
+            return int(wager * self.ruleset.BLACKJACK_PAYOUT_RATIO)
+        if outcome == blackjack.score.WIN:
+            return wager
+        if outcome == blackjack.score.PUSH:
+            return 0
+        return -wager
+
+    def __repr__(self):
+        txt = '<Headless Game with {}>'.format(type(self.ruleset).__name__)
+        return txt
+
+
+EDGE_WAGER = 1000  # large enough for Blackjack payouts not to be rounded
+
+
+def estimate_house_edge(ruleset, round_count, strategy=None, seed=None):
+    """Return house edge estimated over given number of single-seat rounds.
+
+    House edge is the average fraction of a wager lost by the player, so a
+    negative house edge means the player has the advantage.
+    """
+    game = HeadlessGame(ruleset, strategy, random.Random(seed))
+    deal_round = game.deal_round
+    gains = game.gains
+    wagers = [EDGE_WAGER]
+    total_gain = 0
+    for _ in range(round_count):
+        deal_round(wagers)
+        total_gain += gains[0]
+    edge = -total_gain / (round_count * EDGE_WAGER)
+    return edge
+
+
+def _play_chunk(ruleset, round_count, strategy_name, seed, recorder=None):
+    """Return tallies of a chunk of rounds, in `TALLY_FIELDS` order.
+
+    Gains are those of single-seat rounds wagering `EDGE_WAGER`. Settled
+    hands are given to the recorder, if any.
+    """
+    strategy = blackjack.strategy.strategy_map[strategy_name]
+    game = HeadlessGame(ruleset, strategy, random.Random(seed), recorder=recorder)
+    deal_round = game.deal_round
+    gains = game.gains
+    wagers = [EDGE_WAGER]
+    total_gain = total_squared_gain = win_count = loss_count = 0
+    for _ in range(round_count):
+        deal_round(wagers)
+        gain = gains[0]
+        total_gain += gain
+        total_squared_gain += gain * gain
+        if gain > 0:
+            win_count += 1
+        elif gain < 0:
+            loss_count += 1
+    push_count = round_count - win_count - loss_count
+    return (round_count, total_gain, total_squared_gain, win_count, push_count,
+        loss_count)
+
+
+EXECUTION_MODES = ('process', 'thread', 'interpreter')
+
+
+def gil_enabled():
+    """Return whether the GIL is enabled, as it always is before Python 3.13."""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    enabled = is_gil_enabled() if is_gil_enabled else True
+    return enabled
+
+
+def _executor(mode, worker_count):
+    """Return a pool of given number of workers, for given execution mode."""
+    if mode == 'process':
+        return concurrent.futures.ProcessPoolExecutor(worker_count)
+    if mode == 'thread':
+        return concurrent.futures.ThreadPoolExecutor(worker_count)
+    if mode == 'interpreter':
+        executor_type = getattr(concurrent.futures, 'InterpreterPoolExecutor', None)
+        if executor_type is None:
+            raise ValueError('interpreter mode needs Python 3.14 or later')
+        return executor_type(worker_count)
+    raise ValueError('unknown execution mode: {!r}'.format(mode))
+
+
+def _play_chunks(ruleset, chunks, strategy_name, tallies_name, slot_count, index,
+        hands_path=None):
+    """Play chunks of rounds in a worker, adding tallies to its slot.
+
+    Each chunk is played by its own `HeadlessGame`, with its own random
+    generator and shoe of plain card values, so workers share no mutable
+    state but their slot-separated tallies, whether they are processes,
+    threads or subinterpreters. If `hands_path` is given, settled hands are
+    recorded to a file of the worker's own.
+    """
+    tallies = blackjack.tally.SharedTallies(slot_count, tallies_name)
+    recorder = None
+    try:
+        if hands_path:
+            recorder = blackjack.export.HandRecorder(_worker_hands_path(hands_path, index))
+        for round_count, seed in chunks:
+            tallies.add(index, _play_chunk(ruleset, round_count, strategy_name, seed,
+                recorder))
+    finally:
+        if recorder:
+            recorder.close()
+        tallies.close()
+
+
+def _worker_hands_path(hands_path, index):
+    path = '{}.{}'.format(hands_path, index)
+    return path
+
+
+class SimulationProgress(object):
+    """Running tallies of a batch simulation, and the house edge they give."""
+
+    def __init__(self, round_count):
+        self.round_count = round_count
+        self.played_count = 0
+        self.total_gain = 0
+        self.total_squared_gain = 0
+        self.win_count = 0
+        self.push_count = 0
+        self.loss_count = 0
+
+    def add(self, played_count, total_gain, total_squared_gain, win_count,
+            push_count, loss_count):
+        self.played_count += played_count
+        self.total_gain += total_gain
+        self.total_squared_gain += total_squared_gain
+        self.win_count += win_count
+        self.push_count += push_count
+        self.loss_count += loss_count
+
+    @property
+    def house_edge(self):
+        if not self.played_count:
+            return None
+        edge = -self.total_gain / (self.played_count * EDGE_WAGER)
+        return edge
+
+    @property
+    def standard_error(self):
+        """Return standard error of the house edge estimate."""
+        n = self.played_count
+        if n < 2:
+            return None
+        mean = self.total_gain / n
+        variance = (self.total_squared_gain - n * mean * mean) / (n - 1)
+        error = math.sqrt(max(variance, 0) / n) / EDGE_WAGER
+        return error
+
+    def __repr__(self):
+        txt = '<Simulation Progress of {}/{} rounds>'.format(
+            self.played_count, self.round_count)
+        return txt
+
+
+def simulate(ruleset, round_count, strategy_name='basic', seed=None,
+        worker_count=1, chunk_size=20000, poll_interval=0.2, mode='process',
+        hands_path=None):
+    """Play single-seat rounds in chunks and yield progress as they are played.
+
+    Every chunk deals from its own seed, derived from `seed`, so that final
+    tallies do not depend on the number of workers the chunks are spread
+    over. With a single worker, progress is yielded after each chunk.
+    Otherwise, workers add their tallies to `SharedTallies` and progress is
+    read from it every `poll_interval` seconds, until all workers are done.
+
+    Workers are processes, threads or subinterpreters, depending on `mode`,
+    one of `EXECUTION_MODES`. Threads only run in parallel on free-threaded
+    builds of Python, see `gil_enabled`, and subinterpreters need Python
+    3.14 or later.
+
+    If `hands_path` is given, every settled hand is recorded there by a
+    `blackjack.export.HandRecorder`. Each worker records its own file,
+    which are concatenated once all workers are done, worker after worker.
+    """
+    rng = random.Random(seed)
+    chunks = []
+    for start in range(0, round_count, chunk_size):
+        chunks.append((min(chunk_size, round_count - start), rng.getrandbits(64)))
+    progress = SimulationProgress(round_count)
+    if worker_count == 1:
+        recorder = blackjack.export.HandRecorder(hands_path) if hands_path else None
+        try:
+            for chunk_round_count, chunk_seed in chunks:
+                progress.add(*_play_chunk(ruleset, chunk_round_count, strategy_name,
+                    chunk_seed, recorder))
+                yield progress
+        finally:
+            if recorder:
+                recorder.close()
+        return
+    with blackjack.tally.SharedTallies(worker_count) as tallies:
+        with _executor(mode, worker_count) as executor:
+            futures = [executor.submit(_play_chunks, ruleset, chunks[i::worker_count],
+                strategy_name, tallies.name, worker_count, i, hands_path)
+                for i in range(worker_count)]
+            done = False
+            while not done:
+                _, pending = concurrent.futures.wait(futures, poll_interval)
+                done = not pending
+                for future in futures:
+                    if future.done():
+                        future.result()  # raise any worker error
+                progress = SimulationProgress(round_count)
+                progress.add(*tallies.totals())
+                yield progress
+    if hands_path:
+        paths = [_worker_hands_path(hands_path, i) for i in range(worker_count)]
+        blackjack.export.concatenate_hands(paths, hands_path)
+        for path in paths:
+            os.remove(path)
@@ -0,0 +1,327 @@
+"""Incremental snapshots of running games, and resuming from them."""
+
+import json
+import os
+import queue
+import random
+import struct
+import threading
+import time
+
+import blackjack.card
+import blackjack.game
+import blackjack.player
+import blackjack.sweep
+
+
+MAGIC = b'BJSNAP2\n'
+_HEADER = struct.Struct('<HHI')
+_REMAINING = struct.Struct('<i?')  # running count, and whether yet to be shuffled
+
+
+def _encode_json(obj):
+    data = json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    return data
+
+
+def _encode_hand(hand):
+    if hand is None:
+        return None
+    obj = {
+        'cards': [[blackjack.card.card_code(c), c.visible] for c in hand],
+        'wager': hand.wager,
+        'side_wagers': hand.side_wagers,
+    }
+    return obj
+
+
+def _decode_hand(obj):
+    if obj is None:
+        return None
+    hand = blackjack.card.Hand()
+    for code, visible in obj['cards']:
+        card = blackjack.card.card_from_code(code)
+        card.visible = visible
+        hand.add_card(card)
+    hand.wager = obj['wager']
+    hand.side_wagers = obj.get('side_wagers', {})
+    return hand
+
+
+def _encode_cards(cards):
+    data = bytes(blackjack.card.card_code(c) for c in cards)
+    return data
+
+
+def _decode_cards(data, copy_on_draw):
+    """Return cards from their codes, sharing template cards if possible."""
+    if copy_on_draw:
+        template = blackjack.card.shoe_template(1)
+        cards = [template[code] for code in data]
+    else:
+        cards = [blackjack.card.card_from_code(code) for code in data]
+        for card in cards:
+            card.visible = False
+    return cards
+
+
+class Snapshotter(object):
+    """Write snapshots of running tables to an append-only log file.
+
+    The state of a table is split into sections: its ruleset, its players
+    and dealer, its shoe type, the cards its shoe reloads from, the cards
+    remaining in its shoe with the running count, and the state of the
+    shoe's own random number generator, if any. A lazy shuffle is saved as
+    is, so that taking a snapshot never changes the cards dealt next. Sections are encoded
+    on the calling thread, but only those which changed since the previous
+    snapshot of the same table are queued. A background thread then appends
+    them to the log file, so that checkpointing never waits on disk.
+
+    Each log record is a header of three little-endian integers, giving the
+    lengths of the table key, section name and section data, followed by
+    these three byte strings. Tables are keyed by `blackjack.player.TableKeys`,
+    by name or by order of first snapshot if they have none. Betting
+    policies are not saved.
+    """
+
+    def __init__(self, path, interval=0):
+        self.path = path
+        self.interval = interval
+        self.record_count = 0
+        self._keys = blackjack.player.TableKeys(self._forget)
+        self._sections = {}  # last data written, by table key and section
+        self._times = {}  # last snapshot time, by table key
+        self._shoes = {}  # shoe whose cards were last written, by table key
+        self._rulesets = {}  # encoded ruleset by ruleset object
+        self._queue = queue.Queue()
+        self._file = open(path, 'ab')
+        if not self._file.tell():
+            self._file.write(MAGIC)
+        self._thread = threading.Thread(target=self._write_records, daemon=True)
+        self._thread.start()
+
+    def _write_records(self):
+        """Append queued records to log file, until told to stop."""
+        while True:
+            records = [self._queue.get()]
+            while True:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in records
+            self._file.write(b''.join(r for r in records if r is not None))
+            self._file.flush()
+            for _ in records:
+                self._queue.task_done()
+            if stop:
+                break
+
+    def key(self, table):
+        """Return the key identifying given table in log file."""
+        key = self._keys.key(table)
+        return key
+
+    def _forget(self, key):
+        """Forget what was written about a garbage-collected table."""
+        self._sections.pop(key, None)
+        self._times.pop(key, None)
+        self._shoes.pop(key, None)
+
+    def _encode_ruleset(self, ruleset):
+        data = self._rulesets.get(ruleset)
+        if data is None:
+            data = _encode_json({
+                'name': type(ruleset).__name__,
+                'attributes': blackjack.sweep.ruleset_attributes(ruleset),
+            })
+            self._rulesets[ruleset] = data
+        return data
+
+    def _encode_table(self, table):
+        players = table.players
+        obj = {
+            'name': table.name,
+            'players': [{
+                'name': p.name,
+                'chip_count': p.chip_count,
+                'hand': _encode_hand(p.hand),
+            } for p in players],
+            'dealer': {
+                'name': table.dealer.name,
+                'hand': _encode_hand(table.dealer.hand),
+            },
+            'active': [players.index(p) for p in table.active_players],
+            'turn': table.turn,
+            'round_true_count': table.round_true_count,
+        }
+        data = _encode_json(obj)
+        return data
+
+    def capture(self, table, ruleset):
+        """Queue sections of given table which changed since last snapshot."""
+        key = self.key(table)
+        shoe = table.shoe
+        last_sections = self._sections.setdefault(key, {})
+        shoe_obj = {
+            'type': type(shoe).__name__,
+            'copy_on_draw': shoe._copy_on_draw,
+        }
+        if isinstance(shoe, blackjack.card.SharedShoe):
+            shoe_obj['penetration'] = shoe.penetration
+        sections = [
+            ('ruleset', self._encode_ruleset(ruleset)),
+            ('table', self._encode_table(table)),
+            ('shoe', _encode_json(shoe_obj)),
+        ]
+        if self._shoes.get(key) is not shoe:
+            sections.append(('cards', _encode_cards(shoe._cards)))
+            self._shoes[key] = shoe
+        remaining_cards, shuffled = shoe.unshuffled_cards()
+        sections.append(('remaining', _REMAINING.pack(shoe.running_count, shuffled)
+            + _encode_cards(remaining_cards)))
+        if shoe.rng is not None:
+            sections.append(('rng', _encode_json(shoe.rng.getstate())))
+
+        encoded_key = key.encode('utf-8')
+        records = []
+        for section, data in sections:
+            if last_sections.get(section) == data:
+                continue
+            last_sections[section] = data
+            encoded_section = section.encode('utf-8')
+            records.append(_HEADER.pack(len(encoded_key), len(encoded_section),
+                len(data)) + encoded_key + encoded_section + data)
+        if records:
+            self._queue.put(b''.join(records))
+            self.record_count += len(records)
+        self._times[key] = time.monotonic()
+
+    def checkpoint(self, table, ruleset):
+        """Capture given table unless it was captured less than `interval` ago."""
+        last_time = self._times.get(self.key(table))
+        if last_time is not None and time.monotonic() - last_time < self.interval:
+            return
+        self.capture(table, ruleset)
+
+    def flush(self):
+        """Wait until all queued sections have been written."""
+        self._queue.join()
+
+    def close(self):
+        """Write all queued sections, then close log file."""
+        if self._file.closed:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        txt = '<Snapshotter "{}" with {} records>'.format(self.path, self.record_count)
+        return txt
+
+
+def read_sections(path):
+    """Return latest data of each section, by table key and section name.
+
+    A record truncated by an interrupted write is ignored.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('not a snapshot file: "{}"'.format(path))
+        data = f.read()
+    sections = {}
+    position = 0
+    while position + _HEADER.size <= len(data):
+        key_length, section_length, data_length = _HEADER.unpack_from(data, position)
+        position += _HEADER.size
+        end = position + key_length + section_length + data_length
+        if end > len(data):
+            break
+        key = data[position:position + key_length].decode('utf-8')
+        position += key_length
+        section = data[position:position + section_length].decode('utf-8')
+        position += section_length
+        sections.setdefault(key, {})[section] = data[position:end]
+        position = end
+    return sections
+
+
+def _decode_ruleset(data):
+    """Return a ruleset instance with saved rules, reusing known types."""
+    obj = json.loads(data.decode('utf-8'))
+    name = obj['name']
+    attributes = {attribute: tuple(value) if isinstance(value, list) else value
+        for attribute, value in obj['attributes'].items()}  # JSON has no tuples
+    ruleset_type = getattr(blackjack.game, name, None)
+    if not (isinstance(ruleset_type, type)
+            and blackjack.sweep.ruleset_attributes(ruleset_type) == attributes):
+        ruleset_type = type(name, (blackjack.game.Ruleset,), attributes)
+    ruleset = ruleset_type()
+    return ruleset
+
+
+def _decode_table(sections):
+    obj = json.loads(sections['shoe'].decode('utf-8'))
+    shoe_type = getattr(blackjack.card, obj['type'])
+    copy_on_draw = obj['copy_on_draw']
+    options = {}
+    if 'penetration' in obj:
+        options['penetration'] = obj['penetration']
+    rng = None
+    if 'rng' in sections:
+        version, internal_state, gauss_next = json.loads(sections['rng'].decode('utf-8'))
+        rng = random.Random()
+        rng.setstate((version, tuple(internal_state), gauss_next))
+    shoe = shoe_type(_decode_cards(sections['cards'], copy_on_draw),
+        copy_on_draw=copy_on_draw, rng=rng, **options)
+    remaining = sections['remaining']
+    running_count, shuffled = _REMAINING.unpack_from(remaining)
+    shoe.restore(_decode_cards(remaining[_REMAINING.size:], copy_on_draw),
+        running_count, shuffled)
+
+    obj = json.loads(sections['table'].decode('utf-8'))
+    dealer = blackjack.player.Dealer(obj['dealer']['name'])
+    dealer.hand = _decode_hand(obj['dealer']['hand'])
+    players = []
+    for player_obj in obj['players']:
+        player = blackjack.player.Player(player_obj['name'], player_obj['chip_count'])
+        player.hand = _decode_hand(player_obj['hand'])
+        players.append(player)
+    table = blackjack.player.Table(shoe, dealer, players, obj['name'])
+    table.active_players = [players[i] for i in obj['active']]
+    table.turn = obj['turn']
+    table.round_true_count = obj['round_true_count']
+    return table
+
+
+def load_snapshots(path):
+    """Return latest `(table, ruleset)` pair saved in log file, by table key.
+
+    A table restored in the middle of a round is resumed with `Game.resume`.
+    """
+    snapshots = {}
+    for key, sections in read_sections(path).items():
+        snapshots[key] = (_decode_table(sections), _decode_ruleset(sections['ruleset']))
+    return snapshots
+
+
+def compact(path):
+    """Rewrite log file with only the latest data of each section."""
+    sections = read_sections(path)
+    temporary_path = '{}.tmp'.format(path)
+    with open(temporary_path, 'wb') as f:
+        f.write(MAGIC)
+        for key, table_sections in sections.items():
+            encoded_key = key.encode('utf-8')
+            for section, data in table_sections.items():
+                encoded_section = section.encode('utf-8')
+                f.write(_HEADER.pack(len(encoded_key), len(encoded_section), len(data)))
+                f.write(encoded_key + encoded_section + data)
+    os.replace(temporary_path, path)
@@ -0,0 +1,120 @@
+"""Hit or stand decision tables for automated players and dealers."""
+
+import functools
+
+import blackjack.score
+
+
+UPCARDS = range(1, 11)  # Ace counts as 1
+
+
+def _index(score, soft, upcard):
+    """Return position of given situation in a decision table."""
+    index = (2 * score + bool(soft)) * 11 + upcard
+    return index
+
+
+TABLE_SIZE = _index(blackjack.score.TARGET_SCORE, True, 10) + 1
+
+
+class Strategy(object):
+    """A hit or stand decision table.
+
+    Decisions are stored in a flat `bytearray` indexed by the player's score,
+    the softness of his hand and the value of the dealer's upcard, counting
+    Aces as 1. Headless engines read `table` directly with `index()` in their
+    inner loop instead of calling `hits()`.
+    """
+
+    def __init__(self, name, hit_situations):
+        self.name = name
+        self.table = bytearray(TABLE_SIZE)
+        for score, soft, upcard in hit_situations:
+            self.table[_index(score, soft, upcard)] = 1
+
+    index = staticmethod(_index)
+
+    def hits(self, score, soft, upcard):
+        """Tell if player should hit in given situation."""
+        if score >= blackjack.score.TARGET_SCORE:
+            return False
+        hit = bool(self.table[_index(score, soft, upcard)])
+        return hit
+
+    def __repr__(self):
+        txt = '<Strategy "{}">'.format(self.name)
+        return txt
+
+
+def _basic_hit_situations():
+    """Yield situations where basic strategy hits, without double or split."""
+    for upcard in UPCARDS:
+        dealer_is_weak = 2 <= upcard <= 6
+        # Hard hands
+        for score in range(2, blackjack.score.TARGET_SCORE):
+            if score <= 11:
+                yield score, False, upcard
+            elif score == 12 and upcard not in (4, 5, 6):
+                yield score, False, upcard
+            elif score <= 16 and not dealer_is_weak:
+                yield score, False, upcard
+        # Soft hands
+        for score in range(12, blackjack.score.TARGET_SCORE):
+            if score <= 17:
+                yield score, True, upcard
+            elif score == 18 and upcard in (1, 9, 10):
+                yield score, True, upcard
+
+
+BASIC_STRATEGY = Strategy('basic', _basic_hit_situations())
+
+
+def _dealer_hit_situations():
+    """Yield situations where the dealer would hit, whatever the upcard."""
+    for upcard in UPCARDS:
+        for score in range(2, blackjack.score.MINIMUM_DEALER_SCORE):
+            yield score, False, upcard
+            yield score, True, upcard
+
+
+MIMIC_DEALER_STRATEGY = Strategy('mimic-dealer', _dealer_hit_situations())
+
+
+strategy_map = {
+    'basic': BASIC_STRATEGY,
+    'mimic-dealer': MIMIC_DEALER_STRATEGY,
+}
+
+
+DEALER_TABLE_SIZE = 2 * (blackjack.score.TARGET_SCORE + 11)
+
+
+def dealer_index(score, soft):
+    """Return position of given situation in a dealer decision table."""
+    index = 2 * score + bool(soft)
+    return index
+
+
+@functools.lru_cache()
+def _dealer_table(minimum_score, hits_soft_minimum_score):
+    """Return dealer's decisions for given dealer rules."""
+    table = bytearray(DEALER_TABLE_SIZE)
+    for score in range(minimum_score):
+        table[dealer_index(score, False)] = 1
+        table[dealer_index(score, True)] = 1
+    if hits_soft_minimum_score:
+        table[dealer_index(minimum_score, True)] = 1
+    return bytes(table)
+
+
+def dealer_table(ruleset):
+    """Return dealer's hit or stand decisions compiled for given ruleset.
+
+    The dealer has no choice: he hits below `MINIMUM_DEALER_SCORE` and stands
+    otherwise, except on a soft hand scoring exactly `MINIMUM_DEALER_SCORE`
+    if `DEALER_HITS_SOFT_17` is set. Decisions are stored as `bytes` indexed
+    by `dealer_index(score, soft)`, and shared between rulesets with the same
+    dealer rules. Every engine plays the dealer by reading this same table.
+    """
+    table = _dealer_table(ruleset.MINIMUM_DEALER_SCORE, ruleset.DEALER_HITS_SOFT_17)
+    return table
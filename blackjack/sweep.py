@@ -0,0 +1,140 @@
+"""Rule-variation sweeps with cached house edge evaluations."""
+
+import concurrent.futures
+import hashlib
+import itertools
+import shelve
+
+import blackjack.game
+import blackjack.simulation
+import blackjack.strategy
+
+
+SWEEP_ATTRIBUTES = (
+    'DECK_COUNT_IN_SHOE',
+    'BLACKJACK_PAYOUT_RATIO',
+    'DEALER_RECEIVES_HOLE_CARD',
+    'MINIMUM_DEALER_SCORE',
+    'DEALER_HITS_SOFT_17',
+)
+
+
+def ruleset_attributes(ruleset):
+    """Return all rule attributes of given ruleset, including inherited ones."""
+    attributes = {name: getattr(ruleset, name)
+        for name in dir(ruleset) if name.isupper()}
+    return attributes
+
+
+def ruleset_fingerprint(ruleset):
+    """Return a digest identifying given ruleset by its rule attributes.
+
+    Two rulesets share the same fingerprint as soon as all their rules are
+    equal, whatever their name or the way they were built.
+    """
+    attributes = sorted(ruleset_attributes(ruleset).items())
+    txt = ';'.join('{}={!r}'.format(name, value) for name, value in attributes)
+    fingerprint = hashlib.sha1(txt.encode('utf-8')).hexdigest()
+    return fingerprint
+
+
+def make_ruleset(base, attributes):
+    """Return a new ruleset type overriding given attributes of base ruleset."""
+    name = '{}Variant'.format(base.__name__)
+    ruleset = type(name, (base,), dict(attributes))
+    return ruleset
+
+
+def make_rulesets(base, grid):
+    """Yield a ruleset type for each cell of given grid of attribute values.
+
+    The grid maps attribute names, usually from `SWEEP_ATTRIBUTES`, to the
+    sequence of values to be tried for that attribute.
+    """
+    names = sorted(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        yield make_ruleset(base, zip(names, values))
+
+
+def _evaluate(base, attributes, round_count, strategy_name, seed):
+    """Return house edge of a ruleset, in a worker process."""
+    ruleset = make_ruleset(base, attributes)()
+    strategy = blackjack.strategy.strategy_map[strategy_name]
+    edge = blackjack.simulation.estimate_house_edge(
+        ruleset, round_count, strategy, seed)
+    return edge
+
+
+class SweepCache(object):
+    """An on-disk store of house edges, keyed by ruleset fingerprint."""
+
+    def __init__(self, path):
+        self.path = path
+        self._shelf = shelve.open(path)
+
+    @staticmethod
+    def key(ruleset, round_count, strategy_name, seed):
+        txt = '{}:{}:{}:{}'.format(
+            ruleset_fingerprint(ruleset), round_count, strategy_name, seed)
+        return txt
+
+    def get(self, key):
+        return self._shelf.get(key)
+
+    def set(self, key, edge):
+        self._shelf[key] = edge
+        self._shelf.sync()
+
+    def close(self):
+        self._shelf.close()
+
+    def __repr__(self):
+        txt = '<Sweep Cache "{}">'.format(self.path)
+        return txt
+
+
+def sweep(grid, base=blackjack.game.EuropeanRuleset, round_count=100000,
+        strategy_name='basic', seed=0, cache_path=None, worker_count=None):
+    """Return house edge of every ruleset in given grid of attribute values.
+
+    Rulesets are evaluated in parallel worker processes, with the same seed
+    for every cell so that differences between cells are not blurred by
+    different card sequences. If `cache_path` is given, house edges are
+    looked up in and stored to an on-disk cache, so that cells computed once
+    are never computed again. Result is a list of `(ruleset, edge)` pairs, in
+    grid order.
+    """
+    rulesets = list(make_rulesets(base, grid))
+    cache = SweepCache(cache_path) if cache_path else None
+    edges = {}
+    try:
+        # Look up cells already computed
+        keys = [SweepCache.key(r, round_count, strategy_name, seed) for r in rulesets]
+        if cache:
+            for key in keys:
+                edge = cache.get(key)
+                if edge is not None:
+                    edges[key] = edge
+
+        # Compute missing cells in parallel
+        missing = [(key, ruleset) for key, ruleset in zip(keys, rulesets)
+            if key not in edges]
+        if missing:
+            with concurrent.futures.ProcessPoolExecutor(worker_count) as executor:
+                futures = {}
+                for key, ruleset in missing:
+                    attributes = {name: getattr(ruleset, name) for name in grid}
+                    future = executor.submit(_evaluate, base, attributes,
+                        round_count, strategy_name, seed)
+                    futures[future] = key
+                for future in concurrent.futures.as_completed(futures):
+                    key = futures[future]
+                    edges[key] = future.result()
+                    if cache:
+                        cache.set(key, edges[key])
+    finally:
+        if cache:
+            cache.close()
+
+    results = [(ruleset, edges[key]) for ruleset, key in zip(rulesets, keys)]
+    return results
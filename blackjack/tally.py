@@ -0,0 +1,73 @@
+"""Result tallies shared between worker processes without serialization."""
+
+import multiprocessing.shared_memory
+
+
+TALLY_FIELDS = ('round_count', 'total_gain', 'total_squared_gain',
+    'win_count', 'push_count', 'loss_count')
+_ITEM_SIZE = 8  # signed 64-bit integers
+
+
+class SharedTallies(object):
+    """A shared memory block of result tallies, one slot per worker.
+
+    Each slot holds one signed 64-bit integer per field of `TALLY_FIELDS`.
+    Every worker only ever writes its own slot, so no lock is needed, and
+    the parent sums all slots whenever it wants, even while workers are
+    still running. Workers attach to the block by name.
+
+    A slot is written from its last field to its first, so that a live read
+    never counts rounds whose gains are not added yet.
+    """
+
+    def __init__(self, slot_count, name=None):
+        self.slot_count = slot_count
+        size = slot_count * len(TALLY_FIELDS) * _ITEM_SIZE
+        self._owner = name is None
+        self._memory = multiprocessing.shared_memory.SharedMemory(
+            name, create=self._owner, size=size)
+        self._items = self._memory.buf.cast('q')
+        if self._owner:
+            for i in range(len(self._items)):
+                self._items[i] = 0
+
+    @property
+    def name(self):
+        return self._memory.name
+
+    def slot(self, index):
+        """Return tallies of given slot, in `TALLY_FIELDS` order."""
+        start = index * len(TALLY_FIELDS)
+        tallies = tuple(self._items[start:start + len(TALLY_FIELDS)])
+        return tallies
+
+    def add(self, index, tallies):
+        """Add given tallies, in `TALLY_FIELDS` order, to those of given slot."""
+        start = index * len(TALLY_FIELDS)
+        items = self._items
+        for i in reversed(range(len(TALLY_FIELDS))):
+            items[start + i] += tallies[i]
+
+    def totals(self):
+        """Return tallies summed over all slots."""
+        field_count = len(TALLY_FIELDS)
+        items = self._items.tolist()
+        totals = tuple(sum(items[i::field_count]) for i in range(field_count))
+        return totals
+
+    def close(self):
+        """Detach from the block, and free it if it was created here."""
+        self._items.release()
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        txt = '<Shared Tallies "{}" of {} slots>'.format(self.name, self.slot_count)
+        return txt
@@ -0,0 +1,244 @@
+"""Unit-tests for blackjack/advisor.py module."""
+
+import random
+import sys
+import threading
+import unittest
+
+import blackjack.advisor
+import blackjack.card
+import blackjack.game
+import blackjack.player
+
+
+SIX_DECKS = (24,) * 9 + (96,)
+S17 = (17, False)
+H17 = (17, True)
+
+
+class TestDealerOutcomes(unittest.TestCase):
+
+    def test_probabilities(self):
+        for upcard in range(1, 11):
+            outcomes = blackjack.advisor.dealer_outcomes(
+                upcard, upcard == 1, 1, SIX_DECKS, S17, False)
+            self.assertEqual(len(outcomes), 7)
+            self.assertAlmostEqual(sum(outcomes), 1.)
+
+    def test_blackjack(self):
+        outcomes = blackjack.advisor.dealer_outcomes(10, False, 1, SIX_DECKS, S17, False)
+        self.assertAlmostEqual(outcomes[-1], 24 / 312)
+
+    def test_no_blackjack(self):
+        outcomes = blackjack.advisor.dealer_outcomes(10, False, 1, SIX_DECKS, S17, True)
+        self.assertEqual(outcomes[-1], 0.)
+        self.assertAlmostEqual(sum(outcomes), 1.)
+
+    def test_hits_soft_17(self):
+        s17 = blackjack.advisor.dealer_outcomes(6, False, 1, SIX_DECKS, S17, False)
+        h17 = blackjack.advisor.dealer_outcomes(6, False, 1, SIX_DECKS, H17, False)
+        self.assertGreater(s17[0], h17[0])  # less final 17 when hitting soft 17
+
+    def test_only_one_card_left(self):
+        counts = (0,) * 9 + (1,)
+        outcomes = blackjack.advisor.dealer_outcomes(7, False, 1, counts, S17, False)
+        self.assertEqual(outcomes, (1., 0., 0., 0., 0., 0., 0.))
+
+
+class TestStandValue(unittest.TestCase):
+
+    def setUp(self):
+        # Dealer ends on 17, 18, 19, 20, 21, bust or Blackjack
+        self.dealer = (.1, .1, .1, .1, .1, .4, .1)
+
+    def test_bust(self):
+        self.assertEqual(blackjack.advisor.stand_value(22, 3, self.dealer, 1.5), -1.)
+
+    def test_blackjack(self):
+        self.assertAlmostEqual(blackjack.advisor.stand_value(21, 2, self.dealer, 1.5), 1.35)
+
+    def test_score(self):
+        self.assertAlmostEqual(blackjack.advisor.stand_value(19, 3, self.dealer, 1.5), .3)
+        self.assertAlmostEqual(blackjack.advisor.stand_value(16, 3, self.dealer, 1.5), -.2)
+
+
+class TestAdvise(unittest.TestCase):
+
+    def setUp(self):
+        self.ruleset = blackjack.game.EuropeanRuleset()
+        self.shoe = blackjack.card.Shoe.from_template(6)
+        self.dealer = blackjack.player.Dealer()
+        self.dealer.hand = blackjack.card.Hand()
+        self.player = blackjack.player.Player('John', 20)
+        self.player.hand = blackjack.card.Hand()
+        self.table = blackjack.player.Table(self.shoe, self.dealer, [self.player])
+
+    def deal(self, player_ranks, dealer_ranks, hole_rank=None):
+        for rank in player_ranks:
+            self.player.hand.add_card(blackjack.card.Card('Heart', rank))
+        for rank in dealer_ranks:
+            self.dealer.hand.add_card(blackjack.card.Card('Spade', rank))
+        if hole_rank:
+            card = blackjack.card.Card('Spade', hole_rank)
+            card.visible = False
+            self.dealer.hand.add_card(card)
+
+    def advise(self):
+        values = blackjack.advisor.advise(self.table, self.player, self.ruleset)
+        return values
+
+    def test_legal_actions(self):
+        self.deal(['10', '6'], ['10'])
+        self.assertEqual(set(self.advise()), {'h', 's'})
+
+    def test_hit_low_hand(self):
+        self.deal(['2', '3'], ['10'])
+        values = self.advise()
+        self.assertGreater(values['h'], values['s'])
+
+    def test_stand_high_hand(self):
+        self.deal(['10', 'King'], ['6'])
+        values = self.advise()
+        self.assertGreater(values['s'], values['h'])
+
+    def test_bust_hand(self):
+        self.deal(['10', 'King', '5'], ['6'])
+        self.assertEqual(self.advise(), {})
+
+    def test_composition_dependent(self):
+        self.shoe = blackjack.card.Shoe([blackjack.card.Card('Club', '10') for _ in range(10)])
+        self.table.shoe = self.shoe
+        self.deal(['10', '2'], ['6'])
+        values = self.advise()
+        self.assertEqual(values['h'], -1.)  # next card is a 10
+        self.assertEqual(values['s'], 1.)   # dealer hits 16 with a 10
+
+    def test_hidden_hole_card_is_unknown(self):
+        self.shoe = blackjack.card.Shoe([blackjack.card.Card('Club', '10') for _ in range(10)])
+        self.table.shoe = self.shoe
+        self.ruleset.DEALER_REVEALS_BLACKJACK_HAND = False
+        self.deal(['10', '2'], ['6'], hole_rank='5')
+        values = self.advise()
+        self.assertGreater(values['h'], -1.)  # next card may be the 5
+
+    def test_revealed_dealer_blackjack(self):
+        self.deal(['10', '2'], ['Ace', 'King'])
+        self.assertEqual(self.advise(), {'h': -1., 's': -1.})
+
+    def test_revealed_dealer_blackjack_against_player_blackjack(self):
+        self.deal(['10', 'Ace'], ['Ace', 'King'])
+        self.assertEqual(self.advise(), {'h': -1., 's': 0.})
+
+    def test_dealer_would_have_revealed_blackjack(self):
+        self.ruleset.DEALER_REVEALS_BLACKJACK_HAND = True
+        self.deal(['10', '9'], ['Ace'], hole_rank='9')
+        values1 = self.advise()
+        self.ruleset.DEALER_REVEALS_BLACKJACK_HAND = False
+        values2 = self.advise()
+        self.assertGreater(values1['s'], values2['s'])
+
+    def test_cached(self):
+        self.deal(['10', '6'], ['10'])
+        self.advise()
+        hits_before = blackjack.advisor.decision_values.cache_info().hits
+        self.advise()
+        self.assertGreater(blackjack.advisor.decision_values.cache_info().hits, hits_before)
+
+    def test_decision_cache(self):
+        cache = blackjack.advisor.DecisionCache()
+        self.deal(['10', '6'], ['10'])
+        values = blackjack.advisor.advise(self.table, self.player, self.ruleset, cache)
+        self.assertEqual(values, self.advise())
+        blackjack.advisor.advise(self.table, self.player, self.ruleset, cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.shoe.draw_card()
+        blackjack.advisor.advise(self.table, self.player, self.ruleset, cache)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 2, 2))
+        self.assertEqual(cache.hit_rate, 1 / 3)
+
+
+class TestRoundValue(unittest.TestCase):
+
+    def setUp(self):
+        self.counts = (1,) * 9 + (4,)
+
+    def test_only_tens(self):
+        counts = (0,) * 9 + (16,)
+        self.assertEqual(blackjack.advisor.round_value(counts, S17, 1.5), 0.)
+
+    def test_blackjack_payout(self):
+        value = blackjack.advisor.round_value(self.counts, S17, 1.5)
+        self.assertGreater(blackjack.advisor.round_value(self.counts, S17, 2.), value)
+
+    def test_dealer_cache(self):
+        dealer_cache = {}
+        value = blackjack.advisor.round_value(self.counts, S17, 1.5, dealer_cache)
+        self.assertEqual(value, blackjack.advisor.round_value(self.counts, S17, 1.5))
+        self.assertTrue(dealer_cache)
+
+    def test_dealer_cache_shared_between_compositions(self):
+        dealer_cache = {}
+        for value in range(1, 11):
+            counts = blackjack.advisor.remove_card(self.counts, value)
+            blackjack.advisor.round_value(counts, S17, 1.5, dealer_cache)
+        single_cache = {}
+        blackjack.advisor.round_value(self.counts, S17, 1.5, single_cache)
+        self.assertLess(len(dealer_cache), 10 * len(single_cache))
+
+
+class TestDecisionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = blackjack.advisor.DecisionCache(capacity=2)
+
+    def test_lookup(self):
+        self.assertIsNone(self.cache.hit_rate)
+        self.assertEqual(self.cache.lookup('a', 1, lambda: (0., 1.)), (0., 1.))
+        self.assertEqual(self.cache.lookup('a', 1, lambda: None), (0., 1.))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_clock_eviction(self):
+        self.cache.table('a')
+        self.cache.table('b')
+        self.cache.table('a')  # referenced since last scan
+        self.cache.table('c')  # evicts 'b'
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(len(self.cache), 2)
+        table = self.cache.table('a')
+        table[1] = (0., 1.)
+        self.assertIs(self.cache.table('a'), table)
+        self.assertEqual(self.cache.table('b'), {})
+        self.assertEqual(self.cache.evictions, 2)
+
+    def test_concurrent_lookups(self):
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # force threads to interleave
+        self.addCleanup(sys.setswitchinterval, switch_interval)
+        cache = blackjack.advisor.DecisionCache(capacity=8)
+        errors = []
+
+        def query(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(20000):
+                    key = rng.randrange(32)
+                    situation = rng.randrange(4)
+                    values = cache.lookup(key, situation, lambda: (key, situation))
+                    if values != (key, situation):
+                        errors.append(values)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=query, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(cache.hits + cache.misses, 8 * 20000)
+        self.assertEqual(len(cache), 8)
+        self.assertEqual(sorted(cache._slots.values()), list(range(8)))
+        self.assertEqual({cache._keys[slot]: slot for slot in range(8)}, cache._slots)
+
+    def test_repr(self):
+        self.assertIn('0/2 tables', repr(self.cache))
@@ -0,0 +1,95 @@
+"""Unit-tests for blackjack/bankroll.py module."""
+
+import unittest
+import unittest.mock
+import warnings
+
+import blackjack.bankroll
+import blackjack.betting
+import blackjack.game
+
+
+class TestSimulateBankrolls(unittest.TestCase):
+
+    def setUp(self):
+        self.ruleset = blackjack.game.InsightRuleset()
+
+    def simulate(self, **kwargs):
+        options = dict(trajectory_count=200, chip_count=10, round_count=100, seed=0)
+        options.update(kwargs)
+        results = blackjack.bankroll.simulate_bankrolls(self.ruleset, **options)
+        return results
+
+    def test_ruined_trajectories_stop_playing(self):
+        results = self.simulate()
+        self.assertGreater(results.risk_of_ruin, 0)
+        for i in range(results.trajectory_count):
+            if results.exits[i] == blackjack.bankroll.RUINED:
+                self.assertEqual(results.round_counts[i], results.ruin_rounds[i])
+                self.assertLess(results.chip_counts[i], self.ruleset.MINIMUM_WAGER)
+
+    def test_broke_from_start(self):
+        results = self.simulate(chip_count=0)
+        self.assertEqual(results.risk_of_ruin, 1)
+        self.assertEqual(sum(results.round_counts), 0)
+
+    def test_stop_win(self):
+        results = self.simulate(stop_win=3)
+        for i in range(results.trajectory_count):
+            if results.exits[i] == blackjack.bankroll.STOPPED_WIN:
+                self.assertGreaterEqual(results.chip_counts[i], 13)
+
+    def test_stop_loss(self):
+        results = self.simulate(stop_loss=3)
+        self.assertEqual(results.risk_of_ruin, 0)
+        self.assertIn(blackjack.bankroll.STOPPED_LOSS, results.exits)
+
+    def test_betting_policy(self):
+        policy = blackjack.betting.FlatBetting(5)
+        results = self.simulate(betting_policy=policy)
+        self.assertGreater(results.risk_of_ruin, self.simulate().risk_of_ruin)
+
+    def test_bet_ramp_without_penetration(self):
+        policy = blackjack.betting.BetRamp({0: 1, 2: 4})
+        with self.assertWarns(RuntimeWarning):
+            self.simulate(betting_policy=policy)
+
+    def test_bet_ramp_with_penetration(self):
+        policy = blackjack.betting.BetRamp({0: 1, 2: 4})
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            results = self.simulate(betting_policy=policy, penetration=0.75)
+            self.simulate(betting_policy=blackjack.betting.FlatBetting(2))
+        flat_results = self.simulate(penetration=0.75)
+        self.assertNotEqual(list(results.chip_counts), list(flat_results.chip_counts))
+
+    def test_uncompiled_betting_policy(self):
+        policy = unittest.mock.Mock(spec=blackjack.betting.BettingPolicy)
+        policy.compile.return_value = None
+        policy.wager.return_value = 0
+        results = self.simulate(betting_policy=policy)
+        self.assertTrue(policy.wager.called)
+        self.assertEqual(sum(results.round_counts), 0)
+
+    def test_drawdown(self):
+        results = self.simulate()
+        self.assertGreaterEqual(results.maximum_drawdown, 10)
+
+    def test_session_lengths(self):
+        results = self.simulate()
+        lengths = results.session_lengths()
+        self.assertEqual(sum(lengths.values()), results.trajectory_count)
+        self.assertLessEqual(max(lengths), 100)
+
+    def test_ruin_times(self):
+        results = self.simulate()
+        ruined_count = sum(results.ruin_times().values())
+        self.assertEqual(ruined_count, results.exits.count(blackjack.bankroll.RUINED))
+
+    def test_reproducible(self):
+        results1 = self.simulate()
+        results2 = self.simulate()
+        self.assertEqual(results1.chip_counts, results2.chip_counts)
+
+    def test_repr(self):
+        self.assertIn('200', repr(self.simulate()))
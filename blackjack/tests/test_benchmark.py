@@ -0,0 +1,47 @@
+"""Unit-tests for blackjack/benchmark.py module."""
+
+import unittest
+import unittest.mock
+
+import blackjack.benchmark
+
+
+class TestMeasure(unittest.TestCase):
+
+    def test_thread_mode(self):
+        measures = blackjack.benchmark.measure('thread', 'european', 2000, 2, seed=0)
+        self.assertEqual(measures['mode'], 'thread')
+        self.assertEqual(measures['round_count'], 2000)
+        self.assertGreater(measures['rounds_per_second'], 0)
+        self.assertGreater(measures['memory'], 0)
+
+    def test_same_results_in_every_mode(self):
+        house_edges = {blackjack.benchmark.measure(mode, 'european', 2000, 2,
+            seed=0)['house_edge'] for mode in ('process', 'thread')}
+        self.assertEqual(len(house_edges), 1)
+
+
+class TestMeasureSettlement(unittest.TestCase):
+
+    def test(self):
+        measures = blackjack.benchmark.measure_settlement(7, 100, seed=0)
+        self.assertEqual(measures['seat_count'], 7)
+        self.assertGreater(measures['compare_hands'], 0)
+        self.assertGreater(measures['settle_hands'], 0)
+
+    def test_blocks(self):
+        with unittest.mock.patch('blackjack.benchmark._deal_settlement_round',
+                wraps=blackjack.benchmark._deal_settlement_round) as deal:
+            measures = blackjack.benchmark.measure_settlement(3, 25, seed=0, block_size=10)
+        self.assertEqual(deal.call_count, 25)
+        self.assertEqual(measures['round_count'], 25)
+        self.assertGreater(measures['settle_hands'], 0)
+
+
+class TestReport(unittest.TestCase):
+
+    def test(self):
+        lines = blackjack.benchmark.report([{'mode': 'thread', 'worker_count': 4,
+            'rounds_per_second': 1000., 'memory': 2048, 'house_edge': .005}])
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1].split(), ['thread', '4', '1000', '2.0', '0.500%'])
@@ -0,0 +1,62 @@
+"""Unit-tests for blackjack/betting.py module."""
+
+import unittest
+
+import blackjack.betting
+
+
+class TestBettingPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = blackjack.betting.BettingPolicy()
+
+    def test_wager(self):
+        with self.assertRaises(NotImplementedError):
+            self.policy.wager(0, 100, 1)
+
+    def test_no_compiled_ramp(self):
+        self.assertIsNone(self.policy.compile(1))
+
+
+class TestBetRamp(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = blackjack.betting.BetRamp({-1: 0, 1: 1, 2: 2, 4: 8})
+
+    def test_wager(self):
+        self.assertEqual(self.policy.wager(2.5, 100, 5), 10)
+
+    def test_missing_count(self):
+        self.assertEqual(self.policy.wager(3, 100, 5), 10)
+
+    def test_clamped_count(self):
+        self.assertEqual(self.policy.wager(-7, 100, 5), 0)
+        self.assertEqual(self.policy.wager(12, 100, 5), 40)
+
+    def test_wager_bounded_by_chip_count(self):
+        self.assertEqual(self.policy.wager(4, 17, 5), 17)
+
+    def test_sit_out_if_broke(self):
+        self.assertEqual(self.policy.wager(4, 4, 5), 0)
+
+    def test_compiled_ramp_agrees(self):
+        ramp = self.policy.compile(5)
+        for true_count in range(-10, 10):
+            for chip_count in (3, 17, 100):
+                wager = blackjack.betting.wager_from_ramp(ramp, true_count, chip_count, 5)
+                self.assertEqual(wager, self.policy.wager(true_count, chip_count, 5))
+
+    def test_is_flat(self):
+        self.assertFalse(self.policy.is_flat)
+        self.assertTrue(blackjack.betting.FlatBetting(3).is_flat)
+
+    def test_repr(self):
+        self.assertIn('8', repr(self.policy))
+
+
+class TestFlatBetting(unittest.TestCase):
+
+    def test_wager(self):
+        policy = blackjack.betting.FlatBetting(2)
+        self.assertEqual(policy.wager(-3, 100, 5), 10)
+        self.assertEqual(policy.wager(3, 100, 5), 10)
@@ -1,10 +1,16 @@
 """Unit-tests for blackjack/card.py module."""
 
+import collections
 import copy
 import itertools
+import random
+import sys
+import threading
 import unittest
+import unittest.mock
 
 import blackjack.card
+import blackjack.score
 
 
 class TestCard(unittest.TestCase):
@@ -27,6 +33,13 @@ class TestCard(unittest.TestCase):
     def test_values(self):
         self.assertTrue(self.card.values)
 
+    def test_copy(self):
+        card = copy.copy(self.card)
+        self.assertIsNot(card, self.card)
+        self.assertEqual(card.name, self.card.name)
+        card.visible = not self.card.visible
+        self.assertNotEqual(card.visible, self.card.visible)
+
     def test_repr_face_up(self):
         self.card.visible = True
         self.assertIn('face up', repr(self.card))
@@ -87,10 +100,164 @@ class TestShoe(unittest.TestCase):
         intersection = set.intersection(dealt_card, remaining_cards)
         self.assertEqual(len(intersection), 0)
 
+    def test_composition(self):
+        self.shoe.draw_card()  # Ace of Spades
+        counts = self.shoe.composition()
+        self.assertEqual(counts, [3, 4, 4, 4, 4, 4, 4, 4, 4, 16])
+        self.assertEqual(len(self.shoe), 51)
+        self.assertEqual(self.shoe.draw_card().name, '2 of Spades')
+
+    def test_composition_hash(self):
+        self.shoe.shuffle()
+        self.shoe.draw_card()
+        self.shoe.draw_cards(5)
+        self.assertEqual(self.shoe.composition_hash,
+            blackjack.card.composition_hash(self.shoe.composition()))
+        self.shoe.reload()
+        self.assertEqual(self.shoe.composition_hash,
+            blackjack.card.composition_hash([4] * 9 + [16]))
+
+    def test_composition_hash_after_restore(self):
+        other = blackjack.card.Shoe(blackjack.card.Deck())
+        self.shoe.draw_card()  # Ace of Spades
+        other.restore(list(reversed(other.remaining_cards()))[1:], 0)  # No King of Clubs
+        self.assertNotEqual(other.composition_hash, self.shoe.composition_hash)
+        self.shoe.restore(self.shoe.remaining_cards(), 0)
+        self.assertEqual(self.shoe.composition_hash,
+            blackjack.card.composition_hash([3, 4, 4, 4, 4, 4, 4, 4, 4, 16]))
+
+    def test_add_to_composition_hash(self):
+        counts = [3, 4, 4, 4, 4, 4, 4, 4, 4, 16]
+        h = blackjack.card.add_to_composition_hash(
+            blackjack.card.composition_hash(counts), 1, 3)
+        self.assertEqual(h, blackjack.card.composition_hash([4] * 9 + [16]))
+
+    def test_running_count(self):
+        for _ in range(5):
+            self.shoe.draw_card()  # Ace, 2, 3, 4, 5 of Spades
+        self.assertEqual(self.shoe.running_count, 3)
+        self.assertEqual(self.shoe.true_count, 3 * 52 / 47)
+        self.shoe.reload()
+        self.assertEqual(self.shoe.running_count, 0)
+
+    def test_reload_brings_back_order(self):
+        self.shoe.shuffle()
+        self.shoe.draw_card()
+        self.shoe.reload()
+        self.assertEqual([c.name for c in self.shoe], [c.name for c in self.deck])
+
+    def test_lazy_shuffle(self):
+        with unittest.mock.patch('random.shuffle') as shuffle:
+            self.shoe.shuffle()
+            cards = list(self.shoe)
+        self.assertFalse(shuffle.called)
+        self.assertCountEqual(cards, self.deck)
+        self.assertNotEqual(cards, list(self.deck))
+
+    def test_lazy_shuffle_is_uniform(self):
+        orders = collections.Counter()
+        for _ in range(6000):
+            shoe = blackjack.card.Shoe(self.deck[:3], copy_on_draw=True)
+            shoe.shuffle()
+            orders[tuple(card.rank for card in shoe)] += 1
+        self.assertEqual(len(orders), 6)
+        for count in orders.values():
+            self.assertLess(abs(count - 1000), 150)
+
+    def test_draw_cards(self):
+        cards = self.shoe.draw_cards(5, visible=True)
+        self.assertEqual(cards, self.deck[:5])
+        self.assertTrue(all(card.visible for card in cards))
+        self.assertEqual(len(self.shoe), 47)
+        self.assertEqual(self.shoe.running_count, 3)
+        self.assertIs(self.shoe.draw_card(), self.deck[5])
+
+    def test_draw_shuffled_cards(self):
+        self.shoe.shuffle()
+        cards = self.shoe.draw_cards(10) + list(self.shoe)
+        self.assertCountEqual(cards, self.deck)
+        self.assertNotEqual(cards, list(self.deck))
+
+    def test_draw_too_many_cards(self):
+        self.shoe.draw_cards(50)
+        with self.assertRaises(StopIteration):
+            self.shoe.draw_cards(3)
+        self.assertEqual(len(self.shoe), 2)
+
+    def test_draw_copied_cards(self):
+        shoe = blackjack.card.Shoe.from_template(1)
+        cards = shoe.draw_cards(2, visible=True)
+        self.assertEqual([c.name for c in cards], ['Ace of Spades', '2 of Spades'])
+        self.assertFalse(any(c.visible for c in blackjack.card.shoe_template(1)))
+
+    def test_remaining_cards_in_drawing_order(self):
+        self.shoe.shuffle()
+        self.shoe.draw_card()
+        remaining_cards = self.shoe.remaining_cards()
+        self.assertEqual(len(remaining_cards), 51)
+        self.assertEqual(list(self.shoe), remaining_cards)
+
     def test_repr(self):
         self.assertIn(str(len(self.shoe)), repr(self.shoe))
 
 
+class TestShoeFromTemplate(unittest.TestCase):
+
+    def setUp(self):
+        self.shoe = blackjack.card.Shoe.from_template(6)
+
+    def test_size(self):
+        self.assertEqual(len(self.shoe), 6 * 52)
+
+    def test_template_is_cached(self):
+        template = blackjack.card.shoe_template(6)
+        self.assertIs(blackjack.card.shoe_template(6), template)
+        self.assertEqual(len(set(template)), 52)
+
+    def test_template_composition(self):
+        counts, composition_hash = blackjack.card.template_composition(6)
+        self.assertIs(blackjack.card.template_composition(6)[0], counts)
+        template = blackjack.card.shoe_template(6)
+        self.assertEqual(list(counts), blackjack.card.cards_composition(template))
+        self.assertEqual(self.shoe.composition(), list(counts))
+        self.assertEqual(self.shoe.composition_hash, composition_hash)
+        shared_shoe = blackjack.card.SharedShoe.from_template(6)
+        self.assertEqual(shared_shoe.composition_hash, composition_hash)
+
+    def test_template_composition_is_not_counted_again(self):
+        with unittest.mock.patch('blackjack.card.cards_composition') as cards_composition:
+            blackjack.card.Shoe.from_template(6)
+        self.assertFalse(cards_composition.called)
+
+    def test_template_cards_are_face_down(self):
+        template = blackjack.card.shoe_template(6)
+        self.assertFalse(any(card.visible for card in template))
+
+    def test_template_cards_are_not_mutated(self):
+        card = self.shoe.draw_card(visible=True)
+        self.assertTrue(card.visible)
+        self.assertNotIn(card, blackjack.card.shoe_template(6))
+        self.assertFalse(any(c.visible for c in blackjack.card.shoe_template(6)))
+
+    def test_shoes_are_independent(self):
+        other_shoe = blackjack.card.Shoe.from_template(6)
+        self.shoe.shuffle()
+        self.shoe.draw_card()
+        self.assertEqual(len(other_shoe), 6 * 52)
+
+    def test_seeded_shoes_deal_same_cards(self):
+        shoes = [blackjack.card.ShufflingShoe.from_template(6, rng=random.Random(3))
+            for _ in range(2)]
+        for shoe in shoes:
+            shoe.draw_card()
+        self.assertEqual(*[shoe.remaining_cards() for shoe in shoes])
+
+    def test_shuffling_shoe(self):
+        shoe = blackjack.card.ShufflingShoe.from_template(1)
+        self.assertIsInstance(shoe, blackjack.card.ShufflingShoe)
+        self.assertEqual(len(shoe), 52)
+
+
 class TestShufflingShoe(unittest.TestCase):
 
     def setUp(self):
@@ -105,6 +272,112 @@ class TestShufflingShoe(unittest.TestCase):
         self.assertIn(str(len(self.shoe)), repr(self.shoe))
 
 
+class TestSharedShoe(unittest.TestCase):
+
+    def setUp(self):
+        self.deck_count = 8
+        self.cards = [copy.copy(card)
+            for card in self.deck_count * blackjack.card.Deck()]
+        self.shoe = blackjack.card.SharedShoe(self.cards)
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # force threads to interleave
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def draw_concurrently(self, shoe, thread_count=16):
+        drawn_cards = []
+
+        def draw_all_cards():
+            cards = []
+            while True:
+                try: cards.append(shoe.draw_card(visible=True))
+                except StopIteration:
+                    break
+            drawn_cards.extend(cards)
+
+        threads = [threading.Thread(target=draw_all_cards)
+            for _ in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return drawn_cards
+
+    def test_no_card_dealt_twice(self):
+        drawn_cards = self.draw_concurrently(self.shoe)
+        self.assertEqual(len(drawn_cards), len(self.cards))
+        self.assertEqual(len(self.shoe), 0)
+        name_counts = collections.Counter(card.name for card in drawn_cards)
+        self.assertEqual(set(name_counts.values()), {self.deck_count})
+
+    def test_no_card_dealt_twice_while_shuffling(self):
+        shoe = blackjack.card.SharedShufflingShoe(self.cards)
+        drawn_cards = self.draw_concurrently(shoe)
+        name_counts = collections.Counter(card.name for card in drawn_cards)
+        self.assertEqual(set(name_counts.values()), {self.deck_count})
+
+    def test_no_card_dealt_twice_in_batches(self):
+        drawn_cards = []
+
+        def draw_batches():
+            cards = []
+            while True:
+                try: cards.extend(self.shoe.draw_cards(4, visible=True))
+                except StopIteration:
+                    break
+            drawn_cards.extend(cards)
+
+        threads = [threading.Thread(target=draw_batches) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(drawn_cards), len(self.cards))
+        name_counts = collections.Counter(card.name for card in drawn_cards)
+        self.assertEqual(set(name_counts.values()), {self.deck_count})
+
+    def test_composition(self):
+        self.assertEqual(sum(self.shoe.composition()), len(self.cards))
+
+    def test_shoe_cards_are_not_mutated(self):
+        card = self.shoe.draw_card(visible=True)
+        self.assertTrue(card.visible)
+        self.assertNotIn(card, self.cards)
+        self.assertFalse(any(c.visible for c in self.cards))
+
+    def test_never_reloaded_at_end_of_round(self):
+        self.shoe.start_round()
+        self.shoe.draw_cards(10)
+        self.shoe.end_round()
+        self.assertEqual(len(self.shoe), len(self.cards) - 10)
+
+    def test_reloaded_at_cut_card(self):
+        self.shoe.draw_cards(len(self.cards) * 3 // 4)
+        self.shoe.start_round(dealt=True)
+        self.shoe.end_round()
+        self.assertEqual(len(self.shoe), len(self.cards) // 4)
+        self.shoe.start_round()
+        self.assertEqual(len(self.shoe), len(self.cards))
+
+    def test_reload_waits_for_rounds_in_progress(self):
+        self.shoe.start_round()
+        self.shoe.draw_cards(len(self.cards) * 3 // 4)
+        thread = threading.Thread(target=self.shoe.start_round)
+        thread.start()
+        thread.join(0.05)
+        self.assertTrue(thread.is_alive())
+        self.assertEqual(len(self.shoe), len(self.cards) // 4)
+        self.shoe.end_round()
+        thread.join()
+        self.assertEqual(len(self.shoe), len(self.cards))
+
+    def test_repr(self):
+        self.assertIn(str(len(self.shoe)), repr(self.shoe))
+        shoe = blackjack.card.SharedShufflingShoe(self.cards)
+        self.assertIn('Shuffling', repr(shoe))
+
+
 class TestHand(unittest.TestCase):
 
     def setUp(self):
@@ -133,6 +406,26 @@ class TestHand(unittest.TestCase):
         self.hand.add_card(self.deck[0])
         self.assertTrue(self.hand.score)
 
+    def test_soft(self):
+        self.hand.add_card(self.deck[0])
+        self.assertTrue(self.hand.soft)
+
+    def test_score_follows_added_cards(self):
+        for card in self.deck:
+            self.hand.add_card(card)
+            self.assertEqual(self.hand.score, blackjack.score.score_from_hand(self.hand))
+            self.assertEqual(self.hand.soft, blackjack.score.is_soft_hand(self.hand))
+
+    def test_score_follows_replaced_cards(self):
+        self.hand.extend(self.deck[:2])
+        self.assertEqual(self.hand.score, 13)
+        self.hand[0] = self.deck[12]
+        self.assertEqual(self.hand.score, 12)
+        self.hand.pop()
+        self.assertEqual(self.hand.score, 10)
+        del self.hand[:]
+        self.assertEqual(self.hand.score, 0)
+
     def test_repr(self):
         self.assertIn(str(len(self.hand)), repr(self.hand))
 
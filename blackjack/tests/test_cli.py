@@ -1,13 +1,20 @@
 """Unit-tests for blackjack/cli.py module."""
 
+import io
+import json
+import os
+import shutil
+import tempfile
 import unittest
 import unittest.mock
 from unittest.mock import patch, DEFAULT
 
 import blackjack.card
 import blackjack.cli
+import blackjack.export
 import blackjack.game
 import blackjack.player
+import blackjack.simulation
 
 
 class TestPlay(unittest.TestCase):
@@ -34,3 +41,90 @@ class TestPlay(unittest.TestCase):
         table, game = blackjack.cli.play(self.ruleset, self.player_infos)
         self.assertIsInstance(table.shoe, blackjack.card.ShufflingShoe)
 
+    @patch.multiple('blackjack.player.Table', play=DEFAULT)
+    def test_seed(self, *args, **kwargs):
+        shoes = [blackjack.cli.play(self.ruleset, self.player_infos, seed=7)[0].shoe
+            for _ in range(2)]
+        cards = [shoe.draw_cards(10) for shoe in shoes]
+        self.assertEqual(*[[str(card) for card in hand] for hand in cards])
+
+
+class TestFormatProgress(unittest.TestCase):
+
+    def test(self):
+        progress = blackjack.simulation.SimulationProgress(4000)
+        progress.add(1000, -20000, 2000000000, 440, 80, 480)
+        self.assertEqual(blackjack.cli.format_progress(progress, 2.),
+            '1000/4000 rounds, 500 rounds/s, ETA 6s, house edge 2.000% ± 4.474%')
+
+
+class TestSimulate(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'results.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test(self, stderr, stdout):
+        results = blackjack.cli.simulate(['--ruleset', 'european', '--rounds',
+            '1000', '--seed', '3', '--output', self.path])
+        self.assertEqual(results['round_count'], 1000)
+        self.assertIn('1000/1000 rounds', stderr.getvalue())
+        self.assertIn('House edge of "european" ruleset', stdout.getvalue())
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), results)
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test_hands(self, stderr, stdout):
+        path = os.path.join(self.directory, 'hands.bjc')
+        blackjack.cli.simulate(['--ruleset', 'european', '--rounds', '1000',
+            '--seed', '3', '--hands', path])
+        columns = blackjack.export.read_columns(path)
+        self.assertEqual(len(columns['round']), 1000)
+
+
+class TestRemoval(unittest.TestCase):
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    @patch('blackjack.removal.effects_of_removal')
+    def test(self, effects_of_removal, stdout):
+        effects_of_removal.return_value = [(.005, [.001] * 10)]
+        blackjack.cli.removal(['--ruleset', 'european', '--workers', '2'])
+        rulesets, worker_count = effects_of_removal.call_args[0]
+        self.assertIsInstance(rulesets[0], blackjack.game.EuropeanRuleset)
+        self.assertEqual(worker_count, 2)
+        self.assertIn('european', stdout.getvalue())
+
+
+class TestMain(unittest.TestCase):
+
+    @patch('blackjack.cli.simulate')
+    def test_simulate(self, simulate):
+        with patch('sys.argv', ['blackjack.py', 'simulate', '--rounds', '10']):
+            blackjack.cli.main()
+        simulate.assert_called_once_with(['--rounds', '10'])
+
+    @patch('blackjack.cli.removal')
+    def test_removal(self, removal):
+        with patch('sys.argv', ['blackjack.py', 'removal', '--workers', '2']):
+            blackjack.cli.main()
+        removal.assert_called_once_with(['--workers', '2'])
+
+    @patch('blackjack.cli.play')
+    def test_seed(self, play):
+        with patch('sys.argv', ['blackjack.py', '--seed', '7', 'Stuey']):
+            blackjack.cli.main()
+        self.assertEqual(play.call_args[0][2], 7)
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    @patch('blackjack.cli.play')
+    def test_new_seed(self, play, stdout):
+        with patch('sys.argv', ['blackjack.py', 'Stuey']):
+            blackjack.cli.main()
+        seed = play.call_args[0][2]
+        self.assertIn('--seed {}'.format(seed), stdout.getvalue())
@@ -0,0 +1,137 @@
+"""Unit-tests for blackjack/env.py module."""
+
+import random
+import unittest
+
+import blackjack.card
+import blackjack.env
+import blackjack.game
+import blackjack.scenario
+import blackjack.score
+import blackjack.strategy
+
+
+class StackedHeadlessShoe(object):
+    """A headless shoe dealing given values in order."""
+
+    def __init__(self, values):
+        self.values = values
+        self.position = 0
+        self.running_count = 0
+
+    def start_round(self):
+        pass
+
+    def draw(self):
+        value = self.values[self.position]
+        self.position += 1
+        self.running_count += blackjack.score.HI_LO_TAGS_BY_VALUE[value]
+        return value
+
+    def __len__(self):
+        return len(self.values) - self.position
+
+
+class TestBlackjackEnv(unittest.TestCase):
+
+    def setUp(self):
+        self.env = blackjack.env.BlackjackEnv(blackjack.game.EuropeanRuleset())
+
+    def stack(self, ranks):
+        self.env.table.shoe = blackjack.scenario.StackedShoe.from_ranks(ranks)
+
+    def test_hit_then_stand(self):
+        self.stack(['5', '10', '6', '7', '7'])
+        self.assertEqual(self.env.reset(), (11, 0, 10))
+        self.assertEqual(self.env.step(blackjack.env.HIT), ((18, 0, 10), 0., False, {}))
+        observation, reward, done, _ = self.env.step(blackjack.env.STAND)
+        self.assertEqual((observation, reward, done), ((18, 0, 10), 1., True))
+
+    def test_bust(self):
+        self.stack(['10', '9', '6', 'King', '8'])
+        self.env.reset()
+        observation, reward, done, _ = self.env.step(blackjack.env.HIT)
+        self.assertEqual((observation, reward, done), ((26, 0, 9), -1., True))
+
+    def test_blackjack_reward(self):
+        self.stack(['Ace', '9', 'King', '8'])
+        self.assertEqual(self.env.reset(), (21, 1, 9))
+        _, reward, _, _ = self.env.step(blackjack.env.STAND)
+        self.assertEqual(reward, 1.5)
+
+    def test_step_after_round(self):
+        self.stack(['10', '9', '6', 'King', '8'])
+        self.env.reset()
+        self.env.step(blackjack.env.HIT)
+        with self.assertRaises(RuntimeError):
+            self.env.step(blackjack.env.HIT)
+
+    def test_count_ignores_hole_card(self):
+        env = blackjack.env.BlackjackEnv(blackjack.game.AmericanRuleset(), use_count=True)
+        env.table.shoe = blackjack.scenario.StackedShoe.from_ranks(['2', '3', '4', '5', '6'])
+        score, soft, upcard, true_count = env.reset()
+        self.assertEqual((score, soft, upcard), (6, 0, 3))
+        self.assertEqual(true_count, blackjack.score.true_count(3, 2))
+
+    def test_many_rounds(self):
+        for _ in range(20):
+            observation = self.env.reset()
+            done = False
+            while not done:
+                observation, _, done, _ = self.env.step(
+                    blackjack.env.HIT if observation[0] < 17 else blackjack.env.STAND)
+        self.assertIsNone(self.env.player.hand)
+
+
+class TestVectorEnv(unittest.TestCase):
+
+    def test_observation_layout(self):
+        env = blackjack.env.VectorEnv(blackjack.game.AmericanRuleset(), 5, use_count=True, seed=0)
+        observations = env.reset()
+        self.assertEqual(observations.typecode, 'd')
+        self.assertEqual(len(observations), 5 * env.observation_size)
+
+    def test_same_rewards_as_blackjack_env(self):
+        """Both environments agree when dealt the same cards."""
+        rng = random.Random(0)
+        strategy = blackjack.strategy.BASIC_STRATEGY
+        for ruleset_type in blackjack.game.ruleset_map.values():
+            ruleset = ruleset_type()
+            for _ in range(50):
+                ranks = rng.choices(blackjack.card.RANKS, k=30)
+                env = blackjack.env.BlackjackEnv(ruleset, use_count=True)
+                env.table.shoe = blackjack.scenario.StackedShoe.from_ranks(ranks)
+                vector_env = blackjack.env.VectorEnv(ruleset, 1, use_count=True)
+                vector_env.shoes[0] = StackedHeadlessShoe(
+                    [blackjack.score.HARD_VALUES[r] for r in ranks])
+                observation = env.reset()
+                self.assertEqual(list(vector_env.reset()), list(observation))
+                done = False
+                while not done:
+                    score, soft, upcard, _ = observation
+                    action = int(strategy.hits(score, soft, upcard))
+                    observation, reward, done, _ = env.step(action)
+                    _, rewards, dones, _ = vector_env.step([action])
+                    self.assertEqual(dones[0], done)
+                    self.assertEqual(rewards[0], reward)
+
+    def test_auto_reset(self):
+        env = blackjack.env.VectorEnv(blackjack.game.EuropeanRuleset(), 3, seed=0)
+        env.reset()
+        for _ in range(10):
+            _, _, dones, _ = env.step([blackjack.env.STAND] * 3)
+            self.assertEqual(list(dones), [1, 1, 1])
+        self.assertEqual(list(env.card_counts), [2, 2, 2])
+
+    def test_average_reward(self):
+        env = blackjack.env.VectorEnv(blackjack.game.EuropeanRuleset(), 100, seed=0)
+        observations = env.reset()
+        total_reward = round_count = 0
+        strategy = blackjack.strategy.BASIC_STRATEGY
+        for _ in range(200):
+            actions = [int(strategy.hits(*(int(x) for x in observations[i:i + 3])))
+                for i in range(0, len(observations), 3)]
+            observations, rewards, dones, _ = env.step(actions)
+            total_reward += sum(rewards)
+            round_count += sum(dones)
+        self.assertLess(abs(total_reward / round_count), .1)
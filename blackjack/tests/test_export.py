@@ -0,0 +1,167 @@
+"""Unit-tests for blackjack/export.py module."""
+
+import array
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import blackjack.export
+import blackjack.game
+import blackjack.simulation
+
+
+class BaseTestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'hands.bjc')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+
+class TestColumnWriter(BaseTestExport):
+
+    def setUp(self):
+        super(TestColumnWriter, self).setUp()
+        self.columns = (('index', 'q'), ('half', 'd'))
+        with blackjack.export.ColumnWriter(self.path, self.columns, batch_size=4) as writer:
+            writer.metadata['name'] = 'test'
+            for i in range(10):
+                writer.write_row(i, i / 2)
+
+    def test_read_columns(self):
+        columns = blackjack.export.read_columns(self.path)
+        self.assertEqual(list(columns['index']), list(range(10)))
+        self.assertEqual(list(columns['half']), [i / 2 for i in range(10)])
+
+    def test_bounded_batches(self):
+        batches = list(blackjack.export.iter_batches(self.path))
+        self.assertEqual([len(b['index']) for b in batches], [4, 4, 2])
+
+    def test_read_metadata(self):
+        metadata = blackjack.export.read_metadata(self.path)
+        self.assertEqual(metadata, {'name': 'test'})
+
+    def test_not_a_columnar_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'index,half\n')
+        with self.assertRaises(ValueError):
+            blackjack.export.read_columns(self.path)
+        with self.assertRaises(ValueError):
+            blackjack.export.read_metadata(self.path)
+
+    def test_invalid_row(self):
+        with blackjack.export.ColumnWriter(self.path, self.columns) as writer:
+            writer.write_row(0, 0.)
+            with self.assertRaises(ValueError):
+                writer.write_row(1, 'half')
+            with self.assertRaises(ValueError):
+                writer.write_row(2 ** 63, 1.)
+            with self.assertRaises(ValueError):
+                writer.write_row(1, 1., 2)
+            with self.assertRaises(ValueError):
+                writer.write_row(1)
+            writer.write_row(1, .5)
+        columns = blackjack.export.read_columns(self.path)
+        self.assertEqual(list(columns['index']), [0, 1])
+        self.assertEqual(list(columns['half']), [0., .5])
+
+    def test_write_batch(self):
+        with blackjack.export.ColumnWriter(self.path, self.columns, batch_size=4) as writer:
+            writer.write_row(-1, -.5)
+            writer.write_batch({'index': array.array('q', range(6)),
+                'half': [i / 2 for i in range(6)]})
+            self.assertEqual(writer.row_count, 7)
+        batches = list(blackjack.export.iter_batches(self.path))
+        self.assertEqual([len(b['index']) for b in batches], [1, 4, 2])
+        columns = blackjack.export.read_columns(self.path)
+        self.assertEqual(list(columns['index']), list(range(-1, 6)))
+
+    def test_write_uneven_batch(self):
+        with blackjack.export.ColumnWriter(self.path, self.columns) as writer:
+            with self.assertRaises(ValueError):
+                writer.write_batch({'index': [1, 2], 'half': [1.]})
+            self.assertEqual(writer.row_count, 0)
+
+    def test_close_twice(self):
+        writer = blackjack.export.ColumnWriter(self.path, self.columns)
+        writer.close()
+        writer.close()
+        self.assertEqual(blackjack.export.read_columns(self.path), {})
+
+    def test_repr(self):
+        writer = blackjack.export.ColumnWriter(self.path, self.columns)
+        writer.write_row(1, 2.)
+        self.assertIn('1 rows', repr(writer))
+        writer.close()
+
+
+class TestHandRecorder(BaseTestExport):
+
+    def test_record_headless_game(self):
+        ruleset = blackjack.game.EuropeanRuleset()
+        with blackjack.export.HandRecorder(self.path, batch_size=16) as recorder:
+            game = blackjack.simulation.HeadlessGame(ruleset,
+                rng=random.Random(0), recorder=recorder)
+            gains = [game.play_round([10, 20]) for _ in range(50)]
+        columns = blackjack.export.read_columns(self.path)
+        self.assertEqual(len(columns['round']), 100)
+        self.assertEqual(list(columns['seat'][:4]), [0, 1, 0, 1])
+        self.assertEqual(list(columns['wager'][:2]), [10, 20])
+        self.assertEqual(sum(columns['gain']), sum(map(sum, gains)))
+        self.assertEqual(max(columns['round']), 50)
+
+    def test_rulesets(self):
+        with blackjack.export.HandRecorder(self.path) as recorder:
+            recorder.start_round(blackjack.game.EuropeanRuleset(), 0)
+            recorder.start_round(blackjack.game.AmericanRuleset(), 0)
+            recorder.start_round(blackjack.game.EuropeanRuleset(), 0)
+            recorder.record_hand(0, 10, 12, False, 12, 2, 20, 2, 10, 1, -10)
+        metadata = blackjack.export.read_metadata(self.path)
+        names = [r['name'] for r in metadata['rulesets']]
+        self.assertEqual(names, ['EuropeanRuleset', 'AmericanRuleset'])
+        columns = blackjack.export.read_columns(self.path)
+        self.assertEqual(list(columns['ruleset']), [0])
+        self.assertEqual(list(columns['round']), [3])
+
+    def test_record_deal_round(self):
+        ruleset = blackjack.game.EuropeanRuleset()
+        with blackjack.export.HandRecorder(self.path) as recorder:
+            game = blackjack.simulation.HeadlessGame(ruleset,
+                rng=random.Random(0), recorder=recorder)
+            for _ in range(10):
+                game.deal_round([10, 20, 30])
+        columns = blackjack.export.read_columns(self.path)
+        self.assertEqual(len(columns['round']), 30)
+        self.assertEqual(list(columns['gain'][-3:]), list(game.gains[:3]))
+
+    def test_repr(self):
+        with blackjack.export.HandRecorder(self.path) as recorder:
+            self.assertIn('0 hands', repr(recorder))
+
+
+class TestConcatenateHands(BaseTestExport):
+
+    def record(self, path, rulesets):
+        with blackjack.export.HandRecorder(path) as recorder:
+            for ruleset in rulesets:
+                recorder.start_round(ruleset, 0)
+                recorder.record_hand(0, 10, 12, False, 12, 2, 20, 2, 10, 1, -10)
+
+    def test(self):
+        european = blackjack.game.EuropeanRuleset()
+        american = blackjack.game.AmericanRuleset()
+        paths = [os.path.join(self.directory, name) for name in ('a.bjc', 'b.bjc')]
+        self.record(paths[0], [european, european])
+        self.record(paths[1], [american, european, american])
+        row_count = blackjack.export.concatenate_hands(paths, self.path)
+        self.assertEqual(row_count, 5)
+        columns = blackjack.export.read_columns(self.path)
+        self.assertEqual(list(columns['round']), [1, 2, 3, 4, 5])
+        self.assertEqual(list(columns['ruleset']), [0, 0, 1, 0, 1])
+        metadata = blackjack.export.read_metadata(self.path)
+        names = [r['name'] for r in metadata['rulesets']]
+        self.assertEqual(names, ['EuropeanRuleset', 'AmericanRuleset'])
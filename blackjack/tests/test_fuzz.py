@@ -0,0 +1,92 @@
+"""Unit-tests for blackjack/fuzz.py module."""
+
+import functools
+import random
+import unittest
+import unittest.mock
+
+import blackjack.card
+import blackjack.fuzz
+import blackjack.score
+import blackjack.simulation
+
+
+class EvenMoneyHeadlessGame(blackjack.simulation.HeadlessGame):
+    """A broken engine paying Blackjacks even money."""
+
+    def gain_from_outcome(self, outcome, wager):
+        if outcome == blackjack.score.BLACKJACK:
+            return wager
+        return super(EvenMoneyHeadlessGame, self).gain_from_outcome(outcome, wager)
+
+
+def check_ace(case):
+    return 'Ace dealt' if 'Ace' in case.ranks else None
+
+
+class TestCase(unittest.TestCase):
+
+    def test_strategy_from_mask(self):
+        case = blackjack.fuzz.random_case(random.Random(0))
+        case = case.replace(hit_mask=0b101)
+        situations = blackjack.fuzz.SITUATIONS
+        self.assertEqual(case.hit_situations(), [situations[0], situations[2]])
+        self.assertTrue(case.strategy().hits(*situations[2]))
+        self.assertFalse(case.strategy().hits(*situations[1]))
+
+    def test_ruleset(self):
+        case = blackjack.fuzz.random_case(random.Random(0))
+        ruleset = case.ruleset()
+        for name, value in case.attributes.items():
+            self.assertEqual(getattr(ruleset, name), value)
+
+
+class TestChecks(unittest.TestCase):
+
+    def test_hands_agree(self):
+        self.assertIsNone(blackjack.fuzz.fuzz(blackjack.fuzz.check_hands, 2000, seed=0))
+
+    def test_stale_cached_score(self):
+        with unittest.mock.patch('blackjack.card.Hand._count', return_value=(4, False)):
+            case, divergence = blackjack.fuzz.fuzz(blackjack.fuzz.check_hands, 100, seed=0)
+        self.assertIn('Hand caches', divergence)
+
+    def test_settle_hands_divergence(self):
+        def settle_hands(hands, dealer_hand):
+            return [(blackjack.score.PUSH, hand.score) for hand in hands]
+        with unittest.mock.patch('blackjack.score.settle_hands', settle_hands):
+            case, divergence = blackjack.fuzz.fuzz(blackjack.fuzz.check_hands, 100, seed=0)
+        self.assertIn('settle_hands', divergence)
+
+    def test_rounds_agree(self):
+        self.assertIsNone(blackjack.fuzz.fuzz(blackjack.fuzz.check_round, 300, seed=0))
+
+    def test_out_of_cards_on_both_sides(self):
+        case = blackjack.fuzz.random_case(random.Random(0)).replace(ranks=['10'])
+        self.assertIsNone(blackjack.fuzz.check_round(case))
+
+    def test_report_divergence(self):
+        check = functools.partial(blackjack.fuzz.check_round,
+            engine_type=EvenMoneyHeadlessGame)
+        case, divergence = blackjack.fuzz.fuzz(check, 1000, seed=0)
+        self.assertEqual(len(case.wagers), 1)
+        self.assertIn('EvenMoneyHeadlessGame', divergence)
+        self.assertEqual(check(case), divergence)
+
+    def test_parallel_workers(self):
+        result = blackjack.fuzz.fuzz(blackjack.fuzz.check_hands, 200, seed=0, worker_count=2)
+        self.assertIsNone(result)
+
+
+class TestShrink(unittest.TestCase):
+
+    def test_minimal_case(self):
+        case = blackjack.fuzz.random_case(random.Random(1))
+        case = case.replace(ranks=case.ranks + ['Ace'])
+        case, divergence = blackjack.fuzz.shrink(case, check_ace)
+        self.assertEqual(divergence, 'Ace dealt')
+        self.assertEqual(case.ranks, ['Ace'])
+        self.assertEqual(case.wagers, [1])
+        self.assertEqual(case.hit_mask, 0)
+        self.assertEqual(case.attributes,
+            {name: values[0] for name, values in blackjack.fuzz.FUZZ_ATTRIBUTES.items()})
@@ -1,14 +1,20 @@
 """Unit-tests for blackjack/game.py module."""
 
+import collections
 import itertools
+import sys
+import threading
 import unittest
 import unittest.mock
 
 from unittest.mock import DEFAULT, call, patch
 
+import blackjack.betting
 import blackjack.card
 import blackjack.player
 import blackjack.game
+import blackjack.scenario
+import blackjack.strategy
 import blackjack.ui
 
 
@@ -62,6 +68,16 @@ class TestGamePlayNewRound(BaseTestGame):
         self.assertFalse(self.game._pay_gains.called)
         self.assertFalse(self.game._cleanup.called)
 
+    @patch.multiple('blackjack.game.Game', _collect_wagers=DEFAULT,
+        _deal_initial_cards=DEFAULT, _interact_with_player=DEFAULT,
+        _interact_with_dealer=DEFAULT, _pay_gains=DEFAULT, _cleanup=DEFAULT)
+    def test_start_recording_round(self, *args, **kwargs):
+        self.game.recorder = unittest.mock.Mock()
+        self.game._collect_wagers.return_value = self.table.players
+        self.game._play_new_round(self.table)
+        self.game.recorder.start_round.assert_called_once_with(
+            self.ruleset, self.shoe.true_count)
+
     @patch.multiple('blackjack.game.Game', _collect_wagers=DEFAULT,
         _deal_initial_cards=DEFAULT, _interact_with_player=DEFAULT,
         _interact_with_dealer=DEFAULT, _pay_gains=DEFAULT, _cleanup=DEFAULT)
@@ -76,6 +92,36 @@ class TestGamePlayNewRound(BaseTestGame):
         self.game._pay_gains.assert_called_once_with(self.table)
         self.game._cleanup.assert_called_once_with(self.table)
 
+    @patch.multiple('blackjack.game.Game', _collect_wagers=DEFAULT,
+        _deal_initial_cards=DEFAULT, _interact_with_player=DEFAULT,
+        _interact_with_dealer=DEFAULT, _pay_gains=DEFAULT, _cleanup=DEFAULT)
+    def test_checkpoint_every_turn(self, *args, **kwargs):
+        self.game.snapshotter = unittest.mock.Mock()
+        self.game._collect_wagers.return_value = self.table.players
+        self.game._play_new_round(self.table)
+        self.game.snapshotter.checkpoint.assert_called_once_with(self.table, self.ruleset)
+        self.assertIsNone(self.table.turn)
+
+    @patch.multiple('blackjack.game.Game', run=DEFAULT,
+        _interact_with_player=DEFAULT, _interact_with_dealer=DEFAULT,
+        _pay_gains=DEFAULT, _cleanup=DEFAULT)
+    def test_resume_round_in_progress(self, *args, **kwargs):
+        other_player = blackjack.player.Player('Jane', 20)
+        self.table.active_players = [self.player, other_player]
+        self.table.turn = 1
+        self.game.resume(self.table)
+        self.game._interact_with_player.assert_called_once_with(self.table, other_player)
+        self.game._interact_with_dealer.assert_called_once_with(self.table, self.dealer)
+        self.game._pay_gains.assert_called_once_with(self.table)
+        self.game.run.assert_called_once_with(self.table)
+        self.assertIsNone(self.table.turn)
+
+    @patch.multiple('blackjack.game.Game', run=DEFAULT, _finish_round=DEFAULT)
+    def test_resume_between_rounds(self, *args, **kwargs):
+        self.game.resume(self.table)
+        self.assertFalse(self.game._finish_round.called)
+        self.game.run.assert_called_once_with(self.table)
+
 
 class TestGameCollectWagers(BaseTestGame):
 
@@ -111,6 +157,49 @@ class TestGameCollectWagers(BaseTestGame):
         self.assertIn(self.player, active_players)
 
 
+    @patch('blackjack.ui.ask')
+    def test_negative_side_bet(self, *args, **kwargs):
+        self.ruleset.SIDE_BETS = ('21+3',)
+        blackjack.ui.ask.side_effect = [10, -50, 0]
+        self.game._collect_wagers(self.table)
+        self.assertEqual(blackjack.ui.ask.call_count, 3)
+        self.assertEqual(self.player.chip_count, 10)
+        self.assertEqual(self.player.hand.side_wagers, {})
+
+    @patch('blackjack.ui.ask')
+    def test_side_bet_over_main_bet(self, *args, **kwargs):
+        self.ruleset.SIDE_BETS = ('21+3',)
+        blackjack.ui.ask.side_effect = [10, 11, 10]
+        self.game._collect_wagers(self.table)
+        self.assertEqual(blackjack.ui.ask.call_count, 3)
+        self.assertEqual(self.player.hand.side_wagers, {'21+3': 10})
+        self.assertEqual(self.player.chip_count, 0)
+
+    @patch('builtins.input')
+    @patch('sys.stdout')
+    def test_decline_side_bet(self, stdout, input):
+        self.ruleset.SIDE_BETS = ('21+3',)
+        input.side_effect = ['10', '']
+        self.game._collect_wagers(self.table)
+        self.assertEqual(input.call_count, 2)
+        self.assertEqual(self.player.hand.side_wagers, {})
+        self.assertEqual(self.player.chip_count, 10)
+
+    @patch('blackjack.ui.ask')
+    def test_bet_from_policy(self, *args, **kwargs):
+        self.player.betting_policy = blackjack.betting.FlatBetting(2)
+        active_players = self.game._collect_wagers(self.table)
+        self.assertFalse(blackjack.ui.ask.called)
+        self.assertEqual(self.player.hand.wager, 2 * self.ruleset.MINIMUM_WAGER)
+        self.assertIn(self.player, active_players)
+
+    @patch('blackjack.ui.ask')
+    def test_no_bet_from_policy(self, *args, **kwargs):
+        self.player.betting_policy = blackjack.betting.FlatBetting(0)
+        active_players = self.game._collect_wagers(self.table)
+        self.assertListEqual(active_players, [])
+
+
 class TestGameDealInitialCards(BaseTestGame):
 
     def setUp(self):
@@ -124,11 +213,10 @@ class TestGameDealInitialCards(BaseTestGame):
         ]
         self.table.active_players = self.table.players
 
-    @patch.multiple('blackjack.card.Shoe', __next__=DEFAULT)
     def test_dealer_has_no_hole_card(self, *args, **kwargs):
         self.game.ruleset.DEALER_RECEIVES_HOLE_CARD = False
         self.game.ruleset.DEALER_REVEALS_BLACKJACK_HAND = None
-        self.shoe.__next__.side_effect = self.cards
+        self.table.shoe = blackjack.scenario.StackedShoe(self.cards)
         self.game._deal_initial_cards(self.table)
         self.assertListEqual(list(self.player.hand), [self.cards[0], self.cards[2]])
         for card in self.player.hand:
@@ -136,11 +224,10 @@ class TestGameDealInitialCards(BaseTestGame):
         self.assertListEqual(self.dealer.hand, [self.cards[1]])
         self.assertTrue(self.dealer.hand[0].visible)
 
-    @patch.multiple('blackjack.card.Shoe', __next__=DEFAULT)
     def test_dealer_does_not_reveal_on_blackjack(self, *args, **kwargs):
         self.game.ruleset.DEALER_RECEIVES_HOLE_CARD = True
         self.game.ruleset.DEALER_REVEALS_BLACKJACK_HAND = False
-        self.shoe.__next__.side_effect = self.cards
+        self.table.shoe = blackjack.scenario.StackedShoe(self.cards)
         self.game._deal_initial_cards(self.table)
         self.assertListEqual(list(self.player.hand), [self.cards[0], self.cards[2]])
         for card in self.player.hand:
@@ -149,11 +236,10 @@ class TestGameDealInitialCards(BaseTestGame):
         self.assertTrue(self.dealer.hand[0].visible)
         self.assertFalse(self.dealer.hand[1].visible)
 
-    @patch.multiple('blackjack.card.Shoe', __next__=DEFAULT)
     def test_dealer_reveals_on_blackjack(self, *args, **kwargs):
         self.game.ruleset.DEALER_RECEIVES_HOLE_CARD = True
         self.game.ruleset.DEALER_REVEALS_BLACKJACK_HAND = True
-        self.shoe.__next__.side_effect = self.cards
+        self.table.shoe = blackjack.scenario.StackedShoe(self.cards)
         self.game._deal_initial_cards(self.table)
         self.assertListEqual(list(self.player.hand), [self.cards[0], self.cards[2]])
         for card in self.player.hand:
@@ -236,6 +322,29 @@ class TestGameInteractWithDealer(BaseTestGame):
         self.game._interact_with_dealer(self.table, self.dealer)
         self.assertEqual(len(self.dealer.hand), card_count_before + 1)
 
+    def test_dealer_stands_on_soft_17(self, *args, **kwargs):
+        self.dealer.hand.add_card(blackjack.card.Card('Heart', 'Ace'))
+        self.dealer.hand.add_card(blackjack.card.Card('Heart', '6'))
+        card_count_before = len(self.dealer.hand)
+        self.game._interact_with_dealer(self.table, self.dealer)
+        self.assertEqual(len(self.dealer.hand), card_count_before)
+
+    def test_dealer_hits_soft_17(self, *args, **kwargs):
+        self.ruleset.DEALER_HITS_SOFT_17 = True
+        self.dealer.hand.add_card(blackjack.card.Card('Heart', 'Ace'))
+        self.dealer.hand.add_card(blackjack.card.Card('Heart', '6'))
+        card_count_before = len(self.dealer.hand)
+        self.game._interact_with_dealer(self.table, self.dealer)
+        self.assertGreater(len(self.dealer.hand), card_count_before)
+
+    def test_dealer_stands_on_ruleset_minimum_score(self, *args, **kwargs):
+        self.ruleset.MINIMUM_DEALER_SCORE = 16
+        self.dealer.hand.add_card(blackjack.card.Card('Heart', '10'))
+        self.dealer.hand.add_card(blackjack.card.Card('Heart', '6'))
+        card_count_before = len(self.dealer.hand)
+        self.game._interact_with_dealer(self.table, self.dealer)
+        self.assertEqual(len(self.dealer.hand), card_count_before)
+
 
 class TestGamePayGains(BaseTestGame):
 
@@ -244,39 +353,39 @@ class TestGamePayGains(BaseTestGame):
         self.player.hand.wager = 5
         self.table.active_players = self.table.players
 
-    @patch('blackjack.score.compare_hands')
+    @patch('blackjack.score.settle_hands')
     def test_pay_on_BUST(self, *args, **kwargs):
-        blackjack.score.compare_hands.return_value = (blackjack.score.BUST, None)
+        blackjack.score.settle_hands.return_value = [(blackjack.score.BUST, 0)]
         chip_count_before = self.player.chip_count
         self.game._pay_gains(self.table)
         self.assertEqual(self.player.chip_count, chip_count_before)
 
-    @patch('blackjack.score.compare_hands')
+    @patch('blackjack.score.settle_hands')
     def test_pay_on_LOOSE(self, *args, **kwargs):
-        blackjack.score.compare_hands.return_value = (blackjack.score.LOOSE, None)
+        blackjack.score.settle_hands.return_value = [(blackjack.score.LOOSE, 0)]
         chip_count_before = self.player.chip_count
         self.game._pay_gains(self.table)
         self.assertEqual(self.player.chip_count, chip_count_before)
 
-    @patch('blackjack.score.compare_hands')
+    @patch('blackjack.score.settle_hands')
     def test_pay_on_PUSH(self, *args, **kwargs):
-        blackjack.score.compare_hands.return_value = (blackjack.score.PUSH, None)
+        blackjack.score.settle_hands.return_value = [(blackjack.score.PUSH, 0)]
         chip_count_before = self.player.chip_count
         self.game._pay_gains(self.table)
         expected_chip_count = chip_count_before + self.player.hand.wager
         self.assertEqual(self.player.chip_count, expected_chip_count)
 
-    @patch('blackjack.score.compare_hands')
+    @patch('blackjack.score.settle_hands')
     def test_pay_on_WIN(self, *args, **kwargs):
-        blackjack.score.compare_hands.return_value = (blackjack.score.WIN, None)
+        blackjack.score.settle_hands.return_value = [(blackjack.score.WIN, 0)]
         chip_count_before = self.player.chip_count
         self.game._pay_gains(self.table)
         expected_chip_count = chip_count_before + 2 * self.player.hand.wager
         self.assertEqual(self.player.chip_count, expected_chip_count)
 
-    @patch('blackjack.score.compare_hands')
+    @patch('blackjack.score.settle_hands')
     def test_pay_on_BLACKJACK(self, *args, **kwargs):
-        blackjack.score.compare_hands.return_value = (blackjack.score.BLACKJACK, None)
+        blackjack.score.settle_hands.return_value = [(blackjack.score.BLACKJACK, 0)]
         chip_count_before = self.player.chip_count
         self.game._pay_gains(self.table)
         ratio = 1 + self.ruleset.BLACKJACK_PAYOUT_RATIO
@@ -284,6 +393,17 @@ class TestGamePayGains(BaseTestGame):
         self.assertEqual(self.player.chip_count, expected_chip_count)
 
 
+    def test_record_hands(self, *args, **kwargs):
+        self.game.recorder = unittest.mock.Mock()
+        self.player.hand.extend([blackjack.card.Card('Heart', 'Ace'),
+            blackjack.card.Card('Heart', '6'), blackjack.card.Card('Heart', '2')])
+        self.dealer.hand.extend([blackjack.card.Card('Spade', '10'),
+            blackjack.card.Card('Spade', '8')])
+        self.game._pay_gains(self.table)
+        self.game.recorder.record_hand.assert_called_once_with(
+            0, 10, 17, True, 19, 3, 18, 2, 5, blackjack.score.WIN, 5)
+
+
 class TestGameCleanup(BaseTestGame):
 
     def setUp(self):
@@ -299,3 +419,80 @@ class TestGameCleanup(BaseTestGame):
         self.assertEqual(self.dealer.hand, None)
         self.assertEqual(len(self.shoe), card_count_before)
 
+
+class _LoggingSharedShoe(blackjack.card.SharedShoe):
+    """A shared shoe logging what each thread draws, and every reload."""
+
+    def __init__(self, *args, **kwargs):
+        self.log = []
+        super(_LoggingSharedShoe, self).__init__(*args, **kwargs)
+
+    def reload(self):
+        with self._lock:
+            super(_LoggingSharedShoe, self).reload()
+            self.log.append(('reload', None, None))
+
+    def __next__(self):
+        with self._lock:
+            card = super(_LoggingSharedShoe, self).__next__()
+            self.log.append(('draw', threading.get_ident(), [card.name]))
+        return card
+
+    def draw_cards(self, count, visible=False):
+        with self._lock:
+            cards = super(_LoggingSharedShoe, self).draw_cards(count, visible)
+            self.log.append(('draw', threading.get_ident(), [c.name for c in cards]))
+        return cards
+
+    def end_round(self):
+        with self._lock:
+            super(_LoggingSharedShoe, self).end_round()
+            self.log.append(('end', threading.get_ident(), None))
+
+
+class TestGameSharedShoe(unittest.TestCase):
+
+    def setUp(self):
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # force tables to interleave
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def test_no_card_dealt_twice(self):
+        ruleset = blackjack.game.EuropeanRuleset()
+        shoe = _LoggingSharedShoe.from_template(2)
+        del shoe.log[:]
+
+        def play_rounds():
+            player = blackjack.player.Player('John', 10 ** 6,
+                blackjack.betting.FlatBetting())
+            table = blackjack.player.Table(shoe, blackjack.player.Dealer(), [player])
+            ui = blackjack.scenario.StrategyUI(table, blackjack.strategy.BASIC_STRATEGY)
+            game = blackjack.game.Game(ruleset, ui=ui)
+            for _ in range(200):
+                game._play_new_round(table)
+
+        threads = [threading.Thread(target=play_rounds) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Shoe is only reloaded once no table holds cards, and between two
+        # reloads no card is dealt more often than there are decks
+        held_counts = {thread.ident: 0 for thread in threads}
+        dealt_counts = collections.Counter()
+        reload_count = 0
+        for event, ident, names in shoe.log:
+            if event == 'reload':
+                self.assertEqual(sum(held_counts.values()), 0)
+                dealt_counts.clear()
+                reload_count += 1
+            elif event == 'draw':
+                held_counts[ident] += len(names)
+                dealt_counts.update(names)
+                self.assertLessEqual(max(dealt_counts.values()), 2)
+            else:
+                held_counts[ident] = 0
+        self.assertGreater(reload_count, 0)
@@ -0,0 +1,144 @@
+"""Unit-tests for blackjack/latency.py module."""
+
+import random
+import time
+import unittest
+
+import blackjack.card
+import blackjack.game
+import blackjack.latency
+import blackjack.loadgen
+import blackjack.player
+import blackjack.scenario
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def setUp(self):
+        self.histogram = blackjack.latency.LatencyHistogram()
+
+    def test_empty(self):
+        self.assertIsNone(self.histogram.percentile(50))
+        self.assertIsNone(self.histogram.mean)
+
+    def test_small_values_are_exact(self):
+        for value in range(1, 101):
+            self.histogram.record(value)
+        self.assertEqual(self.histogram.percentile(50), 50)
+        self.assertEqual(self.histogram.percentile(99), 99)
+        self.assertEqual(self.histogram.percentile(100), 100)
+        self.assertEqual(self.histogram.mean, 50.5)
+
+    def test_bounded_relative_error(self):
+        rng = random.Random(0)
+        for _ in range(1000):
+            value = int(rng.expovariate(1e-6))
+            histogram = blackjack.latency.LatencyHistogram()
+            histogram.record(value)
+            histogram.record(value + 1)
+            self.assertGreaterEqual(histogram.percentile(50), value)
+            self.assertLessEqual(histogram.percentile(50), value * (1 + 2 ** -7) + 1)
+
+    def test_bucket_bounds(self):
+        histogram = self.histogram
+        for index in range(1, 4000):
+            highest = histogram._highest_value(index)
+            self.assertEqual(histogram._index(highest), index)
+            self.assertEqual(histogram._index(highest + 1), index + 1)
+
+    def test_percentile_never_above_maximum(self):
+        self.histogram.record(1000001)
+        self.assertEqual(self.histogram.percentile(99.9), 1000001)
+
+    def test_merge(self):
+        other = blackjack.latency.LatencyHistogram()
+        self.histogram.record(10)
+        other.record(5)
+        other.record(1000000)
+        self.histogram.merge(other)
+        self.assertEqual(self.histogram.count, 3)
+        self.assertEqual((self.histogram.minimum, self.histogram.maximum), (5, 1000000))
+        self.assertEqual(self.histogram.percentile(50), 10)
+
+    def test_merge_different_precisions(self):
+        with self.assertRaises(ValueError):
+            self.histogram.merge(blackjack.latency.LatencyHistogram(precision=3))
+
+
+class TestLatencyTracker(unittest.TestCase):
+
+    def test_record(self):
+        tracker = blackjack.latency.LatencyTracker()
+        table = blackjack.player.Table(None, None, [], 'first')
+        ruleset = blackjack.game.EuropeanRuleset()
+        tracker.record(table, ruleset, 'hit', 1000)
+        tracker.record(table, ruleset, 'hit', 3000)
+        self.assertEqual(tracker.by_table['first']['hit'].count, 2)
+        self.assertEqual(tracker.by_ruleset['EuropeanRuleset']['hit'].mean, 2000)
+        self.assertEqual(tracker.overall()['hit'].count, 2)
+
+    def test_tables_without_name(self):
+        tracker = blackjack.latency.LatencyTracker()
+        ruleset = blackjack.game.EuropeanRuleset()
+        tracker.record(blackjack.player.Table(None, None, []), ruleset, 'hit', 1000)
+        tracker.record(blackjack.player.Table(None, None, []), ruleset, 'hit', 3000)
+        self.assertEqual(sorted(tracker.by_table), ['#0', '#1'])
+
+
+class TestGameLatency(unittest.TestCase):
+
+    def test_measure_every_action(self):
+        ruleset = blackjack.game.EuropeanRuleset()
+        tracker = blackjack.latency.LatencyTracker()
+        shoe = blackjack.scenario.StackedShoe.from_ranks(['5', '10', '6', '7', '7'])
+        player = blackjack.player.Player('John', 100)
+        table = blackjack.player.Table(shoe, blackjack.player.Dealer(), [player])
+        ui = blackjack.scenario.ScriptedUI([10, 'h', 's'])
+        game = blackjack.game.Game(ruleset, ui=ui, latency=tracker)
+        game._play_new_round(table)
+        histograms = tracker.by_table['#0']
+        self.assertEqual(sorted(histograms), sorted(blackjack.latency.ACTIONS))
+        self.assertTrue(all(h.count == 1 for h in histograms.values()))
+
+    def test_answer_time_not_counted(self):
+        class SlowUI(blackjack.scenario.ScriptedUI):
+            def ask(self, *args, **kwargs):
+                time.sleep(.05)
+                return super(SlowUI, self).ask(*args, **kwargs)
+        ruleset = blackjack.game.EuropeanRuleset()
+        tracker = blackjack.latency.LatencyTracker()
+        player = blackjack.player.Player('John', 100)
+        table = blackjack.player.Table(None, blackjack.player.Dealer(), [player])
+        game = blackjack.game.Game(ruleset, ui=SlowUI([10]), latency=tracker)
+        start = game._start_timer()
+        game._collect_wagers(table)
+        game._stop_timer(table, 'wagers', start)
+        self.assertLess(tracker.by_table['#0']['wagers'].maximum, 50000000)
+
+
+class TestLoadGenerator(unittest.TestCase):
+
+    def test_generate_load(self):
+        tracker = blackjack.loadgen.generate_load(4, 3, ('european', 'american'), seed=0)
+        self.assertEqual(len(tracker.by_table), 4)
+        self.assertEqual(sorted(tracker.by_ruleset), ['AmericanRuleset', 'EuropeanRuleset'])
+        self.assertEqual(tracker.overall()['wagers'].count, 12)
+        self.assertEqual(tracker.overall()['payout'].count, 12)
+
+    def test_global_random_state_untouched(self):
+        state = random.getstate()
+        blackjack.loadgen.generate_load(2, 2, seed=0)
+        self.assertEqual(random.getstate(), state)
+
+    def test_reproducible(self):
+        hit_counts = []
+        for _ in range(2):
+            tracker = blackjack.loadgen.generate_load(2, 5, seed=3)
+            hit_counts.append(tracker.overall()['hit'].count)
+        self.assertEqual(hit_counts[0], hit_counts[1])
+
+    def test_report(self):
+        tracker = blackjack.loadgen.generate_load(1, 2, seed=0)
+        lines = blackjack.loadgen.report(tracker.overall())
+        self.assertEqual(lines[0].split(), ['action', 'count', 'mean', 'p50', 'p99', 'p99.9'])
+        self.assertEqual(lines[1].split()[:2], ['wagers', '2'])
@@ -1,5 +1,6 @@
 """Unit-tests for blackjack/player.py module."""
 
+import gc
 import unittest
 import unittest.mock
 
@@ -27,6 +28,14 @@ class TestPlayer(unittest.TestCase):
         with self.assertRaises(blackjack.player.NoEnoughChip):
             self.player.bet(10)
 
+    def test_bet_side(self):
+        self.player.bet(1)
+        self.player.bet_side('21+3', 2)
+        self.assertEqual(self.player.hand.side_wagers, {'21+3': 2})
+        self.assertEqual(self.player.chip_count, 2)
+        with self.assertRaises(blackjack.player.NoEnoughChip):
+            self.player.bet_side('perfect-pairs', 3)
+
     def test_earn(self):
         chip_count_before = self.player.chip_count
         self.player.earn(1)
@@ -92,3 +101,51 @@ class TestTable(unittest.TestCase):
         self.table.play(game)
         game.run.assert_called_with(self.table)
 
+
+class TestTableKeys(unittest.TestCase):
+
+    def test_name(self):
+        keys = blackjack.player.TableKeys()
+        table = blackjack.player.Table(None, None, [], 'first')
+        self.assertEqual(keys.key(table), 'first')
+
+    def test_same_table(self):
+        keys = blackjack.player.TableKeys()
+        table = blackjack.player.Table(None, None, [])
+        self.assertEqual(keys.key(table), '#0')
+        self.assertEqual(keys.key(table), '#0')
+
+    def test_keys_never_reused(self):
+        keys = blackjack.player.TableKeys()
+        tables = [blackjack.player.Table(None, None, []) for _ in range(2)]
+        self.assertEqual([keys.key(t) for t in tables], ['#0', '#1'])
+        del tables[0]
+        gc.collect()
+        self.assertEqual(keys.key(blackjack.player.Table(None, None, [])), '#2')
+
+    def test_unnamed_keys_are_not_names(self):
+        keys = blackjack.player.TableKeys()
+        self.assertEqual(keys.key(blackjack.player.Table(None, None, [], 'table-0')), 'table-0')
+        self.assertEqual(keys.key(blackjack.player.Table(None, None, [])), '#0')
+        with self.assertRaises(ValueError):
+            keys.key(blackjack.player.Table(None, None, [], '#1'))
+
+    def test_duplicate_names(self):
+        keys = blackjack.player.TableKeys()
+        table = blackjack.player.Table(None, None, [], 'first')
+        keys.key(table)
+        with self.assertRaises(ValueError):
+            keys.key(blackjack.player.Table(None, None, [], 'first'))
+        del table
+        gc.collect()
+        self.assertEqual(keys.key(blackjack.player.Table(None, None, [], 'first')), 'first')
+
+    def test_on_forget(self):
+        on_forget = unittest.mock.Mock()
+        keys = blackjack.player.TableKeys(on_forget)
+        table = blackjack.player.Table(None, None, [])
+        keys.key(table)
+        del table
+        gc.collect()
+        on_forget.assert_called_once_with('#0')
+
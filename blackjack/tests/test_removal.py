@@ -0,0 +1,55 @@
+"""Unit-tests for blackjack/removal.py module."""
+
+import unittest
+
+import blackjack.advisor
+import blackjack.game
+import blackjack.removal
+
+
+SMALL_SHOE = (1,) * 9 + (4,)
+
+
+class TestRulesetRules(unittest.TestCase):
+
+    def test_same_rules(self):
+        self.assertEqual(blackjack.removal.ruleset_rules(blackjack.game.AmericanRuleset()),
+            blackjack.removal.ruleset_rules(blackjack.game.InsightRuleset()))
+
+    def test_different_rules(self):
+        self.assertNotEqual(blackjack.removal.ruleset_rules(blackjack.game.AmericanRuleset()),
+            blackjack.removal.ruleset_rules(blackjack.game.EuropeanRuleset()))
+
+
+class TestEffectsOfRemoval(unittest.TestCase):
+
+    def setUp(self):
+        self.rulesets = [blackjack.game.AmericanRuleset(), blackjack.game.InsightRuleset()]
+
+    def test(self):
+        results = blackjack.removal.effects_of_removal(self.rulesets, 2, SMALL_SHOE)
+        self.assertEqual(len(results), 2)
+        edge, effects = results[0]
+        self.assertAlmostEqual(edge,
+            -blackjack.advisor.round_value(SMALL_SHOE, (17, False), 1.5))
+        self.assertEqual(len(effects), 10)
+        self.assertGreater(effects[0], 0)  # removing an Ace is good for the house
+        self.assertLess(effects[4], 0)  # removing a 5 is good for the player
+
+    def test_same_rules(self):
+        results = blackjack.removal.effects_of_removal(self.rulesets, 2, SMALL_SHOE)
+        self.assertEqual(results[0], results[1])
+
+    def test_missing_value(self):
+        counts = (0,) + SMALL_SHOE[1:]
+        _, effects = blackjack.removal.effects_of_removal(self.rulesets[:1], 1, counts)[0]
+        self.assertIsNone(effects[0])
+        self.assertIsNotNone(effects[1])
+
+
+class TestReport(unittest.TestCase):
+
+    def test(self):
+        lines = blackjack.removal.report([('european', (.005, [.001] + [None] * 9))])
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1].split()[:4], ['european', '0.500', '+0.1000', '-'])
@@ -0,0 +1,108 @@
+"""Unit-tests for blackjack/scenario.py module."""
+
+import itertools
+import unittest
+
+import blackjack.card
+import blackjack.game
+import blackjack.scenario
+import blackjack.sweep
+
+
+def best_score(ranks):
+    """Score ranks the simple way, independently from blackjack.score."""
+    values = [1 if r == 'Ace' else min(int(r) if r.isdigit() else 10, 10) for r in ranks]
+    score = sum(values)
+    if 1 in values and score + 10 <= 21:
+        score += 10
+    return score
+
+
+class TestScriptedUI(unittest.TestCase):
+
+    def test_answers_in_order(self):
+        ui = blackjack.scenario.ScriptedUI(['10', 'h'])
+        self.assertEqual(ui.ask('', type=int), 10)
+        self.assertEqual(ui.ask('', choices=['h', 's']), 'h')
+
+    def test_invalid_answer(self):
+        ui = blackjack.scenario.ScriptedUI(['x'])
+        with self.assertRaises(ValueError):
+            ui.ask('', choices=['h', 's'])
+
+    def test_script_exhausted(self):
+        ui = blackjack.scenario.ScriptedUI([])
+        with self.assertRaises(blackjack.scenario.ScriptExhausted):
+            ui.ask('[h]it or [s]tand?')
+
+    def test_keep_messages(self):
+        ui = blackjack.scenario.ScriptedUI([], keep_messages=True)
+        ui.print('Hello')
+        self.assertEqual(ui.messages, ['Hello'])
+
+
+class TestStackedShoe(unittest.TestCase):
+
+    def test_deal_in_order(self):
+        shoe = blackjack.scenario.StackedShoe.from_ranks(['Ace', '5', 'King'])
+        shoe.shuffle()
+        self.assertEqual([shoe.draw_card().rank for _ in range(3)], ['Ace', '5', 'King'])
+
+
+class TestRunScenario(unittest.TestCase):
+
+    def test_player_hits_then_wins(self):
+        ruleset = blackjack.game.EuropeanRuleset()
+        table = blackjack.scenario.run_scenario(ruleset,
+            ['5', '10', '6', '7', '7'], [10, 'h', 's'])
+        self.assertEqual(table.players[0].chip_count, 110)
+        self.assertIsNone(table.players[0].hand)
+
+    def test_several_players(self):
+        ruleset = blackjack.game.EuropeanRuleset()
+        table = blackjack.scenario.run_scenario(ruleset,
+            ['10', '10', '9', '9', '8', '8'], [10, 20, 's', 's'], chip_counts=(50, 50))
+        self.assertEqual([p.chip_count for p in table.players], [60, 70])
+
+    def test_side_bets(self):
+        ruleset = blackjack.sweep.make_ruleset(blackjack.game.EuropeanRuleset,
+            {'SIDE_BETS': ('perfect-pairs', '21+3')})()
+        # Cards are all Spades: perfect pair of 8s, and flush with the 9
+        table = blackjack.scenario.run_scenario(ruleset,
+            ['8', '9', '8', '10'], [10, 2, 3, 's'])
+        self.assertEqual(table.players[0].chip_count, 100 - 10 + 2 * 25 + 3 * 5)
+
+    def test_payouts_at_volume(self):
+        """Standing on every two-card hand against every upcard and ruleset."""
+        ranks = blackjack.card.RANKS
+        dealer_draws = ['5', '3', 'King', '2', '9', 'Ace', '4']
+        for ruleset_type in blackjack.game.ruleset_map.values():
+            ruleset = ruleset_type()
+            for upcard in ranks:
+                for first, second in itertools.combinations_with_replacement(ranks[:10], 2):
+                    with self.subTest(ruleset=ruleset_type.__name__,
+                            upcard=upcard, hand=(first, second)):
+                        table = blackjack.scenario.run_scenario(ruleset,
+                            [first, upcard, second] + dealer_draws, [10, 's'])
+                        self.assertEqual(table.players[0].chip_count - 100,
+                            self.expected_gain(ruleset, [first, second],
+                                [upcard] + dealer_draws))
+
+    def expected_gain(self, ruleset, player_ranks, dealer_ranks):
+        dealer_count = 1
+        while best_score(dealer_ranks[:dealer_count]) < ruleset.MINIMUM_DEALER_SCORE:
+            dealer_count += 1
+        dealer_ranks = dealer_ranks[:dealer_count]
+        score = best_score(player_ranks)
+        dealer_score = best_score(dealer_ranks)
+        player_blackjack = score == 21
+        dealer_blackjack = dealer_score == 21 and dealer_count == 2
+        if player_blackjack and dealer_blackjack:
+            return 0
+        if player_blackjack:
+            return int(10 * ruleset.BLACKJACK_PAYOUT_RATIO)
+        if dealer_blackjack or score < dealer_score <= 21:
+            return -10
+        if dealer_score > 21 or score > dealer_score:
+            return 10
+        return 0
@@ -1,5 +1,6 @@
 """Unit-tests for blackjack/score.py module."""
 
+import itertools
 import unittest
 
 import blackjack.card
@@ -60,6 +61,24 @@ class TestScoreFromHand(unittest.TestCase):
         self.assertEqual(score, 15)
 
 
+class TestIsSoftHand(unittest.TestCase):
+
+    def setUp(self):
+        self.deck = blackjack.card.Deck()
+
+    def test_soft_Ace(self):
+        hand = blackjack.card.Hand(self.deck[:3])  # cards Ace, 2, 3
+        self.assertTrue(blackjack.score.is_soft_hand(hand))
+
+    def test_hard_Ace(self):
+        hand = blackjack.card.Hand(self.deck[:5])  # cards Ace, 2, 3, 4, 5
+        self.assertFalse(blackjack.score.is_soft_hand(hand))
+
+    def test_no_Ace(self):
+        hand = blackjack.card.Hand(self.deck[1:3])  # cards 2, 3
+        self.assertFalse(blackjack.score.is_soft_hand(hand))
+
+
 class TestCompareHands(unittest.TestCase):
 
     def setUp(self):
@@ -137,6 +156,36 @@ class TestCompareHands(unittest.TestCase):
         self.assertEqual(outcome, (self.PUSH, self.PUSH))
 
 
+class TestSettleHands(unittest.TestCase):
+
+    def test_same_as_compare_hands(self):
+        deck = blackjack.card.Deck()
+        hands = [blackjack.card.Hand(cards)
+            for size in (2, 3) for cards in itertools.combinations(deck[:13], size)]
+        for dealer_hand in hands[::3]:
+            outcomes = blackjack.score.settle_hands(hands[::5], dealer_hand)
+            for hand, (outcome, score) in zip(hands[::5], outcomes):
+                expected, _ = blackjack.score.compare_hands(hand, dealer_hand)
+                self.assertEqual(outcome, expected)
+                self.assertEqual(score, hand.score)
+
+    def test_no_hands(self):
+        deck = blackjack.card.Deck()
+        self.assertEqual(blackjack.score.settle_hands([], blackjack.card.Hand(deck[:2])), [])
+
+
+class TestTrueCount(unittest.TestCase):
+
+    def test_true_count(self):
+        self.assertEqual(blackjack.score.true_count(6, 104), 3)
+
+    def test_no_remaining_card(self):
+        self.assertEqual(blackjack.score.true_count(6, 0), 6)
+
+    def test_balanced_hi_lo_tags(self):
+        self.assertEqual(sum(blackjack.score.HI_LO_TAGS.values()), 0)
+
+
 class TestSafeOperations(unittest.TestCase):
 
     def test_safe_min(self):
@@ -0,0 +1,105 @@
+"""Unit-tests for blackjack/sidebet.py module."""
+
+import unittest
+
+import blackjack.card
+import blackjack.sidebet
+
+
+def codes(*names):
+    """Return card codes of cards given as (rank, suit) pairs."""
+    codes = [blackjack.card.card_code(blackjack.card.Card(suit, rank))
+        for rank, suit in names]
+    return codes
+
+
+class TestPerfectPairs(unittest.TestCase):
+
+    def setUp(self):
+        self.side_bet = blackjack.sidebet.side_bet_map['perfect-pairs']
+
+    def combination(self, *names):
+        index = self.side_bet.settle(*codes(*names))
+        return self.side_bet.PAYOUTS[index][0] if index >= 0 else None
+
+    def test_perfect_pair(self):
+        self.assertEqual(self.combination(('8', 'Heart'), ('8', 'Heart'), ('2', 'Club')),
+            'perfect pair')
+
+    def test_colored_pair(self):
+        self.assertEqual(self.combination(('8', 'Heart'), ('8', 'Diamond'), ('2', 'Club')),
+            'colored pair')
+
+    def test_mixed_pair(self):
+        self.assertEqual(self.combination(('8', 'Heart'), ('8', 'Spade'), ('2', 'Club')),
+            'mixed pair')
+
+    def test_no_pair(self):
+        self.assertIsNone(self.combination(('King', 'Heart'), ('Queen', 'Heart'), ('2', 'Club')))
+
+    def test_gain(self):
+        self.assertEqual(self.side_bet.gain(0, 2), 50)
+        self.assertEqual(self.side_bet.gain(-1, 2), -2)
+
+    def test_expected_value(self):
+        # 23 cards of the same rank left out of 311, 5 of them of the same suit
+        self.assertAlmostEqual(blackjack.sidebet.expected_value(self.side_bet, 6),
+            (5 * 25 + 6 * 12 + 12 * 6 - 288) / 311)
+
+    def test_repr(self):
+        self.assertIn('perfect-pairs', repr(self.side_bet))
+
+
+class TestTwentyOnePlusThree(unittest.TestCase):
+
+    def setUp(self):
+        self.side_bet = blackjack.sidebet.side_bet_map['21+3']
+
+    def combination(self, *names):
+        index = self.side_bet.settle(*codes(*names))
+        return self.side_bet.PAYOUTS[index][0] if index >= 0 else None
+
+    def test_suited_trips(self):
+        self.assertEqual(self.combination(('7', 'Club'), ('7', 'Club'), ('7', 'Club')),
+            'suited trips')
+
+    def test_straight_flush(self):
+        self.assertEqual(self.combination(('Ace', 'Club'), ('3', 'Club'), ('2', 'Club')),
+            'straight flush')
+
+    def test_three_of_a_kind(self):
+        self.assertEqual(self.combination(('7', 'Club'), ('7', 'Heart'), ('7', 'Club')),
+            'three of a kind')
+
+    def test_straight(self):
+        self.assertEqual(self.combination(('Queen', 'Club'), ('Ace', 'Heart'), ('King', 'Club')),
+            'straight')
+        self.assertEqual(self.combination(('9', 'Club'), ('Jack', 'Heart'), ('10', 'Club')),
+            'straight')
+
+    def test_no_wrap_around(self):
+        self.assertIsNone(self.combination(('King', 'Club'), ('Ace', 'Heart'), ('2', 'Club')))
+
+    def test_flush(self):
+        self.assertEqual(self.combination(('2', 'Spade'), ('9', 'Spade'), ('King', 'Spade')),
+            'flush')
+
+    def test_expected_value(self):
+        # Probabilities of each combination with 6 decks, as published
+        probabilities = (0.000207, 0.002068, 0.005041, 0.031021, 0.058424)
+        value = sum(p * ratio for p, (_, ratio) in zip(probabilities, self.side_bet.PAYOUTS))
+        value -= 1 - sum(probabilities)
+        self.assertAlmostEqual(blackjack.sidebet.expected_value(self.side_bet, 6), value, 4)
+
+
+class TestEstimateHouseEdge(unittest.TestCase):
+
+    def test_close_to_expected_value(self):
+        side_bet = blackjack.sidebet.side_bet_map['perfect-pairs']
+        edge = blackjack.sidebet.estimate_house_edge(side_bet, 6, 50000, seed=3)
+        self.assertAlmostEqual(edge, -blackjack.sidebet.expected_value(side_bet, 6), 1)
+
+    def test_reproducible(self):
+        side_bet = blackjack.sidebet.side_bet_map['21+3']
+        self.assertEqual(blackjack.sidebet.estimate_house_edge(side_bet, 1, 1000, seed=3),
+            blackjack.sidebet.estimate_house_edge(side_bet, 1, 1000, seed=3))
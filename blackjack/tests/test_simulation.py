@@ -0,0 +1,260 @@
+"""Unit-tests for blackjack/simulation.py module."""
+
+import collections
+import itertools
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+import unittest
+
+import blackjack.card
+import blackjack.export
+import blackjack.game
+import blackjack.score
+import blackjack.simulation
+
+
+class TestScoreFromTotal(unittest.TestCase):
+
+    def test_same_as_score_from_hand(self):
+        deck = blackjack.card.Deck()
+        for cards in itertools.combinations(deck[:13], 3):
+            values = [min(card.values) for card in cards]
+            has_ace = 1 in values
+            score, _ = blackjack.simulation.score_from_total(sum(values), has_ace)
+            self.assertEqual(score, blackjack.score.score_from_hand(cards))
+
+    def test_soft(self):
+        self.assertEqual(blackjack.simulation.score_from_total(7, True), (17, True))
+
+    def test_hard(self):
+        self.assertEqual(blackjack.simulation.score_from_total(17, True), (17, False))
+
+
+class TestOutcomeFromScores(unittest.TestCase):
+
+    def test_same_as_compare_hands(self):
+        deck = blackjack.card.Deck()
+        hands = [blackjack.card.Hand(cards)
+            for size in (2, 3) for cards in itertools.combinations(deck[:13], size)]
+        for hand1, hand2 in itertools.product(hands[::7], hands[::5]):
+            expected, _ = blackjack.score.compare_hands(hand1, hand2)
+            outcome = blackjack.simulation.outcome_from_scores(
+                hand1.score, len(hand1), hand2.score, len(hand2))
+            self.assertEqual(outcome, expected)
+
+
+class TestHeadlessShoe(unittest.TestCase):
+
+    def setUp(self):
+        self.shoe = blackjack.simulation.HeadlessShoe(2, random.Random(0))
+
+    def test_size(self):
+        self.assertEqual(len(self.shoe), 104)
+
+    def test_draw_every_card_once(self):
+        values = [self.shoe.draw() for _ in range(len(self.shoe))]
+        expected = 2 * blackjack.simulation.hard_values_from_deck()
+        self.assertEqual(collections.Counter(values), collections.Counter(expected))
+
+    def test_shuffle_every_round_by_default(self):
+        self.shoe.draw()
+        self.shoe.start_round()
+        self.assertEqual(len(self.shoe), 104)
+
+    def test_penetration(self):
+        shoe = blackjack.simulation.HeadlessShoe(1, penetration=0.5)
+        for _ in range(10):
+            shoe.draw()
+        shoe.start_round()
+        self.assertEqual(len(shoe), 42)
+
+    def test_running_count(self):
+        for _ in range(len(self.shoe)):
+            self.shoe.draw()
+        self.assertEqual(self.shoe.running_count, 0)
+
+    def test_true_count(self):
+        for _ in range(10):
+            self.shoe.draw()
+        true_count = self.shoe.running_count * 52 / 94
+        self.assertEqual(self.shoe.true_count, true_count)
+
+    def test_never_run_out_of_cards(self):
+        for _ in range(3 * len(self.shoe)):
+            self.shoe.draw()
+
+    def test_repr(self):
+        self.assertIn(str(len(self.shoe)), repr(self.shoe))
+
+
+class TestHeadlessGame(unittest.TestCase):
+
+    def setUp(self):
+        self.ruleset = blackjack.game.EuropeanRuleset()
+        self.game = blackjack.simulation.HeadlessGame(self.ruleset, rng=random.Random(0))
+
+    def test_one_gain_per_seat(self):
+        gains = self.game.play_round([10, 20, 30])
+        self.assertEqual(len(gains), 3)
+
+    def test_gains_bounded_by_wagers(self):
+        ratio = self.ruleset.BLACKJACK_PAYOUT_RATIO
+        for _ in range(200):
+            gain, = self.game.play_round([10])
+            self.assertIn(gain, (-10, 0, 10, int(10 * ratio)))
+
+    def test_reproducible(self):
+        game = blackjack.simulation.HeadlessGame(self.ruleset, rng=random.Random(0))
+        gains1 = [self.game.play_round([10]) for _ in range(50)]
+        gains2 = [game.play_round([10]) for _ in range(50)]
+        self.assertEqual(gains1, gains2)
+
+    def test_deal_round(self):
+        game = blackjack.simulation.HeadlessGame(self.ruleset, rng=random.Random(0))
+        for _ in range(50):
+            gains = self.game.play_round([10, 20])
+            game.deal_round([10, 20])
+            self.assertEqual(game.gains.tolist(), gains)
+            for seat in range(2):
+                self.assertEqual(game.outcomes[seat],
+                    blackjack.simulation.outcome_from_scores(game.scores[seat],
+                    game.card_counts[seat], game.dealer_score, game.dealer_card_count))
+
+    def test_buffers_grow_with_seats(self):
+        self.game.deal_round([10])
+        gains = self.game.gains
+        self.game.deal_round([10])
+        self.assertIs(self.game.gains, gains)
+        self.game.deal_round([10] * 7)
+        self.assertEqual(len(self.game.gains), 7)
+
+    def test_no_allocation_per_round(self):
+        wagers = [10] * 7
+        for _ in range(100):
+            self.game.deal_round(wagers)
+        tracemalloc.start()
+        try:
+            snapshot = tracemalloc.take_snapshot()
+            memory, _ = tracemalloc.get_traced_memory()
+            for _ in range(2000):
+                self.game.deal_round(wagers)
+            _, peak_memory = tracemalloc.get_traced_memory()
+            differences = tracemalloc.take_snapshot().compare_to(snapshot, 'filename')
+        finally:
+            tracemalloc.stop()
+        # Nothing outlives a round, and temporary objects never pile up
+        self.assertEqual([d for d in differences if d.size_diff > 0
+            and d.traceback[0].filename == blackjack.simulation.__file__], [])
+        self.assertLess(peak_memory - memory, 1024)
+
+    def test_gain_from_outcome(self):
+        gain = self.game.gain_from_outcome(blackjack.score.BLACKJACK, 10)
+        self.assertEqual(gain, 15)
+        self.assertEqual(self.game.gain_from_outcome(blackjack.score.BUST, 10), -10)
+
+    def test_repr(self):
+        self.assertIn('EuropeanRuleset', repr(self.game))
+
+
+class TestEstimateHouseEdge(unittest.TestCase):
+
+    def test_reproducible(self):
+        ruleset = blackjack.game.EuropeanRuleset()
+        edge1 = blackjack.simulation.estimate_house_edge(ruleset, 1000, seed=3)
+        edge2 = blackjack.simulation.estimate_house_edge(ruleset, 1000, seed=3)
+        self.assertEqual(edge1, edge2)
+
+    def test_dealer_rules(self):
+        ruleset = blackjack.game.EuropeanRuleset()
+        edge = blackjack.simulation.estimate_house_edge(ruleset, 5000, seed=3)
+        ruleset.MINIMUM_DEALER_SCORE = 12
+        self.assertNotEqual(blackjack.simulation.estimate_house_edge(ruleset, 5000, seed=3), edge)
+
+    def test_dealer_hits_soft_17(self):
+        ruleset = blackjack.game.EuropeanRuleset()
+        edge = blackjack.simulation.estimate_house_edge(ruleset, 5000, seed=3)
+        ruleset.DEALER_HITS_SOFT_17 = True
+        self.assertNotEqual(blackjack.simulation.estimate_house_edge(ruleset, 5000, seed=3), edge)
+
+
+class TestSimulate(unittest.TestCase):
+
+    def setUp(self):
+        self.ruleset = blackjack.game.EuropeanRuleset()
+
+    def test_progress(self):
+        played_counts = [p.played_count for p in blackjack.simulation.simulate(
+            self.ruleset, 2500, seed=3, chunk_size=1000)]
+        self.assertEqual(played_counts, [1000, 2000, 2500])
+
+    def test_same_totals_with_workers(self):
+        *_, progress = blackjack.simulation.simulate(self.ruleset, 4000, seed=3,
+            chunk_size=1000)
+        *_, parallel_progress = blackjack.simulation.simulate(self.ruleset, 4000,
+            seed=3, worker_count=2, chunk_size=1000)
+        self.assertEqual(parallel_progress.total_gain, progress.total_gain)
+        self.assertEqual(parallel_progress.total_squared_gain, progress.total_squared_gain)
+        self.assertEqual(parallel_progress.played_count, 4000)
+        self.assertEqual(parallel_progress.win_count, progress.win_count)
+        self.assertEqual(parallel_progress.loss_count, progress.loss_count)
+
+    def test_same_totals_with_threads(self):
+        *_, progress = blackjack.simulation.simulate(self.ruleset, 4000, seed=3,
+            chunk_size=1000)
+        *_, threaded_progress = blackjack.simulation.simulate(self.ruleset, 4000,
+            seed=3, worker_count=3, chunk_size=1000, mode='thread')
+        self.assertEqual(threaded_progress.total_gain, progress.total_gain)
+        self.assertEqual(threaded_progress.played_count, 4000)
+
+    @unittest.skipIf(sys.version_info >= (3, 14), 'subinterpreters are available')
+    def test_no_subinterpreters(self):
+        with self.assertRaises(ValueError):
+            list(blackjack.simulation.simulate(self.ruleset, 10, worker_count=2,
+                mode='interpreter'))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            list(blackjack.simulation.simulate(self.ruleset, 10, worker_count=2,
+                mode='fiber'))
+
+    def test_gil_enabled(self):
+        self.assertIsInstance(blackjack.simulation.gil_enabled(), bool)
+
+    def test_outcome_counts(self):
+        *_, progress = blackjack.simulation.simulate(self.ruleset, 3000, seed=3)
+        self.assertEqual(progress.win_count + progress.push_count + progress.loss_count, 3000)
+        self.assertGreater(progress.push_count, 0)
+
+    def test_house_edge(self):
+        *_, progress = blackjack.simulation.simulate(self.ruleset, 3000, seed=3)
+        self.assertEqual(progress.house_edge, -progress.total_gain / (3000 * 1000))
+        self.assertGreater(progress.standard_error, 0)
+        self.assertLess(abs(progress.house_edge), 5 * progress.standard_error)
+
+    def test_record_hands(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'hands.bjc')
+            *_, progress = blackjack.simulation.simulate(self.ruleset, 2500,
+                seed=3, chunk_size=1000, hands_path=path)
+            columns = blackjack.export.read_columns(path)
+        self.assertEqual(len(columns['round']), 2500)
+        self.assertEqual(sum(columns['gain']), progress.total_gain)
+
+    def test_record_hands_with_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'hands.bjc')
+            *_, progress = blackjack.simulation.simulate(self.ruleset, 2500,
+                seed=3, worker_count=2, chunk_size=1000, mode='thread',
+                hands_path=path)
+            columns = blackjack.export.read_columns(path)
+            self.assertEqual(os.listdir(directory), ['hands.bjc'])
+        self.assertEqual(sorted(columns['round']), list(range(1, 2501)))
+        self.assertEqual(sum(columns['gain']), progress.total_gain)
+
+    def test_no_rounds(self):
+        progress = blackjack.simulation.SimulationProgress(0)
+        self.assertIsNone(progress.house_edge)
+        self.assertIsNone(progress.standard_error)
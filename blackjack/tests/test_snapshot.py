@@ -0,0 +1,225 @@
+"""Unit-tests for blackjack/snapshot.py module."""
+
+import gc
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+import blackjack.card
+import blackjack.export
+import blackjack.game
+import blackjack.player
+import blackjack.snapshot
+import blackjack.sweep
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'tables.bjs')
+        self.ruleset = blackjack.game.AmericanRuleset()
+        shoe = blackjack.card.ShufflingShoe.from_template(2)
+        dealer = blackjack.player.Dealer()
+        players = [blackjack.player.Player('John', 20),
+            blackjack.player.Player('Jane', 30)]
+        self.table = blackjack.player.Table(shoe, dealer, players, 'first')
+        # Freeze a round in the middle of Jane's turn
+        dealer.hand = blackjack.card.Hand()
+        for player in players:
+            player.hand = blackjack.card.Hand()
+            player.bet(10)
+        for _ in range(2):
+            for player in players:
+                player.hand.add_card(shoe.draw_card(visible=True))
+            dealer.hand.add_card(shoe.draw_card(visible=False))
+        dealer.hand[0].visible = True
+        self.table.active_players = players
+        self.table.turn = 1
+        self.table.round_true_count = 1.5
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def capture(self, *tables):
+        with blackjack.snapshot.Snapshotter(self.path) as snapshotter:
+            for table in tables:
+                snapshotter.capture(table, self.ruleset)
+        return snapshotter
+
+    def assertSameCards(self, cards, other_cards):
+        self.assertEqual([(c.suit, c.rank, c.visible) for c in cards],
+            [(c.suit, c.rank, c.visible) for c in other_cards])
+
+    def test_card_codes(self):
+        for code, card in enumerate(blackjack.card.Deck()):
+            self.assertEqual(blackjack.card.card_code(card), code)
+            other_card = blackjack.card.card_from_code(code)
+            self.assertEqual((other_card.suit, other_card.rank), (card.suit, card.rank))
+
+    def test_restore_table(self):
+        self.capture(self.table)
+        snapshots = blackjack.snapshot.load_snapshots(self.path)
+        table, ruleset = snapshots['first']
+        self.assertIs(type(ruleset), blackjack.game.AmericanRuleset)
+        self.assertEqual(table.name, 'first')
+        self.assertEqual(table.turn, 1)
+        self.assertEqual([p.name for p in table.players], ['John', 'Jane'])
+        self.assertEqual([p.chip_count for p in table.players], [10, 20])
+        self.assertEqual(table.active_players, table.players)
+        for player, other_player in zip(self.table.players, table.players):
+            self.assertSameCards(player.hand, other_player.hand)
+            self.assertEqual(other_player.hand.wager, 10)
+        self.assertSameCards(self.table.dealer.hand, table.dealer.hand)
+
+    def test_restore_shoe(self):
+        self.capture(self.table)
+        table, _ = blackjack.snapshot.load_snapshots(self.path)['first']
+        self.assertIs(type(table.shoe), blackjack.card.ShufflingShoe)
+        self.assertEqual(len(table.shoe), len(self.table.shoe))
+        self.assertEqual(table.shoe.running_count, self.table.shoe.running_count)
+        cards, shuffled = table.shoe.unshuffled_cards()
+        other_cards, other_shuffled = self.table.shoe.unshuffled_cards()
+        self.assertSameCards(cards, other_cards)
+        self.assertEqual(shuffled, other_shuffled)
+        table.shoe.reload()
+        self.assertEqual(len(table.shoe), 104)
+
+    def test_restore_owned_shoe(self):
+        self.table.shoe = blackjack.card.Shoe(blackjack.card.Deck())
+        self.table.shoe.shuffle()
+        for _ in range(5):
+            self.table.shoe.draw_card()
+        self.capture(self.table)
+        table, _ = blackjack.snapshot.load_snapshots(self.path)['first']
+        self.assertIs(type(table.shoe), blackjack.card.Shoe)
+        cards, shuffled = table.shoe.unshuffled_cards()
+        self.assertSameCards(cards, self.table.shoe.unshuffled_cards()[0])
+        self.assertTrue(shuffled)
+        self.assertEqual(table.shoe.running_count, self.table.shoe.running_count)
+
+    def test_seeded_shoe(self):
+        self.table.shoe = blackjack.card.ShufflingShoe.from_template(2, rng=random.Random(5))
+        other_shoe = blackjack.card.ShufflingShoe.from_template(2, rng=random.Random(5))
+        for shoe in (self.table.shoe, other_shoe):
+            shoe.draw_cards(5)
+        self.capture(self.table)
+        table, _ = blackjack.snapshot.load_snapshots(self.path)['first']
+        next_cards = [shoe.draw_cards(10) for shoe in (self.table.shoe, other_shoe, table.shoe)]
+        self.assertSameCards(next_cards[0], next_cards[1])  # not changed by snapshot
+        self.assertSameCards(next_cards[2], next_cards[1])
+
+    def test_forget_collected_tables(self):
+        other_table = blackjack.player.Table(blackjack.card.Shoe.from_template(1),
+            blackjack.player.Dealer(), [blackjack.player.Player('Jim', 50)])
+        with blackjack.snapshot.Snapshotter(self.path) as snapshotter:
+            snapshotter.capture(other_table, self.ruleset)
+            self.assertIn('#0', snapshotter._sections)
+            del other_table
+            gc.collect()
+            self.assertNotIn('#0', snapshotter._sections)
+            self.assertNotIn('#0', snapshotter._shoes)
+
+    def test_restore_ruleset_variant(self):
+        self.ruleset = blackjack.sweep.make_ruleset(blackjack.game.EuropeanRuleset,
+            {'DEALER_HITS_SOFT_17': True})
+        self.capture(self.table)
+        _, ruleset = blackjack.snapshot.load_snapshots(self.path)['first']
+        self.assertEqual(blackjack.sweep.ruleset_fingerprint(ruleset),
+            blackjack.sweep.ruleset_fingerprint(self.ruleset))
+
+    def test_restore_side_bets(self):
+        self.ruleset = blackjack.sweep.make_ruleset(blackjack.game.AmericanRuleset,
+            {'SIDE_BETS': ('21+3',)})()
+        self.table.players[0].bet_side('21+3', 5)
+        self.capture(self.table)
+        table, ruleset = blackjack.snapshot.load_snapshots(self.path)['first']
+        self.assertEqual(ruleset.SIDE_BETS, ('21+3',))
+        self.assertEqual([p.hand.side_wagers for p in table.players], [{'21+3': 5}, {}])
+
+    def test_only_changed_sections_are_written(self):
+        with blackjack.snapshot.Snapshotter(self.path) as snapshotter:
+            snapshotter.capture(self.table, self.ruleset)
+            self.assertEqual(snapshotter.record_count, 5)
+            snapshotter.capture(self.table, self.ruleset)
+            self.assertEqual(snapshotter.record_count, 5)
+            self.table.players[0].earn(5)
+            snapshotter.capture(self.table, self.ruleset)
+            self.assertEqual(snapshotter.record_count, 6)
+            self.table.shoe.draw_card()
+            snapshotter.capture(self.table, self.ruleset)
+            self.assertEqual(snapshotter.record_count, 7)
+        table, _ = blackjack.snapshot.load_snapshots(self.path)['first']
+        self.assertEqual(table.players[0].chip_count, 15)
+        self.assertEqual(len(table.shoe), len(self.table.shoe))
+
+    def test_checkpoint_interval(self):
+        with blackjack.snapshot.Snapshotter(self.path, interval=3600) as snapshotter:
+            snapshotter.checkpoint(self.table, self.ruleset)
+            self.table.players[0].earn(5)
+            snapshotter.checkpoint(self.table, self.ruleset)
+            self.assertEqual(snapshotter.record_count, 5)
+
+    def test_several_tables(self):
+        other_table = blackjack.player.Table(blackjack.card.Shoe.from_template(1),
+            blackjack.player.Dealer(), [blackjack.player.Player('Jim', 50)])
+        self.capture(self.table, other_table)
+        snapshots = blackjack.snapshot.load_snapshots(self.path)
+        self.assertEqual(sorted(snapshots), ['#0', 'first'])
+        table, _ = snapshots['#0']
+        self.assertIsNone(table.turn)
+        self.assertIsNone(table.players[0].hand)
+
+    def test_truncated_record_is_ignored(self):
+        with blackjack.snapshot.Snapshotter(self.path) as snapshotter:
+            snapshotter.capture(self.table, self.ruleset)
+            self.table.players[0].earn(5)
+            snapshotter.capture(self.table, self.ruleset)
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 1)
+        table, _ = blackjack.snapshot.load_snapshots(self.path)['first']
+        self.assertEqual(table.players[0].chip_count, 10)
+
+    def test_compact(self):
+        for chip_count in range(5):
+            self.table.players[0].earn(1)
+            self.capture(self.table)
+        size = os.path.getsize(self.path)
+        blackjack.snapshot.compact(self.path)
+        self.assertLess(os.path.getsize(self.path), size)
+        table, _ = blackjack.snapshot.load_snapshots(self.path)['first']
+        self.assertEqual(table.players[0].chip_count, 15)
+
+    def test_not_a_snapshot_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'tables\n')
+        with self.assertRaises(ValueError):
+            blackjack.snapshot.load_snapshots(self.path)
+
+    def test_resume_game(self):
+        self.capture(self.table)
+        table, ruleset = blackjack.snapshot.load_snapshots(self.path)['first']
+        game = blackjack.game.Game(ruleset)
+        with unittest.mock.patch('blackjack.ui.ask', side_effect=['s', 0, 0]):
+            game.resume(table)
+        self.assertIsNone(table.turn)
+        self.assertEqual([p.hand for p in table.players], [None, None])
+        self.assertIsNone(table.dealer.hand)
+
+    def test_resume_game_with_recorder(self):
+        self.capture(self.table)
+        table, ruleset = blackjack.snapshot.load_snapshots(self.path)['first']
+        self.assertEqual(table.round_true_count, 1.5)
+        hands_path = os.path.join(self.directory, 'hands.bjc')
+        with blackjack.export.HandRecorder(hands_path) as recorder:
+            game = blackjack.game.Game(ruleset, recorder=recorder)
+            with unittest.mock.patch('blackjack.ui.ask', side_effect=['s', 0, 0]):
+                game.resume(table)
+        columns = blackjack.export.read_columns(hands_path)
+        self.assertEqual(list(columns['seat']), [0, 1])
+        self.assertEqual(list(columns['round']), [1, 1])
+        self.assertEqual(list(columns['true_count']), [1.5, 1.5])
+        self.assertEqual(list(columns['wager']), [10, 10])
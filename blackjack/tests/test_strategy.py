@@ -0,0 +1,92 @@
+"""Unit-tests for blackjack/strategy.py module."""
+
+import unittest
+
+import blackjack.game
+import blackjack.score
+import blackjack.strategy
+
+
+class TestStrategy(unittest.TestCase):
+
+    def setUp(self):
+        self.strategy = blackjack.strategy.Strategy('test', [(12, False, 10)])
+
+    def test_hits(self):
+        self.assertTrue(self.strategy.hits(12, False, 10))
+
+    def test_stands(self):
+        self.assertFalse(self.strategy.hits(12, True, 10))
+        self.assertFalse(self.strategy.hits(12, False, 9))
+
+    def test_never_hits_on_target_score(self):
+        strategy = blackjack.strategy.Strategy('test', [(21, False, 10)])
+        self.assertFalse(strategy.hits(blackjack.score.TARGET_SCORE, False, 10))
+
+    def test_index_matches_table(self):
+        index = self.strategy.index(12, False, 10)
+        self.assertEqual(self.strategy.table[index], 1)
+
+    def test_repr(self):
+        self.assertIn('test', repr(self.strategy))
+
+
+class TestBasicStrategy(unittest.TestCase):
+
+    def setUp(self):
+        self.strategy = blackjack.strategy.BASIC_STRATEGY
+
+    def test_hard_hands(self):
+        self.assertTrue(self.strategy.hits(11, False, 6))
+        self.assertTrue(self.strategy.hits(12, False, 2))
+        self.assertFalse(self.strategy.hits(12, False, 4))
+        self.assertTrue(self.strategy.hits(16, False, 10))
+        self.assertFalse(self.strategy.hits(16, False, 6))
+        self.assertFalse(self.strategy.hits(17, False, 1))
+
+    def test_soft_hands(self):
+        self.assertTrue(self.strategy.hits(17, True, 7))
+        self.assertTrue(self.strategy.hits(18, True, 10))
+        self.assertFalse(self.strategy.hits(18, True, 8))
+        self.assertFalse(self.strategy.hits(19, True, 10))
+
+
+class TestMimicDealerStrategy(unittest.TestCase):
+
+    def test(self):
+        strategy = blackjack.strategy.MIMIC_DEALER_STRATEGY
+        self.assertTrue(strategy.hits(blackjack.score.MINIMUM_DEALER_SCORE - 1, True, 5))
+        self.assertFalse(strategy.hits(blackjack.score.MINIMUM_DEALER_SCORE, False, 5))
+
+
+class TestDealerTable(unittest.TestCase):
+
+    def setUp(self):
+        self.ruleset = blackjack.game.EuropeanRuleset()
+
+    def hits(self, score, soft):
+        table = blackjack.strategy.dealer_table(self.ruleset)
+        hit = bool(table[blackjack.strategy.dealer_index(score, soft)])
+        return hit
+
+    def test_stands_on_soft_17(self):
+        self.assertTrue(self.hits(16, False))
+        self.assertTrue(self.hits(16, True))
+        self.assertFalse(self.hits(17, True))
+        self.assertFalse(self.hits(17, False))
+
+    def test_hits_soft_17(self):
+        self.ruleset.DEALER_HITS_SOFT_17 = True
+        self.assertTrue(self.hits(17, True))
+        self.assertFalse(self.hits(17, False))
+        self.assertFalse(self.hits(18, True))
+
+    def test_minimum_dealer_score(self):
+        self.ruleset.MINIMUM_DEALER_SCORE = 15
+        self.assertTrue(self.hits(14, False))
+        self.assertFalse(self.hits(15, False))
+
+    def test_shared_between_rulesets(self):
+        table1 = blackjack.strategy.dealer_table(blackjack.game.BasicRuleset())
+        table2 = blackjack.strategy.dealer_table(blackjack.game.AmericanRuleset())
+        self.assertIs(table1, table2)
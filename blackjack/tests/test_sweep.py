@@ -0,0 +1,86 @@
+"""Unit-tests for blackjack/sweep.py module."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+import blackjack.game
+import blackjack.sweep
+
+
+class TestRulesetFingerprint(unittest.TestCase):
+
+    def test_same_rules(self):
+        ruleset = blackjack.sweep.make_ruleset(blackjack.game.AmericanRuleset, {})
+        fingerprint1 = blackjack.sweep.ruleset_fingerprint(ruleset)
+        fingerprint2 = blackjack.sweep.ruleset_fingerprint(blackjack.game.AmericanRuleset)
+        self.assertEqual(fingerprint1, fingerprint2)
+
+    def test_different_rules(self):
+        ruleset = blackjack.sweep.make_ruleset(blackjack.game.AmericanRuleset,
+            {'BLACKJACK_PAYOUT_RATIO': 6/5})
+        fingerprint1 = blackjack.sweep.ruleset_fingerprint(ruleset)
+        fingerprint2 = blackjack.sweep.ruleset_fingerprint(blackjack.game.AmericanRuleset)
+        self.assertNotEqual(fingerprint1, fingerprint2)
+
+    def test_inherited_rules(self):
+        attributes = blackjack.sweep.ruleset_attributes(blackjack.game.InsightRuleset)
+        self.assertEqual(attributes['DECK_COUNT_IN_SHOE'], 8)
+        self.assertEqual(attributes['MINIMUM_DEALER_SCORE'], 17)
+
+
+class TestMakeRulesets(unittest.TestCase):
+
+    def test_one_ruleset_per_cell(self):
+        grid = {'DECK_COUNT_IN_SHOE': [1, 4, 6], 'BLACKJACK_PAYOUT_RATIO': [3/2, 6/5]}
+        rulesets = list(blackjack.sweep.make_rulesets(blackjack.game.EuropeanRuleset, grid))
+        self.assertEqual(len(rulesets), 6)
+        cells = {(r.DECK_COUNT_IN_SHOE, r.BLACKJACK_PAYOUT_RATIO) for r in rulesets}
+        self.assertEqual(len(cells), 6)
+        for ruleset in rulesets:
+            self.assertTrue(issubclass(ruleset, blackjack.game.EuropeanRuleset))
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.directory, 'cache')
+        self.grid = {'BLACKJACK_PAYOUT_RATIO': [3/2, 6/5], 'MINIMUM_DEALER_SCORE': [17]}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def sweep(self):
+        results = blackjack.sweep.sweep(self.grid, round_count=2000,
+            cache_path=self.cache_path, worker_count=2)
+        return results
+
+    def test_sweep(self):
+        results = self.sweep()
+        self.assertEqual(len(results), 2)
+        (ruleset1, edge1), (ruleset2, edge2) = results
+        self.assertEqual(ruleset1.BLACKJACK_PAYOUT_RATIO, 3/2)
+        self.assertLess(edge1, edge2)  # same seed, lower payout
+
+    def test_cached_results(self):
+        results1 = self.sweep()
+        with unittest.mock.patch('concurrent.futures.ProcessPoolExecutor') as executor:
+            results2 = self.sweep()
+            self.assertFalse(executor.called)
+        self.assertEqual([e for _, e in results1], [e for _, e in results2])
+
+    def test_without_cache(self):
+        results = blackjack.sweep.sweep(self.grid, round_count=100, worker_count=1)
+        self.assertEqual(len(results), 2)
+
+
+class TestSweepCache(unittest.TestCase):
+
+    def test_key_depends_on_evaluation(self):
+        ruleset = blackjack.game.BasicRuleset
+        key1 = blackjack.sweep.SweepCache.key(ruleset, 1000, 'basic', 0)
+        key2 = blackjack.sweep.SweepCache.key(ruleset, 1000, 'basic', 1)
+        self.assertNotEqual(key1, key2)
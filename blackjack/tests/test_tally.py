@@ -0,0 +1,54 @@
+"""Unit-tests for blackjack/tally.py module."""
+
+import concurrent.futures
+import unittest
+
+import blackjack.tally
+
+
+def _add_to_slot(name, slot_count, index, tallies):
+    shared_tallies = blackjack.tally.SharedTallies(slot_count, name)
+    try:
+        shared_tallies.add(index, tallies)
+    finally:
+        shared_tallies.close()
+
+
+class TestSharedTallies(unittest.TestCase):
+
+    def setUp(self):
+        self.tallies = blackjack.tally.SharedTallies(3)
+
+    def tearDown(self):
+        self.tallies.close()
+
+    def test_zeroed(self):
+        self.assertEqual(self.tallies.totals(), (0,) * len(blackjack.tally.TALLY_FIELDS))
+
+    def test_add(self):
+        self.tallies.add(1, (10, -5, 25, 4, 1, 5))
+        self.tallies.add(1, (10, 3, 9, 6, 0, 4))
+        self.assertEqual(self.tallies.slot(0), (0, 0, 0, 0, 0, 0))
+        self.assertEqual(self.tallies.slot(1), (20, -2, 34, 10, 1, 9))
+
+    def test_totals(self):
+        self.tallies.add(0, (10, -5, 25, 4, 1, 5))
+        self.tallies.add(2, (10, 3, 9, 6, 0, 4))
+        self.assertEqual(self.tallies.totals(), (20, -2, 34, 10, 1, 9))
+
+    def test_attach(self):
+        other = blackjack.tally.SharedTallies(3, self.tallies.name)
+        other.add(2, (1, 2, 3, 4, 5, 6))
+        other.close()
+        self.assertEqual(self.tallies.slot(2), (1, 2, 3, 4, 5, 6))
+
+    def test_workers(self):
+        with concurrent.futures.ProcessPoolExecutor(3) as executor:
+            futures = [executor.submit(_add_to_slot, self.tallies.name, 3, i,
+                (i, -i, i * i, 0, i, 0)) for i in range(3)]
+            for future in futures:
+                future.result()
+        self.assertEqual(self.tallies.totals(), (3, -3, 5, 0, 3, 0))
+
+    def test_repr(self):
+        self.assertIn('of 3 slots', repr(self.tallies))
@@ -1,5 +1,6 @@
 """Unit-tests for blackjack/ui.py module."""
 
+import gc
 import unittest
 import unittest.mock
 import sys
@@ -67,6 +68,60 @@ class TestDisplayDealer(unittest.TestCase):
         blackjack.ui.display_dealer(self.dealer)
 
 
+class TestHandLines(unittest.TestCase):
+
+    def setUp(self):
+        self.deck = blackjack.card.Deck()
+        self.hand = blackjack.card.Hand(self.deck[:2])
+
+    def test_card_line_is_cached(self):
+        line = blackjack.ui.card_line(self.deck[0])
+        self.assertEqual(line, '  Card "Ace of Spades"')
+        other_card = blackjack.card.Card('Spade', 'Ace')
+        self.assertIs(blackjack.ui.card_line(other_card), line)
+
+    def test_hidden_card_line(self):
+        self.deck[0].visible = False
+        self.assertEqual(blackjack.ui.card_line(self.deck[0]), '  Card "<hidden>"')
+
+    def test_lines(self):
+        lines = blackjack.ui.hand_lines(self.hand)
+        self.assertEqual(lines, ['  Card "Ace of Spades"', '  Card "2 of Spades"'])
+
+    @unittest.mock.patch('blackjack.ui.card_line', wraps=blackjack.ui.card_line)
+    def test_render_added_cards_only(self, card_line):
+        blackjack.ui.hand_lines(self.hand)
+        self.hand.add_card(self.deck[2])
+        lines = blackjack.ui.hand_lines(self.hand)
+        self.assertEqual(card_line.call_count, 3)
+        self.assertEqual(lines[-1], '  Card "3 of Spades"')
+
+    def test_render_turned_cards(self):
+        self.hand[1].visible = False
+        blackjack.ui.hand_lines(self.hand)
+        self.hand.reveal_all_cards()
+        lines = blackjack.ui.hand_lines(self.hand)
+        self.assertEqual(lines[1], '  Card "2 of Spades"')
+
+    def test_rendered_hands_are_forgotten(self):
+        blackjack.ui.hand_lines(self.hand)
+        self.assertIn(id(self.hand), blackjack.ui._rendered_hands)
+        hand_id = id(self.hand)
+        del self.hand
+        gc.collect()
+        self.assertNotIn(hand_id, blackjack.ui._rendered_hands)
+
+    def test_hands_carry_no_rendering(self):
+        blackjack.ui.hand_lines(self.hand)
+        self.assertEqual(vars(blackjack.card.Hand()).keys(), vars(self.hand).keys())
+
+    def test_render_replaced_cards(self):
+        blackjack.ui.hand_lines(self.hand)
+        self.hand[1] = self.deck[3]
+        lines = blackjack.ui.hand_lines(self.hand)
+        self.assertEqual(lines[1], '  Card "4 of Spades"')
+
+
 class TestAsk(unittest.TestCase):
 
     def setUp(self):
@@ -96,6 +151,13 @@ class TestAsk(unittest.TestCase):
         self.assertEqual(key, 'c')
         self.assertEqual(input.call_count, 1)
 
+    @unittest.mock.patch('builtins.input')
+    def test_zero_default_argument(self, input):
+        input.side_effect = ['', '3']
+        key = blackjack.ui.ask('', type=int, default=0)
+        self.assertEqual(key, 0)
+        self.assertEqual(input.call_count, 1)
+
     @unittest.mock.patch('builtins.input')
     def test_inconsistent_default_and_type_arguments(self, input):
         with self.assertRaises(ValueError):
@@ -2,6 +2,8 @@
 
 import builtins
 import sys
+import weakref
+
 import termcolor
 
 
@@ -11,6 +13,51 @@ def print(msg, color='grey'):
     builtins.print(msg)
 
 
+_card_lines = {}  # by card name and visibility
+
+
+def card_line(card):
+    """Return the line displaying given card, rendered once for all."""
+    key = (card.name, card.visible)
+    line = _card_lines.get(key)
+    if line is None:
+        line = '  Card "{}"'.format(card)
+        _card_lines[key] = line
+    return line
+
+
+_rendered_hands = {}  # cards with their visibility, and lines, by hand id
+
+
+def _forget_hand(hand_id):
+    del _rendered_hands[hand_id]
+
+
+def hand_lines(hand):
+    """Return lines displaying each card of given hand.
+
+    Lines are kept until the hand is garbage-collected, so that only cards
+    added or turned since the previous call are rendered. Hands are lists,
+    which cannot be weakly referenced keys, hence keys are their ids.
+    """
+    rendered = _rendered_hands.get(id(hand))
+    if rendered is None:
+        rendered = _rendered_hands[id(hand)] = ([], [])
+        weakref.finalize(hand, _forget_hand, id(hand))
+    rendered_cards, lines = rendered
+    unchanged_count = 0
+    for (card, visible), current_card in zip(rendered_cards, hand):
+        if card is not current_card or card.visible != visible:
+            break
+        unchanged_count += 1
+    del rendered_cards[unchanged_count:]
+    del lines[unchanged_count:]
+    for card in hand[unchanged_count:]:
+        rendered_cards.append((card, card.visible))
+        lines.append(card_line(card))
+    return lines
+
+
 def display_player(player):
     """Display player's hand and wealth."""
     # Display player with no cards
@@ -21,8 +68,7 @@ def display_player(player):
     else:
         lines = ['Player "{}" has {} cards and {} remaining chips:'.format(
             player.name, len(player.hand), player.chip_count)]
-        for card in player.hand:
-            lines.append('  Card "{}"'.format(card))
+        lines.extend(hand_lines(player.hand))
     txt = '\n'.join(lines)
     print(txt, color='white')
 
@@ -30,8 +76,8 @@ def display_player(player):
 def display_dealer(dealer):
     """Display dealer's hand."""
     lines = ['Dealer has {} cards:'.format(len(dealer.hand or []))]
-    for card in dealer.hand or []:
-        lines.append('  Card "{}"'.format(card))
+    if dealer.hand:
+        lines.extend(hand_lines(dealer.hand))
     txt = '\n'.join(lines)
     print(txt, color='white')
 
@@ -40,11 +86,11 @@ def ask(msg, type=None, choices=None, default=None):
     """Prompt user for some action and return his decision."""
 
     # Check arguments consistency
-    if default and type:
+    if default is not None and type:
         try: value = type(default)
         except ValueError:
             raise ValueError('default value cannot be casted into {}'.format(type))
-    if default and choices:
+    if default is not None and choices:
         if default not in choices:
             raise ValueError('default value not in choices')
 
@@ -52,7 +98,7 @@ def ask(msg, type=None, choices=None, default=None):
     msg = ''.join([
         msg,
         ' ({})'.format('/'.join(choices)) if choices else '',
-        ' (default={})'.format(default) if default else '',
+        ' (default={})'.format(default) if default is not None else '',
         ': ',
     ])
     msg = termcolor.colored(msg, color='cyan', attrs=['bold'])
@@ -61,7 +107,7 @@ def ask(msg, type=None, choices=None, default=None):
     while True:
         sys.stdout.write(msg)
         value = input()
-        if default and not value:
+        if default is not None and not value:
             value = default
         if type:
             try: value = type(value)
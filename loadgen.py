@@ -0,0 +1,8 @@
+#!/usr/bin/env python3 -B
+"""Measure latency of table actions under scripted play."""
+
+import blackjack.loadgen
+
+
+if __name__ == '__main__':
+    blackjack.loadgen.main()
@@ -9,9 +9,11 @@ setuptools.setup(
     author='Yoann Aubineau',
     author_email='yoann.aubineau@gmail.com',
     packages=['blackjack'],
+    python_requires='>=3.8',
     test_suite='blackjack.tests',
     classifiers=[
-        'Programming Language :: Python :: 3.4',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.13',
         'Development Status :: 3 - Alpha',
     ],
 )